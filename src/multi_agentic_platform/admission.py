@@ -0,0 +1,309 @@
+"""Admission control for the expensive HTTP routes.
+
+Routes are grouped into pools ("agent" for `/run` and `/workflow/run*`, "ingest" for the ingestion
+routes, "query" for `/rag/query`), each with its own concurrency limit and bounded wait queue, so a
+burst of agent runs cannot starve cheap lookups. Queued requests are served by priority
+(`X-Priority: interactive` before `batch`) and then in arrival order; when a queue is full an
+interactive request displaces the newest queued batch request.
+
+Clients may send `X-Request-Deadline-Ms` with their remaining time budget. A request whose deadline
+passes while it is queued is dropped without running, and an admitted request is cancelled when
+its deadline expires; `request_deadline()` exposes the deadline to the code handling the request.
+
+Rejections are immediate: 429 when the queue is full, 503 when the wait exceeded the queue timeout
+or the deadline, both with a `Retry-After` estimated from recent service times.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from multi_agentic_platform.metrics import registry
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+ROUTE_POOLS = {
+    "/run": "agent",
+    "/workflow/run": "agent",
+    "/workflow/run/batch": "agent",
+    "/rag/ingest": "ingest",
+    "/rag/ingest/text": "ingest",
+    "/rag/ingest/samples": "ingest",
+    "/workflow/ingest": "ingest",
+    "/workflow/ingest/samples": "ingest",
+    "/rag/query": "query",
+}
+# Routes whose callers are batch jobs unless they say otherwise.
+BATCH_ROUTES = frozenset({"/workflow/run/batch"})
+
+QUEUE_DEPTH = registry.gauge(
+    "map_admission_queue_depth", "Requests waiting for an admission slot.", ("pool",)
+)
+IN_FLIGHT = registry.gauge("map_admission_in_flight", "Admitted requests running.", ("pool",))
+ADMITTED = registry.counter(
+    "map_admission_admitted_total", "Requests admitted per pool and priority.", ("pool", "priority")
+)
+REJECTED = registry.counter(
+    "map_admission_rejected_total",
+    "Requests rejected by admission control.",
+    ("pool", "priority", "reason"),
+)
+WAIT_SECONDS = registry.histogram(
+    "map_admission_wait_seconds", "Time admitted requests spent queued.", ("pool",)
+)
+
+_deadline: ContextVar[float | None] = ContextVar("map_request_deadline", default=None)
+
+
+def request_deadline() -> float | None:
+    """`time.monotonic()` deadline of the current request, if the client sent one."""
+    return _deadline.get()
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status: int, reason: str, retry_after: int) -> None:
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class PoolLimit:
+    max_concurrency: int
+    max_queue: int
+    queue_timeout: float
+
+
+class _Waiter:
+    __slots__ = ("rank", "seq", "future")
+
+    def __init__(self, rank: int, seq: int, future: asyncio.Future[None]) -> None:
+        self.rank = rank
+        self.seq = seq
+        self.future = future
+
+    def __lt__(self, other: _Waiter) -> bool:
+        return (self.rank, self.seq) < (other.rank, other.seq)
+
+
+class AdmissionPool:
+    """Concurrency limit with a priority wait queue. Must be used from one event loop."""
+
+    def __init__(self, name: str, limit: PoolLimit) -> None:
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+        self._queue: list[_Waiter] = []
+        self._waiting = 0
+        self._seq = itertools.count()
+        # Exponentially weighted mean service time, used for Retry-After.
+        self._service_seconds = 1.0
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def retry_after(self) -> int:
+        slots = max(1, self.limit.max_concurrency)
+        return max(1, math.ceil(self._service_seconds * (self._waiting + 1) / slots))
+
+    def _reject(self, status: int, reason: str, priority: str) -> AdmissionRejected:
+        REJECTED.inc(pool=self.name, priority=priority, reason=reason)
+        return AdmissionRejected(status, reason, self.retry_after())
+
+    def _update_depth(self) -> None:
+        QUEUE_DEPTH.set(self._waiting, pool=self.name)
+        IN_FLIGHT.set(self.in_flight, pool=self.name)
+
+    def _shed_for(self, rank: int) -> bool:
+        """Drop the newest queued waiter of lower priority than `rank`, if any."""
+        victims = [
+            waiter for waiter in self._queue if waiter.rank > rank and not waiter.future.done()
+        ]
+        if not victims:
+            return False
+        victim = max(victims)
+        priority = next(name for name, value in PRIORITIES.items() if value == victim.rank)
+        victim.future.set_exception(self._reject(429, "shed", priority))
+        self._waiting -= 1
+        return True
+
+    async def acquire(self, priority: str = "interactive", deadline: float | None = None) -> None:
+        rank = PRIORITIES.get(priority, 0)
+        if self.in_flight < self.limit.max_concurrency and self._waiting == 0:
+            self.in_flight += 1
+            ADMITTED.inc(pool=self.name, priority=priority)
+            self._update_depth()
+            return
+
+        now = time.monotonic()
+        if deadline is not None and deadline <= now:
+            raise self._reject(503, "deadline", priority)
+        if self._waiting >= self.limit.max_queue and not self._shed_for(rank):
+            raise self._reject(429, "queue_full", priority)
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, _Waiter(rank, next(self._seq), future))
+        self._waiting += 1
+        self._update_depth()
+
+        timeout = self.limit.queue_timeout
+        reason = "timeout"
+        if deadline is not None and deadline - now < timeout:
+            timeout, reason = deadline - now, "deadline"
+        try:
+            await asyncio.wait({future}, timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+        if not future.done():
+            self._abandon(future)
+            raise self._reject(503, reason, priority)
+        # Raises AdmissionRejected if an interactive request displaced this one.
+        future.result()
+        WAIT_SECONDS.observe(time.monotonic() - now, pool=self.name)
+        ADMITTED.inc(pool=self.name, priority=priority)
+
+    def _abandon(self, future: asyncio.Future[None]) -> None:
+        if future.done() and not future.cancelled() and future.exception() is None:
+            # The slot was granted just as the caller gave up; pass it on.
+            self.release()
+            return
+        if not future.done():
+            future.cancel()
+            self._waiting -= 1
+            self._update_depth()
+
+    def release(self, service_seconds: float | None = None) -> None:
+        if service_seconds is not None:
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * service_seconds
+        self.in_flight -= 1
+        while self._queue and self.in_flight < self.limit.max_concurrency:
+            waiter = heapq.heappop(self._queue)
+            if waiter.future.done():
+                continue
+            self._waiting -= 1
+            self.in_flight += 1
+            waiter.future.set_result(None)
+        self._update_depth()
+
+
+class AdmissionController:
+    def __init__(self, limits: dict[str, PoolLimit]) -> None:
+        self.pools = {
+            name: AdmissionPool(name, limit)
+            for name, limit in limits.items()
+            if limit.max_concurrency > 0
+        }
+
+    def pool_for(self, method: str, path: str) -> AdmissionPool | None:
+        if method != "POST":
+            return None
+        name = ROUTE_POOLS.get(path.rstrip("/") or "/")
+        return self.pools.get(name) if name else None
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {
+                "in_flight": pool.in_flight,
+                "waiting": pool.waiting,
+                "max_concurrency": pool.limit.max_concurrency,
+                "max_queue": pool.limit.max_queue,
+            }
+            for name, pool in self.pools.items()
+        }
+
+
+def _header(scope: dict[str, Any], name: bytes) -> str | None:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1").strip()
+    return None
+
+
+async def _send_rejection(send: Any, rejected: AdmissionRejected) -> None:
+    body = json.dumps({"detail": f"Server busy ({rejected.reason}); retry later."}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": rejected.status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(rejected.retry_after).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an `AdmissionController` to the routes it knows."""
+
+    def __init__(self, app: Any, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        pool = (
+            self.controller.pool_for(scope.get("method", ""), scope.get("path", ""))
+            if scope["type"] == "http"
+            else None
+        )
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "").rstrip("/")
+        priority = (_header(scope, b"x-priority") or "").lower()
+        if priority not in PRIORITIES:
+            priority = "batch" if path in BATCH_ROUTES else "interactive"
+        deadline = None
+        budget_ms = _header(scope, b"x-request-deadline-ms")
+        if budget_ms:
+            try:
+                deadline = time.monotonic() + float(budget_ms) / 1000
+            except ValueError:
+                deadline = None
+
+        try:
+            await pool.acquire(priority, deadline)
+        except AdmissionRejected as rejected:
+            await _send_rejection(send, rejected)
+            return
+
+        started = time.monotonic()
+        token = _deadline.set(deadline)
+        response_started = False
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            if deadline is None:
+                await self.app(scope, receive, send_wrapper)
+            else:
+                await asyncio.wait_for(
+                    self.app(scope, receive, send_wrapper), max(0.0, deadline - time.monotonic())
+                )
+        except asyncio.TimeoutError:
+            # Only a deadline hit before the response started can still be answered cleanly.
+            if response_started or deadline is None or time.monotonic() < deadline:
+                raise
+            REJECTED.inc(pool=pool.name, priority=priority, reason="deadline_running")
+            await _send_rejection(send, AdmissionRejected(503, "deadline", pool.retry_after()))
+        finally:
+            _deadline.reset(token)
+            pool.release(time.monotonic() - started)
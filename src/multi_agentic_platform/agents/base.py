@@ -1,13 +1,28 @@
 from dataclasses import dataclass
+from typing import Awaitable, Callable
 
+from multi_agentic_platform.mcp.service import MCPToolCall, MCPToolResult
+from multi_agentic_platform.metrics import track_stage
 from multi_agentic_platform.providers.base import LLMProvider
 
+# Runs a batch of MCP tool calls concurrently, e.g. `MCPService.call_tools`.
+ToolRunner = Callable[[list[MCPToolCall]], Awaitable[list[MCPToolResult]]]
+
 
 @dataclass
 class Agent:
     name: str
     system_prompt: str
     provider: LLMProvider
+    tools: ToolRunner | None = None
 
     async def act(self, prompt: str) -> str:
-        return await self.provider.generate(self.system_prompt, prompt)
+        with track_stage(f"agent.{self.name}"):
+            return await self.provider.generate(self.system_prompt, prompt)
+
+    async def lookup(self, calls: list[MCPToolCall]) -> list[MCPToolResult]:
+        """Run tool calls concurrently, so the lookup costs the slowest call, not the sum."""
+        if self.tools is None:
+            raise RuntimeError(f"Agent {self.name} has no tool access")
+        with track_stage(f"agent.{self.name}.tools"):
+            return await self.tools(calls)
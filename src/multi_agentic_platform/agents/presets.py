@@ -1,8 +1,8 @@
-from multi_agentic_platform.agents.base import Agent
+from multi_agentic_platform.agents.base import Agent, ToolRunner
 from multi_agentic_platform.providers.base import LLMProvider
 
 
-def create_planner(provider: LLMProvider) -> Agent:
+def create_planner(provider: LLMProvider, tools: ToolRunner | None = None) -> Agent:
     return Agent(
         name="planner",
         system_prompt=(
@@ -10,6 +10,7 @@ def create_planner(provider: LLMProvider) -> Agent:
             "list requirements, and highlight risks or missing info."
         ),
         provider=provider,
+        tools=tools,
     )
 
 
@@ -0,0 +1,4 @@
+"""Offline benchmarks and load tools.
+
+Run them with `python -m multi_agentic_platform.benchmarks <name> [options]`.
+"""
@@ -0,0 +1,30 @@
+"""Benchmark CLI: python -m multi_agentic_platform.benchmarks <name> [options]"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+
+BENCHMARKS = {
+    "load": "multi_agentic_platform.benchmarks.loadtest",
+    "rag": "multi_agentic_platform.benchmarks.rag",
+    "mcp": "multi_agentic_platform.benchmarks.mcp_latency",
+    "backends": "multi_agentic_platform.benchmarks.backends",
+    "batching": "multi_agentic_platform.benchmarks.batching",
+    "prefix_cache": "multi_agentic_platform.benchmarks.prefix_cache",
+}
+
+
+def main() -> None:
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        names = ", ".join(sorted(BENCHMARKS))
+        raise SystemExit(
+            f"usage: python -m multi_agentic_platform.benchmarks {{{names}}} [options]"
+        )
+    name = sys.argv[1]
+    sys.argv = [f"{sys.argv[0]} {name}", *sys.argv[2:]]
+    importlib.import_module(BENCHMARKS[name]).main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""CPU inference backend benchmark: throughput and ranking agreement per backend.
+
+Usage:
+    python -m multi_agentic_platform.benchmarks backends --backends torch,torch-int8,onnx,onnx-int8
+    python -m multi_agentic_platform.benchmarks backends --texts 2000 --threads 4 \\
+        --out backends.json
+
+Every backend embeds the same variable-length texts and reranks the same query/candidate sets,
+with and without length bucketing. Agreement is measured against the first backend listed:
+embedding cosine similarity, top-k retrieval overlap and, for the cross-encoder, top-k overlap and
+Spearman correlation of the candidate scores. Models are downloaded on first use and ONNX exports
+are cached under `model_cache_dir`.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Any
+
+from multi_agentic_platform.benchmarks.corpus import SyntheticCorpus
+from multi_agentic_platform.benchmarks.report import argument_parser, write_report
+from multi_agentic_platform.config import settings
+from multi_agentic_platform.model_backends import BACKENDS, load_model, run_bucketed
+from multi_agentic_platform.rag.chunking import chunk_text
+
+
+def _texts(count: int, seed: int) -> list[str]:
+    """Chunks of a synthetic corpus cut to random lengths, so batches need padding."""
+    corpus = SyntheticCorpus(count, seed=seed)
+    rng = random.Random(seed)
+    texts: list[str] = []
+    for batch in corpus.documents():
+        for _, content in batch:
+            for chunk in chunk_text(content, corpus.chunk_size, corpus.chunk_overlap):
+                texts.append(chunk[: rng.randint(40, len(chunk))].strip())
+    return texts[:count]
+
+
+def _timed(function) -> tuple[Any, float]:
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def _ranks(values):
+    import numpy as np
+
+    ranks = np.empty(len(values), dtype="float64")
+    ranks[np.argsort(values)] = np.arange(len(values))
+    return ranks
+
+
+def _spearman(left, right) -> float:
+    import numpy as np
+
+    if len(left) < 2:
+        return 1.0
+    return float(np.corrcoef(_ranks(left), _ranks(right))[0, 1])
+
+
+def _overlap(left, right, k: int) -> float:
+    import numpy as np
+
+    top_left = set(np.argsort(-np.asarray(left))[:k].tolist())
+    top_right = set(np.argsort(-np.asarray(right))[:k].tolist())
+    return len(top_left & top_right) / max(1, min(k, len(left)))
+
+
+def run_backend(
+    backend: str, texts: list[str], rerank_sets, options: dict[str, Any]
+) -> dict[str, Any]:
+    import numpy as np
+
+    embedder, embedder_load = _timed(
+        lambda: load_model("sentence-transformer", options["embedding_model"], "cpu", backend)
+    )
+    reranker, reranker_load = _timed(
+        lambda: load_model("cross-encoder", options["reranker_model"], "cpu", backend)
+    )
+    # One warm-up call so lazy session/kernel setup is not timed.
+    embedder.encode(texts[:8], normalize_embeddings=True)
+    reranker.predict(rerank_sets[0][:8])
+
+    def embed(bucketed: bool):
+        if bucketed:
+            return run_bucketed(
+                texts,
+                lambda batch: embedder.encode(
+                    batch, batch_size=len(batch), normalize_embeddings=True
+                ),
+            )
+        return embedder.encode(texts, batch_size=options["batch_size"], normalize_embeddings=True)
+
+    def rerank(bucketed: bool):
+        if bucketed:
+            return [
+                run_bucketed(
+                    [pair[1] for pair in pairs],
+                    lambda batch: reranker.predict(batch, batch_size=len(batch)),
+                    items=pairs,
+                )
+                for pairs in rerank_sets
+            ]
+        return [reranker.predict(pairs, batch_size=options["batch_size"]) for pairs in rerank_sets]
+
+    pair_count = sum(len(pairs) for pairs in rerank_sets)
+    result: dict[str, Any] = {
+        "backend": backend,
+        "load_seconds": {"embedder": embedder_load, "reranker": reranker_load},
+    }
+    for mode, bucketed in (("bucketed", True), ("unbucketed", False)):
+        vectors, embed_seconds = _timed(lambda: embed(bucketed))
+        scores, rerank_seconds = _timed(lambda: rerank(bucketed))
+        result[mode] = {
+            "embed_texts_per_second": len(texts) / embed_seconds,
+            "rerank_pairs_per_second": pair_count / rerank_seconds,
+        }
+    result["_vectors"] = np.asarray(vectors, dtype="float32")
+    result["_scores"] = [np.asarray(values, dtype="float32") for values in scores]
+    return result
+
+
+def _agreement(baseline: dict[str, Any], other: dict[str, Any], top_k: int, queries: int):
+    import numpy as np
+
+    base_vectors, vectors = baseline["_vectors"], other["_vectors"]
+    cosine = np.sum(base_vectors * vectors, axis=1)
+    # Use the first texts as queries against the rest for a retrieval-level comparison.
+    base_hits = base_vectors[:queries] @ base_vectors.T
+    hits = vectors[:queries] @ vectors.T
+    retrieval = [_overlap(base_hits[row], hits[row], top_k) for row in range(len(base_hits))]
+    rerank_overlap = [
+        _overlap(left, right, top_k)
+        for left, right in zip(baseline["_scores"], other["_scores"], strict=True)
+    ]
+    spearman = [
+        _spearman(left, right)
+        for left, right in zip(baseline["_scores"], other["_scores"], strict=True)
+    ]
+    return {
+        "embedding_cosine_mean": float(cosine.mean()),
+        "embedding_cosine_min": float(cosine.min()),
+        f"retrieval_overlap_at_{top_k}": float(np.mean(retrieval)),
+        f"rerank_overlap_at_{top_k}": float(np.mean(rerank_overlap)),
+        "rerank_spearman_mean": float(np.mean(spearman)),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="First one is the baseline.")
+    parser.add_argument("--texts", type=int, default=1000, help="Texts to embed.")
+    parser.add_argument("--queries", type=int, default=50, help="Rerank queries.")
+    parser.add_argument("--candidates", type=int, default=32, help="Candidates per rerank query.")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size when unbucketed.")
+    parser.add_argument("--threads", type=int, default=None, help="Overrides inference_threads.")
+    parser.add_argument("--embedding-model", default=settings.rag_embedding_model)
+    parser.add_argument("--reranker-model", default=settings.rag_reranker_model)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="-", help="JSON output path ('-' for stdout).")
+    args = parser.parse_args(argv)
+
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    if args.threads:
+        settings.inference_threads = args.threads
+    options = {
+        "backends": backends,
+        "texts": args.texts,
+        "queries": args.queries,
+        "candidates": args.candidates,
+        "top_k": args.top_k,
+        "batch_size": args.batch_size,
+        "threads": settings.inference_threads,
+        "embedding_model": args.embedding_model,
+        "reranker_model": args.reranker_model,
+        "seed": args.seed,
+    }
+
+    texts = _texts(args.texts, args.seed)
+    rng = random.Random(args.seed)
+    queries = SyntheticCorpus(args.texts, seed=args.seed).queries(args.queries)
+    rerank_sets = [
+        [[query, text] for text in rng.sample(texts, min(args.candidates, len(texts)))]
+        for query in queries
+    ]
+
+    runs = [run_backend(backend, texts, rerank_sets, options) for backend in backends]
+    for run in runs:
+        run["agreement"] = _agreement(runs[0], run, args.top_k, min(args.queries, len(texts)))
+    results = [
+        {key: value for key, value in run.items() if not key.startswith("_")} for run in runs
+    ]
+    write_report("backends", options, results, args.out)
+
+
+if __name__ == "__main__":
+    main()
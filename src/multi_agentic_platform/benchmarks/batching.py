@@ -0,0 +1,189 @@
+"""Micro-batching benchmark: /rag/query pipeline throughput and latency per concurrency level.
+
+Usage:
+    python -m multi_agentic_platform.benchmarks batching --concurrency 1,8,32,128
+    python -m multi_agentic_platform.benchmarks batching --max-batch 1,16,64 --max-wait-ms 2
+    python -m multi_agentic_platform.benchmarks batching --real-models --chunks 2000
+
+Each level runs `concurrency` clients issuing `RAGPipeline.query` calls back to back for
+`--duration` seconds, once per `--max-batch` setting (1 = unbatched). By default the models are
+offline stand-ins whose calls cost `--call-ms` plus `--item-ms` per input (sleeping, like a model
+that releases the GIL), which is the per-call overhead batching amortizes; `--real-models` loads
+the configured sentence-transformers models instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from multi_agentic_platform.benchmarks.corpus import SyntheticCorpus
+from multi_agentic_platform.benchmarks.report import argument_parser, write_report
+from multi_agentic_platform.benchmarks.stats import summarize_latencies
+from multi_agentic_platform.benchmarks.stubs import HashingEmbedder, ScoringStubReranker
+from multi_agentic_platform.config import settings
+from multi_agentic_platform.rag.reranker import Candidate
+
+
+class _CallCounter:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.items = 0
+
+    def charge(self, items: int, call_ms: float, item_ms: float) -> None:
+        self.calls += 1
+        self.items += items
+        time.sleep((call_ms + item_ms * items) / 1000)
+
+
+class CostlyEmbedder(HashingEmbedder):
+    """Hashing embedder that also pays a fixed per-call and per-text cost."""
+
+    def __init__(self, dimension: int, call_ms: float, item_ms: float) -> None:
+        super().__init__(dimension)
+        self.call_ms = call_ms
+        self.item_ms = item_ms
+        self.counter = _CallCounter()
+
+    def encode(self, texts: list[str]):
+        self.counter.charge(len(texts), self.call_ms, self.item_ms)
+        return super().encode(texts)
+
+
+class CostlyReranker(ScoringStubReranker):
+    """Token-overlap reranker that also pays a fixed per-call and per-pair cost."""
+
+    def __init__(self, call_ms: float, item_ms: float) -> None:
+        self.call_ms = call_ms
+        self.item_ms = item_ms
+        self.counter = _CallCounter()
+
+    def rerank_many(
+        self, requests: list[tuple[str, list[Candidate], int]]
+    ) -> list[list[Candidate]]:
+        pairs = sum(len(candidates) for _, candidates, _ in requests)
+        self.counter.charge(pairs, self.call_ms, self.item_ms)
+        return [
+            super(CostlyReranker, self).rerank(query, candidates, top_k)
+            for query, candidates, top_k in requests
+        ]
+
+    def rerank(self, query: str, candidates: list[Candidate], top_k: int = 5) -> list[Candidate]:
+        self.counter.charge(len(candidates), self.call_ms, self.item_ms)
+        return super().rerank(query, candidates, top_k)
+
+
+def _pipeline(options: dict[str, Any], max_batch: int):
+    from multi_agentic_platform.rag.pipeline import RAGPipeline
+
+    settings.rag_batch_max_size = max_batch
+    settings.rag_batch_max_wait_ms = options["max_wait_ms"]
+    if options["real_models"]:
+        return RAGPipeline(), None, None
+    embedder = CostlyEmbedder(options["dim"], options["call_ms"], options["item_ms"])
+    reranker = CostlyReranker(options["call_ms"], options["item_ms"])
+    return RAGPipeline(embedder=embedder, reranker=reranker), embedder, reranker
+
+
+async def _drive(pipeline, queries: list[str], concurrency: int, duration: float, top_k: int):
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client(offset: int) -> None:
+        nonlocal errors
+        position = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                await pipeline.query(queries[position % len(queries)], top_k=top_k)
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+            position += concurrency
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def run_level(
+    pipeline, embedder, reranker, queries: list[str], concurrency: int, options: dict[str, Any]
+) -> dict[str, Any]:
+    for model in (embedder, reranker):
+        if model is not None:
+            model.counter = _CallCounter()
+    latencies, errors, elapsed = asyncio.run(
+        _drive(pipeline, queries, concurrency, options["duration"], options["top_k"])
+    )
+    result: dict[str, Any] = {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency": summarize_latencies(latencies),
+    }
+    if embedder is not None and reranker is not None:
+        result["mean_batch"] = {
+            "embed": round(embedder.counter.items / max(1, embedder.counter.calls), 2),
+            "rerank_requests": round(len(latencies) / max(1, reranker.counter.calls), 2),
+        }
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument(
+        "--concurrency", default="1,8,32,128", help="Comma-separated client counts."
+    )
+    parser.add_argument("--max-batch", default="1,32", help="Batch sizes to compare (1 = off).")
+    parser.add_argument("--max-wait-ms", type=float, default=settings.rag_batch_max_wait_ms)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per level.")
+    parser.add_argument("--chunks", type=int, default=5000, help="Indexed chunks.")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=128, help="Stand-in embedder dimension.")
+    parser.add_argument("--call-ms", type=float, default=5.0, help="Stand-in cost per model call.")
+    parser.add_argument("--item-ms", type=float, default=0.1, help="Stand-in cost per input.")
+    parser.add_argument("--real-models", action="store_true", help="Use the configured models.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="-", help="JSON output path ('-' for stdout).")
+    args = parser.parse_args(argv)
+
+    options = {
+        "concurrency": [int(level) for level in args.concurrency.split(",") if level.strip()],
+        "max_batch": [int(size) for size in args.max_batch.split(",") if size.strip()],
+        "max_wait_ms": args.max_wait_ms,
+        "duration": args.duration,
+        "chunks": args.chunks,
+        "queries": args.queries,
+        "top_k": args.top_k,
+        "dim": args.dim,
+        "call_ms": args.call_ms,
+        "item_ms": args.item_ms,
+        "real_models": args.real_models,
+        "seed": args.seed,
+    }
+
+    corpus = SyntheticCorpus(args.chunks, seed=args.seed)
+    queries = corpus.queries(args.queries)
+    results = []
+    for max_batch in options["max_batch"]:
+        pipeline, embedder, reranker = _pipeline(options, max_batch)
+        try:
+            for batch in corpus.documents():
+                pipeline.ingest_documents(batch)
+            levels = [
+                run_level(pipeline, embedder, reranker, queries, concurrency, options)
+                for concurrency in options["concurrency"]
+            ]
+        finally:
+            pipeline.close()
+        results.append({"max_batch": max_batch, "levels": levels})
+    write_report("batching", options, results, args.out)
+
+
+if __name__ == "__main__":
+    main()
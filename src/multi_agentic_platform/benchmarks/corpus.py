@@ -0,0 +1,88 @@
+"""Synthetic, reproducible corpora for RAG benchmarks."""
+
+from __future__ import annotations
+
+import itertools
+import random
+from typing import Iterator
+
+
+def _vocabulary(size: int, rng: random.Random) -> list[str]:
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    words = {
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(3, 10))) for _ in range(size * 2)
+    }
+    return sorted(words)[:size]
+
+
+class SyntheticCorpus:
+    """Documents whose chunk count under `chunk_text` is known in advance.
+
+    Each document is built from one of `topics` word distributions (Zipf-weighted over a shared
+    vocabulary) so that queries drawn from a document have meaningful nearest neighbours.
+    """
+
+    def __init__(
+        self,
+        num_chunks: int,
+        chunk_size: int = 600,
+        chunk_overlap: int = 120,
+        chunks_per_document: int = 8,
+        vocabulary_size: int = 20_000,
+        topics: int = 64,
+        seed: int = 7,
+    ) -> None:
+        self.num_chunks = num_chunks
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.chunks_per_document = chunks_per_document
+        self.seed = seed
+        rng = random.Random(seed)
+        self._vocabulary = _vocabulary(vocabulary_size, rng)
+        self._cum_weights = list(
+            itertools.accumulate(1.0 / (rank + 1) for rank in range(len(self._vocabulary)))
+        )
+        self._topics = [rng.sample(range(len(self._vocabulary)), 400) for _ in range(topics)]
+
+    def _document_length(self, chunks: int) -> int:
+        return self.chunk_size + (chunks - 1) * (self.chunk_size - self.chunk_overlap)
+
+    def _document(self, rng: random.Random, chunks: int) -> str:
+        topic = self._topics[rng.randrange(len(self._topics))]
+        target = self._document_length(chunks)
+        parts: list[str] = []
+        length = 0
+        while length < target:
+            if rng.random() < 0.6:
+                words = [self._vocabulary[i] for i in rng.choices(topic, k=32)]
+            else:
+                words = rng.choices(self._vocabulary, cum_weights=self._cum_weights, k=32)
+            parts.extend(words)
+            length += sum(len(word) + 1 for word in words)
+        return " ".join(parts)[:target].strip()
+
+    def documents(self, batch_size: int = 256) -> Iterator[list[tuple[str, str]]]:
+        """Yield batches of `(source, content)` totalling `num_chunks` chunks."""
+        rng = random.Random(self.seed)
+        remaining = self.num_chunks
+        doc_id = 0
+        batch: list[tuple[str, str]] = []
+        while remaining > 0:
+            chunks = min(self.chunks_per_document, remaining)
+            batch.append((f"synthetic/doc-{doc_id:07d}.txt", self._document(rng, chunks)))
+            remaining -= chunks
+            doc_id += 1
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def queries(self, count: int, words: int = 8) -> list[str]:
+        rng = random.Random(self.seed + 1)
+        queries: list[str] = []
+        for _ in range(count):
+            text = self._document(rng, 1).split()
+            start = rng.randrange(max(1, len(text) - words))
+            queries.append(" ".join(text[start : start + words]))
+        return queries
@@ -0,0 +1,228 @@
+"""HTTP load generator for the FastAPI app.
+
+Drives `/run`, `/rag/query` and `/workflow/run` with a closed-loop worker pool at each level of a
+concurrency sweep and reports throughput, latency percentiles and error rates per endpoint,
+together with event-loop lag.
+
+In-process (default) the app runs on this event loop through an ASGI transport, with
+`MockProvider` at the configured artificial latency and offline stand-in models, so the loop-lag
+figures directly expose blocking work inside request handlers. With `--url` the harness drives a
+running server over HTTP; start it with `MAP_PROVIDER=mock MAP_MOCK_LATENCY_MS=...` and note that
+loop lag is then measured on the client only.
+
+Usage:
+    python -m multi_agentic_platform.benchmarks load --concurrency 1,8,32 --duration 10
+    python -m multi_agentic_platform.benchmarks load --url http://localhost:8000 --mix rag=1
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+import time
+from typing import Any
+
+from multi_agentic_platform.benchmarks.report import argument_parser, write_report
+from multi_agentic_platform.benchmarks.stats import summarize_latencies
+
+ENDPOINTS: dict[str, tuple[str, dict[str, Any]]] = {
+    "run": (
+        "/run",
+        {"prompt": "Write a function that validates an email address", "language": "python"},
+    ),
+    "rag": ("/rag/query", {"query": "What are the onboarding requirements?", "top_k": 5}),
+    "workflow": ("/workflow/run", {"query": "Create an onboarding checklist with security steps"}),
+}
+
+
+def _parse_mix(raw: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for item in raw.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in mix: {name}. Choose from {sorted(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class LoopLagMonitor:
+    """Samples how late `asyncio.sleep(interval)` wakes up; lag means the loop was blocked."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self) -> None:
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> list[float]:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        return self.samples
+
+
+async def _run_level(client, mix: dict[str, float], concurrency: int, options: dict[str, Any]):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    records: list[tuple[str, float, bool]] = []
+    rng = random.Random(options["seed"] + concurrency)
+    warmup_until = time.perf_counter() + options["warmup"]
+    stop_at = warmup_until + options["duration"]
+
+    async def worker() -> None:
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, weights=weights)[0]
+            path, payload = ENDPOINTS[name]
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=payload)
+                ok = response.status_code < 400
+            except Exception:  # noqa: BLE001 - transport errors count as failed requests
+                ok = False
+            finished = time.perf_counter()
+            if started >= warmup_until:
+                records.append((name, finished - started, ok))
+            if options["think_time"] > 0:
+                await asyncio.sleep(rng.expovariate(1 / options["think_time"]))
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    lag = await monitor.stop()
+
+    endpoints: dict[str, Any] = {}
+    for name in names:
+        rows = [row for row in records if row[0] == name]
+        errors = sum(1 for row in rows if not row[2])
+        endpoints[name] = {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "throughput_rps": round(len(rows) / options["duration"], 2),
+            "latency": summarize_latencies([row[1] for row in rows if row[2]]),
+        }
+    total_errors = sum(1 for row in records if not row[2])
+    return {
+        "concurrency": concurrency,
+        "requests": len(records),
+        "throughput_rps": round(len(records) / options["duration"], 2),
+        "error_rate": round(total_errors / len(records), 4) if records else 0.0,
+        "latency": summarize_latencies([row[1] for row in records if row[2]]),
+        "endpoints": endpoints,
+        "event_loop_lag": summarize_latencies(lag),
+    }
+
+
+def _prepare_in_process_app(options: dict[str, Any]):
+    from multi_agentic_platform.config import settings
+
+    settings.provider = "mock"
+    settings.mock_latency_ms = options["mock_latency_ms"]
+    settings.mock_latency_jitter_ms = options["mock_jitter_ms"]
+    # Keep the app from loading the real models; `stub_models` swaps in stand-ins below.
+    settings.model_warmup = False
+    # Load runs measure the request path; don't start job workers or create their database.
+    settings.jobs_workers = 0
+
+    from multi_agentic_platform import main
+
+    if options["stub_models"]:
+        from multi_agentic_platform.benchmarks.stubs import (
+            HashingEmbedder,
+            ScoringStubReranker,
+            StubWorkflowRAG,
+        )
+        from multi_agentic_platform.rag.pipeline import RAGPipeline
+
+        embedder = HashingEmbedder()
+        main.rag_service._pipeline = RAGPipeline(
+            rerank_with_agent_provider=main.orchestrator.get().provider,
+            embedder=embedder,
+            reranker=ScoringStubReranker(),
+        )
+        main.workflow_service._rag = StubWorkflowRAG(embedder)
+    return main.app
+
+
+async def run(options: dict[str, Any]) -> list[dict[str, Any]]:
+    import httpx
+
+    mix = _parse_mix(options["mix"])
+    timeout = httpx.Timeout(options["timeout"])
+    async with contextlib.AsyncExitStack() as stack:
+        if options["url"]:
+            client = httpx.AsyncClient(base_url=options["url"], timeout=timeout)
+        else:
+            app = _prepare_in_process_app(options)
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=timeout
+            )
+        await stack.enter_async_context(client)
+
+        if options["setup"]:
+            for path in ("/rag/ingest/samples", "/workflow/ingest/samples"):
+                response = await client.post(path)
+                if response.status_code >= 400:
+                    print(f"setup {path} failed with {response.status_code}: {response.text[:200]}")
+
+        return [
+            await _run_level(client, mix, concurrency, options)
+            for concurrency in options["concurrency"]
+        ]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--url", default="", help="Target server; omit to run the app in-process.")
+    parser.add_argument("--concurrency", default="1,4,16,32", help="Comma-separated sweep levels.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per level.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds per level.")
+    parser.add_argument("--mix", default="run=1,rag=3,workflow=1", help="Endpoint weights.")
+    parser.add_argument("--think-time-ms", type=float, default=0.0, help="Mean pause per worker.")
+    parser.add_argument("--mock-latency-ms", type=float, default=200.0)
+    parser.add_argument("--mock-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--real-models", action="store_true", help="Use configured RAG models.")
+    parser.add_argument("--no-setup", action="store_true", help="Skip ingesting sample docs.")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="-", help="JSON output path ('-' for stdout).")
+    args = parser.parse_args(argv)
+
+    options = {
+        "url": args.url,
+        "concurrency": [int(level) for level in args.concurrency.split(",") if level.strip()],
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "mix": args.mix,
+        "think_time": args.think_time_ms / 1000,
+        "mock_latency_ms": args.mock_latency_ms,
+        "mock_jitter_ms": args.mock_jitter_ms,
+        "stub_models": not args.real_models,
+        "setup": not args.no_setup,
+        "timeout": args.timeout,
+        "seed": args.seed,
+    }
+    levels = asyncio.run(run(options))
+    best = max(levels, key=lambda level: level["throughput_rps"], default=None)
+    results = {
+        "levels": levels,
+        "peak_throughput_concurrency": best["concurrency"] if best else None,
+    }
+    write_report("load", options, results, args.out)
+
+
+if __name__ == "__main__":
+    main()
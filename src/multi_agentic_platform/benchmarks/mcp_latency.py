@@ -0,0 +1,89 @@
+"""Compare tool-listing latency with a fresh MCP session per call against the session pool.
+
+Usage:
+    python -m multi_agentic_platform.benchmarks mcp --iterations 20 --startup-delay 0.5
+
+Runs a local stub MCP server (`--startup-delay` simulates an expensive boot) and times
+`list_tools` through a fresh session per call, a pooled session with the catalog cache off, and
+a pooled session with the cache on.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+from multi_agentic_platform.benchmarks.report import argument_parser, write_report
+from multi_agentic_platform.benchmarks.stats import summarize_latencies
+from multi_agentic_platform.mcp import MCPServerConfig, MCPSessionPool
+
+_SERVER = "stub"
+
+
+def _stub_config(startup_delay: float) -> MCPServerConfig:
+    return MCPServerConfig(
+        name=_SERVER,
+        command=sys.executable,
+        args=[
+            "-m",
+            "multi_agentic_platform.benchmarks.mcp_stub_server",
+            "--startup-delay",
+            str(startup_delay),
+        ],
+    )
+
+
+async def _timed(iterations: int, call) -> list[float]:
+    samples: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def run(iterations: int, startup_delay: float) -> dict[str, dict[str, float]]:
+    config = _stub_config(startup_delay)
+
+    async def fresh_session() -> None:
+        # Equivalent to the previous behaviour: spawn, initialize, list, tear down.
+        pool = MCPSessionPool([config])
+        try:
+            await pool.list_tools(_SERVER)
+        finally:
+            await pool.close()
+
+    uncached_pool = MCPSessionPool([config], tools_ttl=0.0)
+    cached_pool = MCPSessionPool([config])
+    try:
+        await uncached_pool.list_tools(_SERVER)
+        await cached_pool.list_tools(_SERVER)
+        return {
+            "fresh_session": summarize_latencies(await _timed(iterations, fresh_session)),
+            "pooled_session": summarize_latencies(
+                await _timed(iterations, lambda: uncached_pool.list_tools(_SERVER))
+            ),
+            "pooled_cached": summarize_latencies(
+                await _timed(iterations, lambda: cached_pool.list_tools(_SERVER))
+            ),
+        }
+    finally:
+        await uncached_pool.close()
+        await cached_pool.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--startup-delay", type=float, default=0.0)
+    parser.add_argument("--out", default="-", help="JSON output path ('-' for stdout).")
+    args = parser.parse_args(argv)
+
+    options = {"iterations": args.iterations, "startup_delay": args.startup_delay}
+    results = asyncio.run(run(args.iterations, args.startup_delay))
+    write_report("mcp", options, results, args.out)
+
+
+if __name__ == "__main__":
+    main()
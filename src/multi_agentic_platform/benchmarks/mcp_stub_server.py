@@ -0,0 +1,52 @@
+"""Local stdio MCP server used by the MCP benchmarks.
+
+Usage: python -m multi_agentic_platform.benchmarks.mcp_stub_server [--startup-delay SECONDS]
+
+`--startup-delay` simulates servers with an expensive boot (e.g. `npx` packages).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+
+def build_server():
+    try:
+        from mcp.server.fastmcp import FastMCP
+    except ImportError as exc:
+        raise ImportError("mcp package is required. Install: pip install mcp") from exc
+
+    server = FastMCP("map-stub", log_level="WARNING")
+
+    @server.tool()
+    def echo(text: str) -> str:
+        """Return the input text unchanged."""
+        return text
+
+    @server.tool()
+    async def sleep(seconds: float = 0.1) -> str:
+        """Wait for the given number of seconds, then return."""
+        await asyncio.sleep(seconds)
+        return f"slept {seconds}"
+
+    @server.tool()
+    def blob(size: int = 1024) -> str:
+        """Return a string of `size` characters."""
+        return "x" * size
+
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--startup-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    if args.startup_delay:
+        time.sleep(args.startup_delay)
+    build_server().run(transport="stdio")
+
+
+if __name__ == "__main__":
+    main()
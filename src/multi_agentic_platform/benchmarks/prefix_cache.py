@@ -0,0 +1,108 @@
+"""System-prompt KV cache benchmark for the HuggingFace provider.
+
+Usage:
+    python -m multi_agentic_platform.benchmarks prefix_cache --calls 30
+    python -m multi_agentic_platform.benchmarks prefix_cache --model Qwen/Qwen2.5-0.5B-Instruct \\
+        --system-repeat 8 --max-new-tokens 64 --out prefix_cache.json
+
+Runs the planner, coder and reviewer system prompts (optionally repeated `--system-repeat` times
+to mimic longer production prompts) against short synthetic user prompts, with the prefix cache
+enabled and disabled. Time to first token is the latency of a one-token generation; throughput is
+calls and generated tokens per second for `--max-new-tokens` generations. Greedy decoding
+(temperature 0) is used so both modes generate the same tokens. Downloads the model on first use.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from multi_agentic_platform.agents.presets import create_coder, create_planner, create_reviewer
+from multi_agentic_platform.benchmarks.corpus import SyntheticCorpus
+from multi_agentic_platform.benchmarks.report import argument_parser, write_report
+from multi_agentic_platform.benchmarks.stats import summarize_latencies
+from multi_agentic_platform.config import settings
+from multi_agentic_platform.providers.mock import MockProvider
+from multi_agentic_platform.providers.prefix_cache import PrefixKVCache
+
+
+def _system_prompts(repeat: int) -> list[str]:
+    provider = MockProvider()
+    agents = (create_planner(provider), create_coder(provider), create_reviewer(provider))
+    return [" ".join([agent.system_prompt] * repeat) for agent in agents]
+
+
+def run_mode(provider, cached: bool, calls: list[tuple[str, str]], options: dict[str, Any]):
+    provider.prefix_cache = PrefixKVCache(options["cache_mb"] * 1024 * 1024) if cached else None
+    # Warm-up: fills the cache in cached mode and keeps lazy kernel setup out of the timings.
+    for system in dict.fromkeys(system for system, _ in calls):
+        provider.complete(system, calls[0][1], max_new_tokens=1)
+
+    first_token: list[float] = []
+    for system, prompt in calls:
+        started = time.perf_counter()
+        provider.complete(system, prompt, max_new_tokens=1)
+        first_token.append(time.perf_counter() - started)
+
+    generated = 0
+    started = time.perf_counter()
+    for system, prompt in calls:
+        text = provider.complete(system, prompt, max_new_tokens=options["max_new_tokens"])
+        generated += provider.count_tokens(text)
+    elapsed = time.perf_counter() - started
+
+    result: dict[str, Any] = {
+        "prefix_cache": cached,
+        "ttft": summarize_latencies(first_token),
+        "calls_per_second": round(len(calls) / elapsed, 3),
+        "tokens_per_second": round(generated / elapsed, 2),
+    }
+    if cached:
+        result["cache_entries"] = len(provider.prefix_cache)
+        result["cache_bytes"] = provider.prefix_cache.memory_bytes
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--model", default=settings.hf_model)
+    parser.add_argument("--calls", type=int, default=30, help="Calls per mode.")
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--system-repeat", type=int, default=1, help="Lengthen system prompts.")
+    parser.add_argument("--cache-mb", type=int, default=settings.hf_prefix_cache_mb or 256)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="-", help="JSON output path ('-' for stdout).")
+    args = parser.parse_args(argv)
+
+    from multi_agentic_platform.providers.huggingface_provider import HuggingFaceProvider
+
+    settings.hf_model = args.model
+    settings.temperature = 0.0
+    options = {
+        "model": args.model,
+        "calls": args.calls,
+        "max_new_tokens": args.max_new_tokens,
+        "system_repeat": args.system_repeat,
+        "cache_mb": args.cache_mb,
+        "seed": args.seed,
+    }
+
+    provider = HuggingFaceProvider()
+    systems = _system_prompts(args.system_repeat)
+    prompts = SyntheticCorpus(args.calls, seed=args.seed).queries(args.calls)
+    calls = [(systems[index % len(systems)], prompt) for index, prompt in enumerate(prompts)]
+    options["system_tokens"] = [provider.count_tokens(system) for system in systems]
+
+    baseline = run_mode(provider, False, calls, options)
+    cached = run_mode(provider, True, calls, options)
+    cached["ttft_speedup"] = round(
+        baseline["ttft"]["mean_ms"] / max(cached["ttft"]["mean_ms"], 1e-9), 3
+    )
+    cached["throughput_speedup"] = round(
+        cached["calls_per_second"] / max(baseline["calls_per_second"], 1e-9), 3
+    )
+    write_report("prefix_cache", options, [baseline, cached], args.out)
+
+
+if __name__ == "__main__":
+    main()
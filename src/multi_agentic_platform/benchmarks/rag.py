@@ -0,0 +1,256 @@
+"""Offline RAG benchmark: ingest throughput, query latency, recall@k and memory per corpus size.
+
+Usage:
+    python -m multi_agentic_platform.benchmarks rag --sizes 10000,100000,1000000 --out rag.json
+    python -m multi_agentic_platform.benchmarks rag --sizes 1000000 --shards 1,2,4,8 --skip-recall
+    python -m multi_agentic_platform.benchmarks rag --sizes 100000 --storage float32,fp16,int8
+
+Embeddings come from a deterministic hashing embedder, reranking from a token-overlap stub and
+LLM reranking from `MockProvider`, so no models are downloaded. Each size runs in a fresh
+process so memory figures are not polluted by earlier sizes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+import time
+from typing import Any, Callable
+
+from multi_agentic_platform.benchmarks.corpus import SyntheticCorpus
+from multi_agentic_platform.benchmarks.report import (
+    argument_parser,
+    current_rss_bytes,
+    peak_rss_bytes,
+    write_report,
+)
+from multi_agentic_platform.benchmarks.stats import summarize_latencies
+from multi_agentic_platform.benchmarks.stubs import HashingEmbedder, ScoringStubReranker
+from multi_agentic_platform.rag.vector_store import create_store
+
+
+def _exact_top_k(
+    corpus: SyntheticCorpus, embedder: HashingEmbedder, query_vectors, k: int, retrieved
+):
+    """Brute-force search by re-generating and re-embedding the corpus in batches.
+
+    Streaming keeps the exact baseline from doubling memory. Returns, per query, the k-th best
+    exact score and the exact scores of the ids the index returned.
+    """
+    import numpy as np
+
+    from multi_agentic_platform.rag.chunking import chunk_text
+
+    num_queries = query_vectors.shape[0]
+    best = np.full((num_queries, k), -np.inf, dtype="float32")
+    wanted = [dict.fromkeys(ids) for ids in retrieved]
+    wanted_scores: list[dict[int, float]] = [{} for _ in range(num_queries)]
+    offset = 0
+    for batch in corpus.documents():
+        chunks = [
+            chunk
+            for _, content in batch
+            for chunk in chunk_text(content, corpus.chunk_size, corpus.chunk_overlap)
+        ]
+        if not chunks:
+            continue
+        scores = query_vectors @ embedder.encode(chunks).T
+        merged = np.concatenate([best, scores], axis=1)
+        keep = min(k, merged.shape[1])
+        best = -np.sort(-np.partition(merged, merged.shape[1] - keep, axis=1)[:, -keep:], axis=1)
+        for row, ids in enumerate(wanted):
+            for chunk_id in ids:
+                if offset <= chunk_id < offset + len(chunks):
+                    wanted_scores[row][chunk_id] = float(scores[row, chunk_id - offset])
+        offset += len(chunks)
+    return best[:, -1], wanted_scores
+
+
+def _recall(kth_scores, wanted_scores: list[dict[int, float]], k: int) -> float:
+    # Tie-aware: an id counts as a hit if its exact score reaches the k-th best exact score.
+    # Hashing embeddings produce many exact ties, so id-set overlap would under-report recall.
+    hits = [
+        sum(1 for score in scores.values() if score >= float(kth) - 1e-6) / k
+        for kth, scores in zip(kth_scores, wanted_scores)
+    ]
+    return round(sum(hits) / len(hits), 4) if hits else 0.0
+
+
+def _compare_layouts(
+    store, query_vectors, top_k: int, layouts: list[tuple[dict[str, Any], Callable[[int], Any]]]
+) -> list[dict[str, Any]]:
+    """Re-index the ingested vectors under each layout and time the same searches.
+
+    `store` must be the exact float32 index; its k-th best score per query is the bar for a
+    tie-aware recall of each layout's results.
+    """
+    vectors = store.vectors()
+    kth_scores = [store.search(vector, top_k=top_k)[-1].score for vector in query_vectors]
+    rows: list[dict[str, Any]] = []
+    for label, build in layouts:
+        candidate = build(vectors.shape[1])
+        candidate.add(vectors)
+        latencies: list[float] = []
+        hits = 0
+        for vector, kth in zip(query_vectors, kth_scores):
+            t0 = time.perf_counter()
+            found = candidate.search(vector, top_k=top_k)
+            latencies.append(time.perf_counter() - t0)
+            exact = vectors[[hit.chunk_id for hit in found]] @ vector
+            hits += int((exact >= kth - 1e-5).sum())
+        rows.append(
+            {
+                **label,
+                "search_latency": summarize_latencies(latencies),
+                "index_bytes": candidate.index_bytes,
+                "bytes_per_vector": round(candidate.index_bytes / max(candidate.size, 1), 1),
+                f"recall_at_{top_k}_vs_flat": round(hits / (top_k * len(kth_scores)), 4),
+            }
+        )
+        candidate.close()
+    base_p50 = rows[0]["search_latency"]["p50_ms"] if rows else 0
+    for row in rows:
+        p50 = row["search_latency"]["p50_ms"]
+        row["p50_speedup"] = round(base_p50 / p50, 2) if p50 else None
+    return rows
+
+
+def run_size(num_chunks: int, options: dict[str, Any]) -> dict[str, Any]:
+    from multi_agentic_platform.config import settings
+    from multi_agentic_platform.providers.mock import MockProvider
+    from multi_agentic_platform.rag.pipeline import RAGPipeline
+
+    corpus = SyntheticCorpus(
+        num_chunks,
+        chunk_size=settings.rag_chunk_size,
+        chunk_overlap=settings.rag_chunk_overlap,
+        seed=options["seed"],
+    )
+    embedder = HashingEmbedder(options["dim"])
+    pipeline = RAGPipeline(
+        rerank_with_agent_provider=MockProvider(),
+        embedder=embedder,
+        reranker=ScoringStubReranker(),
+    )
+    rss_before = current_rss_bytes()
+
+    started = time.perf_counter()
+    documents = 0
+    for batch in corpus.documents():
+        documents += pipeline.ingest_documents(batch)["documents"]
+    ingest_seconds = time.perf_counter() - started
+    rss_after_ingest = current_rss_bytes()
+
+    top_k = options["top_k"]
+    queries = corpus.queries(options["queries"])
+    query_vectors = embedder.encode(queries)
+    store = pipeline.store
+
+    search_latencies: list[float] = []
+    retrieved: list[list[int]] = []
+    for vector in query_vectors:
+        t0 = time.perf_counter()
+        hits = store.search(vector, top_k=top_k)
+        search_latencies.append(time.perf_counter() - t0)
+        retrieved.append([hit.chunk_id for hit in hits])
+
+    async def timed_queries(use_agent_reranker: bool, count: int) -> list[float]:
+        latencies: list[float] = []
+        for query in queries[:count]:
+            t0 = time.perf_counter()
+            await pipeline.query(query, top_k=top_k, use_agent_reranker=use_agent_reranker)
+            latencies.append(time.perf_counter() - t0)
+        return latencies
+
+    query_latencies = asyncio.run(timed_queries(False, len(queries)))
+    agent_latencies = asyncio.run(timed_queries(True, min(len(queries), options["agent_queries"])))
+
+    result: dict[str, Any] = {
+        "chunks": pipeline.indexed_chunks,
+        "documents": documents,
+        "ingest_seconds": round(ingest_seconds, 3),
+        "ingest_chunks_per_second": round(pipeline.indexed_chunks / ingest_seconds, 1),
+        "search_latency": summarize_latencies(search_latencies),
+        "query_latency": summarize_latencies(query_latencies),
+        "agent_rerank_query_latency": summarize_latencies(agent_latencies),
+        "rss_before_bytes": rss_before,
+        "rss_after_ingest_bytes": rss_after_ingest,
+        "index_rss_delta_bytes": rss_after_ingest - rss_before,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+    if options["shards"]:
+        result["shard_scaling"] = _compare_layouts(
+            store,
+            query_vectors,
+            top_k,
+            [
+                ({"shards": count}, functools.partial(create_store, num_shards=count))
+                for count in options["shards"]
+            ],
+        )
+    if options["storage"]:
+        result["storage_modes"] = _compare_layouts(
+            store,
+            query_vectors,
+            top_k,
+            [
+                (
+                    {"storage": mode, "exact_rescore": rescore},
+                    functools.partial(create_store, storage=mode, exact_rescore=rescore),
+                )
+                for mode in options["storage"]
+                for rescore in ((False,) if mode == "float32" else (False, True))
+            ],
+        )
+    if not options["skip_recall"]:
+        kth_scores, wanted_scores = _exact_top_k(corpus, embedder, query_vectors, top_k, retrieved)
+        result[f"recall_at_{top_k}"] = _recall(kth_scores, wanted_scores, top_k)
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated chunk counts.")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--agent-queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=128, help="Hashing embedder dimension.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--shards", default="", help="Comma-separated shard counts to compare, e.g. 1,2,4,8."
+    )
+    parser.add_argument(
+        "--storage",
+        default="",
+        help="Comma-separated vector storage modes to compare, e.g. float32,fp16,int8.",
+    )
+    parser.add_argument("--skip-recall", action="store_true", help="Skip the exact-search pass.")
+    parser.add_argument("--in-process", action="store_true", help="Run sizes in this process.")
+    parser.add_argument("--out", default="-", help="JSON output path ('-' for stdout).")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    options = {
+        "queries": args.queries,
+        "agent_queries": args.agent_queries,
+        "top_k": args.top_k,
+        "dim": args.dim,
+        "seed": args.seed,
+        "skip_recall": args.skip_recall,
+        "shards": [int(count) for count in args.shards.split(",") if count.strip()],
+        "storage": [mode.strip() for mode in args.storage.split(",") if mode.strip()],
+    }
+
+    results = []
+    for size in sizes:
+        if args.in_process:
+            results.append(run_size(size, options))
+            continue
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            results.append(pool.apply(run_size, (size, options)))
+    write_report("rag", {"sizes": sizes, **options}, results, args.out)
+
+
+if __name__ == "__main__":
+    main()
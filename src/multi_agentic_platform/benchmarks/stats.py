@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from multi_agentic_platform.metrics import percentile
+
+
+def summarize_latencies(samples: list[float]) -> dict[str, float]:
+    """Summarize latency samples given in seconds; reported values are milliseconds."""
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        "count": count,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+    }
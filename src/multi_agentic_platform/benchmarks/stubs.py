@@ -0,0 +1,128 @@
+"""Deterministic stand-ins for the downloaded models, so benchmarks run fully offline."""
+
+from __future__ import annotations
+
+import itertools
+import zlib
+
+from multi_agentic_platform.rag.reranker import Candidate
+
+
+def _tokens(text: str) -> list[str]:
+    return text.lower().split()
+
+
+class HashingEmbedder:
+    """Feature-hashing embedder with the `SentenceTransformerEmbedder.encode` contract.
+
+    Each token maps to a signed bucket derived from its CRC32, so vectors are identical across
+    processes and runs. Outputs are L2-normalized float32, like the real embedder.
+    """
+
+    _MAX_CACHED_TOKENS = 2_000_000
+
+    def __init__(self, dimension: int = 128) -> None:
+        self.dimension = dimension
+        # token -> signed (bucket + 1); the sign is the feature-hashing sign.
+        self._codes: dict[str, int] = {}
+
+    def _code(self, token: str) -> int:
+        digest = zlib.crc32(token.encode("utf-8"))
+        bucket = digest % self.dimension + 1
+        return bucket if digest & 0x80000000 else -bucket
+
+    def encode(self, texts: list[str]):
+        import numpy as np
+
+        token_lists = [_tokens(text) for text in texts]
+        flat = list(itertools.chain.from_iterable(token_lists))
+        if len(self._codes) > self._MAX_CACHED_TOKENS:
+            self._codes.clear()
+        for token in set(flat).difference(self._codes):
+            self._codes[token] = self._code(token)
+
+        codes = np.fromiter(map(self._codes.__getitem__, flat), dtype=np.int64, count=len(flat))
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), [len(t) for t in token_lists])
+        cells = rows * self.dimension + (np.abs(codes) - 1)
+        vectors = np.bincount(
+            cells, weights=np.sign(codes), minlength=len(texts) * self.dimension
+        ).reshape(len(texts), self.dimension).astype("float32")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def close(self) -> None:
+        self._codes.clear()
+
+
+class ScoringStubReranker:
+    """Token-overlap scorer with the `CrossEncoderReranker.rerank` contract."""
+
+    def rerank(self, query: str, candidates: list[Candidate], top_k: int = 5) -> list[Candidate]:
+        query_tokens = set(_tokens(query))
+
+        def score(candidate: Candidate) -> tuple[float, float]:
+            tokens = set(_tokens(candidate.text))
+            overlap = len(query_tokens & tokens) / (len(query_tokens | tokens) or 1)
+            return overlap, candidate.retrieval_score
+
+        return sorted(candidates, key=score, reverse=True)[:top_k]
+
+    def rerank_many(
+        self, requests: list[tuple[str, list[Candidate], int]]
+    ) -> list[list[Candidate]]:
+        return [self.rerank(query, candidates, top_k) for query, candidates, top_k in requests]
+
+    def close(self) -> None:
+        return None
+
+
+class StubWorkflowRAG:
+    """In-memory stand-in for `LangChainRAGService`, backed by a hashing embedder and FAISS."""
+
+    def __init__(self, embedder: HashingEmbedder) -> None:
+        from multi_agentic_platform.rag.vector_store import FaissStore
+
+        self._embedder = embedder
+        self._store = FaissStore(dimension=embedder.dimension)
+        self._chunks: list[tuple[str, str]] = []
+
+    def warmup(self) -> None:
+        """Nothing to load; present so the app's startup warmup can call it."""
+
+    def ingest_paths(self, paths: list[str]) -> dict[str, int]:
+        from multi_agentic_platform.rag.loaders import load_document
+
+        return self.ingest_documents([load_document(path) for path in paths])
+
+    def ingest_documents(self, docs: list[tuple[str, str]]) -> dict[str, int]:
+        from multi_agentic_platform.rag.chunking import chunk_text
+
+        chunks = [(source, chunk) for source, content in docs for chunk in chunk_text(content)]
+        if chunks:
+            self._store.add(self._embedder.encode([text for _, text in chunks]))
+            self._chunks.extend(chunks)
+        return {"documents": len(docs), "chunks": len(chunks), "index_size": len(self._chunks)}
+
+    def retrieve(self, query: str, top_k: int = 5):
+        return self.retrieve_batch([query], top_k=top_k)[0]
+
+    def retrieve_batch(self, queries: list[str], top_k: int = 5):
+        from multi_agentic_platform.workflow.langchain_rag import RetrievedContext
+
+        if not self._chunks:
+            return [[] for _ in queries]
+        results = []
+        for vector in self._embedder.encode(queries):
+            hits = self._store.search(vector, top_k=top_k)
+            results.append(
+                [
+                    RetrievedContext(
+                        source=self._chunks[hit.chunk_id][0],
+                        text=self._chunks[hit.chunk_id][1],
+                        score=hit.score,
+                    )
+                    for hit in hits
+                ]
+            )
+        return results
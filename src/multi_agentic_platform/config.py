@@ -10,16 +10,143 @@ class Settings(BaseSettings):
     hf_model: str = "Qwen/Qwen2.5-0.5B-Instruct"
     max_tokens: int = 800
     temperature: float = 0.2
+    # Memory budget for the HuggingFace provider's cached system-prompt KV state (0 disables it).
+    hf_prefix_cache_mb: int = 256
+    # Artificial MockProvider latency, used for load testing without a real model.
+    mock_latency_ms: float = 0.0
+    mock_latency_jitter_ms: float = 0.0
 
     rag_embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     rag_reranker_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     rag_chunk_size: int = 600
     rag_chunk_overlap: int = 120
+    # Multi-process mode: "standalone" (default), "writer" (owns ingestion and publishes index
+    # generations to rag_shared_index_dir) or "reader" (serves queries from the newest generation).
+    rag_index_role: str = "standalone"
+    rag_shared_index_dir: str = ".rag_index"
+    rag_shared_index_keep: int = 3
+    rag_shared_index_poll_seconds: float = 1.0
+    # Split the in-process index into this many shards searched in parallel (1 = single index).
+    rag_index_shards: int = 1
+    rag_shard_search_threads: int | None = None
+    # In-memory vector codes: "float32" (exact), "fp16" or "int8" (scalar-quantized). With
+    # rag_exact_rescore, quantized search shortlists rag_rescore_factor * top_k candidates and
+    # re-scores them against float32 vectors memory-mapped from <rag_rescore_path>/<collection>.f32
+    # (a temp file per collection when unset).
+    rag_vector_storage: str = "float32"
+    rag_exact_rescore: bool = True
+    rag_rescore_factor: int = 4
+    rag_rescore_path: str | None = None
+    # Ingested chunks whose estimated Jaccard similarity (MinHash over word 3-grams) with a stored
+    # chunk reaches rag_dedup_threshold are collapsed into it instead of being embedded and
+    # indexed again (0 disables).
+    rag_dedup_threshold: float = 0.9
+    rag_dedup_num_perm: int = 64
+    # Named collections beyond this estimated memory are spilled to snapshots under
+    # rag_collection_spill_dir (system temp dir when unset), least recently used first, and
+    # reloaded on their next request. 0 keeps every collection in memory.
+    rag_collection_memory_budget_mb: int = 1024
+    rag_collection_spill_dir: str | None = None
+    # Device for embedding/reranker models, e.g. "cpu" or "cuda"; None lets the library choose.
+    rag_model_device: str | None = None
+    # CPU inference backend per model: "torch", "torch-int8", "onnx" or "onnx-int8". ONNX exports
+    # are cached under model_cache_dir; onnx_quantization picks the int8 kernel target
+    # ("avx512_vnni", "avx512", "avx2" or "arm64").
+    rag_embedding_backend: str = "torch"
+    rag_reranker_backend: str = "torch"
+    model_cache_dir: str = ".model_cache"
+    onnx_quantization: str = "avx2"
+    # Intra-op threads for PyTorch and ONNX Runtime (None keeps the library default).
+    inference_threads: int | None = None
+    # Inputs are bucketed by length so each batch pads to at most this many characters in total.
+    inference_batch_chars: int = 16000
+    inference_max_batch_size: int = 64
+    # Cross-request micro-batching of query embeddings and cross-encoder reranking: concurrent
+    # /rag/query calls are collected for up to rag_batch_max_wait_ms (or rag_batch_max_size
+    # calls) and served by one model call off the event loop. rag_batch_max_size=1 disables it.
+    rag_batch_max_size: int = 32
+    rag_batch_max_wait_ms: float = 2.0
+    # Also load embedding/reranker models, FAISS and LangChain in the background warmup task
+    # (the LLM provider is always warmed). Off by default: they load on first RAG use instead.
+    model_warmup: bool = False
+    # Comma-separated warmup components GET /ready waits for ("provider", "embedding_model",
+    # "reranker_model", "rag_index", "workflow"). Others load in the background and their failures
+    # are reported without blocking readiness. Failed components are retried after
+    # warmup_retry_seconds, doubling up to 10 minutes (0 disables retries).
+    ready_components: str = "provider"
+    warmup_retry_seconds: float = 30.0
+
+    # Upper bound on workflow queries whose LLM nodes run at the same time in a batch run.
+    workflow_batch_concurrency: int = 8
+    # Listwise LLM reranking: candidates per prompt (0 = all in one prompt), distance between
+    # overlapping windows, concurrent window prompts and cached window rankings.
+    llm_rerank_window_size: int = 8
+    llm_rerank_window_stride: int = 4
+    llm_rerank_max_concurrency: int = 4
+    llm_rerank_cache_size: int = 1024
+    # Token budget per LLM call for retrieved context and resent drafts (0 disables packing).
+    context_token_budget: int = 2000
+    # Shortest shared text between two chunks that counts as overlap when packing context.
+    context_min_overlap_chars: int = 40
+
+    # Admission control per route pool: "agent" (/run, /workflow/run*), "ingest" (ingestion routes)
+    # and "query" (/rag/query). Each pool runs at most *_concurrency requests and queues *_queue
+    # more (0 concurrency disables its limit). Full queues answer 429; requests queued longer than
+    # admission_queue_timeout_seconds or past their X-Request-Deadline-Ms answer 503.
+    admission_enabled: bool = True
+    admission_agent_concurrency: int = 8
+    admission_agent_queue: int = 32
+    admission_ingest_concurrency: int = 2
+    admission_ingest_queue: int = 8
+    admission_query_concurrency: int = 64
+    admission_query_queue: int = 256
+    admission_queue_timeout_seconds: float = 10.0
+
+    # Prometheus text output is re-rendered at most once per interval.
+    metrics_render_interval_seconds: float = 1.0
+    # Always add a Server-Timing stage breakdown to responses (otherwise only on
+    # X-Timing-Breakdown).
+    metrics_timing_headers: bool = False
+
+    # Async job mode (POST /jobs/run, POST /jobs/workflow/run): submissions persist in a sqlite
+    # queue at jobs_db_path that jobs_workers tasks per process drain (0 = submit only). With the
+    # default of 2, every process starts its workers and creates jobs_db_path at startup. Running
+    # jobs whose heartbeat is older than jobs_lease_seconds are retried up to jobs_max_attempts
+    # times; finished jobs stay fetchable for jobs_result_ttl_seconds.
+    jobs_db_path: str = ".jobs/jobs.sqlite3"
+    jobs_workers: int = 2
+    jobs_max_attempts: int = 3
+    jobs_lease_seconds: float = 60.0
+    jobs_poll_interval_seconds: float = 1.0
+    jobs_result_ttl_seconds: float = 86400.0
+
+    # Request profiling, also switchable at runtime via POST /admin/profiling. Requests slower
+    # than profiling_threshold_ms keep a span tree, sampled stacks and (with profiling_allocations)
+    # tracemalloc stats in a ring buffer of the last profiling_buffer_size profiles.
+    profiling_enabled: bool = False
+    profiling_threshold_ms: float = 1000.0
+    profiling_sample_interval_ms: float = 5.0
+    profiling_allocations: bool = False
+    profiling_buffer_size: int = 50
+    profiling_top_allocations: int = 20
+    # /admin routes and the X-Profile header are disabled unless this is set; requests then need
+    # a matching X-Admin-Token header.
+    admin_token: str | None = None
 
     # Comma-separated list of MCP server names, e.g. "filesystem,github"
     mcp_server_names: str = ""
     # Per-server env vars expected pattern:
     # MAP_MCP_<NAME>_COMMAND, MAP_MCP_<NAME>_ARGS (space-separated args)
+    # Pooled MCP sessions are closed after this long without use.
+    mcp_idle_timeout_seconds: float = 300.0
+    mcp_health_check_interval_seconds: float = 30.0
+    mcp_startup_timeout_seconds: float = 30.0
+    # Cached tool catalogs expire after this TTL or on a tools/list_changed notification.
+    mcp_tools_cache_ttl_seconds: float = 60.0
+    # Tool calls: in-flight calls per server, per-call timeout and cap on returned content size.
+    mcp_max_concurrency_per_server: int = 4
+    mcp_call_timeout_seconds: float = 30.0
+    mcp_max_result_chars: int = 20000
 
 
 settings = Settings()
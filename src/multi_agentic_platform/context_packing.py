@@ -0,0 +1,217 @@
+"""Fit retrieved context into a per-call token budget before it reaches an LLM.
+
+`pack_context` removes duplicated and overlapping text (the chunker repeats `rag_chunk_overlap`
+characters between neighbouring chunks), keeps the highest-scored items that fit the budget,
+truncates the first item that does not fit and drops the rest. Token counts come from the target
+provider's tokenizer via `LLMProvider.count_tokens`.
+
+Savings are exported as Prometheus counters and, inside `track_context_tokens()`, accumulated
+per request so endpoints can report them.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from multi_agentic_platform.metrics import registry
+
+TokenCounter = Callable[[str], int]
+
+PROMPT_TOKENS = registry.counter(
+    "map_context_tokens_total", "Context tokens sent to the LLM after packing.", ("call",)
+)
+PROMPT_TOKENS_SAVED = registry.counter(
+    "map_context_tokens_saved_total", "Context tokens removed by packing.", ("call",)
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for providers without a tokenizer."""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class ContextItem:
+    text: str
+    score: float = 0.0
+    # Printed before the text but ignored when detecting overlap, e.g. "[handbook.pdf]".
+    header: str = ""
+
+    def render(self, text: str | None = None) -> str:
+        body = self.text if text is None else text
+        return f"{self.header} {body}" if self.header else body
+
+
+@dataclass
+class PackedItem:
+    index: int
+    text: str
+    truncated: bool = False
+
+
+@dataclass
+class PackResult:
+    items: list[PackedItem]
+    tokens_before: int
+    tokens_after: int
+    duplicates_removed: int = 0
+    dropped: int = 0
+    truncated: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_before - self.tokens_after)
+
+
+@dataclass
+class ContextTokenReport:
+    tokens: int = 0
+    tokens_saved: int = 0
+    saved_by_call: dict[str, int] = field(default_factory=dict)
+
+
+_request_report: ContextVar[ContextTokenReport | None] = ContextVar(
+    "map_context_token_report", default=None
+)
+
+
+@contextmanager
+def track_context_tokens() -> Iterator[ContextTokenReport]:
+    """Collect the tokens sent and saved by every packing call made inside the block."""
+    report = ContextTokenReport()
+    token = _request_report.set(report)
+    try:
+        yield report
+    finally:
+        _request_report.reset(token)
+
+
+def _record(call: str, tokens: int, saved: int) -> None:
+    PROMPT_TOKENS.inc(tokens, call=call)
+    PROMPT_TOKENS_SAVED.inc(saved, call=call)
+    report = _request_report.get()
+    if report is not None:
+        report.tokens += tokens
+        report.tokens_saved += saved
+        report.saved_by_call[call] = report.saved_by_call.get(call, 0) + saved
+
+
+def _overlap(left: str, right: str, min_chars: int) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right` (0 if < min_chars)."""
+    if min_chars <= 0 or len(left) < min_chars or len(right) < min_chars:
+        return 0
+    probe = right[:min_chars]
+    start = left.find(probe, max(0, len(left) - len(right)))
+    while start != -1:
+        if right.startswith(left[start:]):
+            return len(left) - start
+        start = left.find(probe, start + 1)
+    return 0
+
+
+def truncate_to_tokens(text: str, budget: int, count_tokens: TokenCounter) -> str:
+    """Longest prefix of `text`, cut at a word boundary, that fits in `budget` tokens."""
+    if budget <= 0:
+        return ""
+    if count_tokens(text) <= budget:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    cut = text[:low]
+    space = cut.rfind(" ")
+    return cut[:space] if space > len(cut) // 2 else cut
+
+
+def pack_context(
+    items: list[ContextItem],
+    budget: int | None,
+    count_tokens: TokenCounter = estimate_tokens,
+    min_overlap_chars: int = 40,
+    min_truncated_tokens: int = 32,
+    call: str = "context",
+) -> PackResult:
+    """Select and trim `items` so their rendered texts fit in `budget` tokens.
+
+    Items are considered best score first. Exact duplicates and items contained in an already
+    kept item are removed, and text overlapping a kept item is trimmed. Once the budget runs out,
+    the next item is truncated if at least `min_truncated_tokens` remain and everything scored
+    lower is dropped. The kept items are returned in their original order; `budget=None` only
+    deduplicates.
+    """
+    tokens_before = sum(count_tokens(item.render()) for item in items)
+    order = sorted(range(len(items)), key=lambda index: items[index].score, reverse=True)
+
+    kept: dict[int, str] = {}
+    truncated: set[int] = set()
+    duplicates = dropped = 0
+    used = 0
+    for position, index in enumerate(order):
+        text = items[index].text.strip()
+        for other in kept.values():
+            if text in other:
+                text = ""
+                break
+            if other in text:
+                continue
+            text = text[_overlap(other, text, min_overlap_chars) :].strip()
+            trim = _overlap(text, other, min_overlap_chars)
+            if trim:
+                text = text[:-trim].strip()
+        # Trimming against one kept item can leave text that another kept item contains.
+        if not text or any(text in other for other in kept.values()):
+            duplicates += 1
+            continue
+
+        cost = count_tokens(items[index].render(text))
+        if budget is None or used + cost <= budget:
+            kept[index] = text
+            used += cost
+            continue
+
+        remaining = budget - used - count_tokens(items[index].render(""))
+        if remaining >= min_truncated_tokens:
+            shortened = truncate_to_tokens(text, remaining, count_tokens)
+            if shortened:
+                kept[index] = shortened
+                truncated.add(index)
+                used += count_tokens(items[index].render(shortened))
+        dropped += len(order) - position - (index in kept)
+        break
+
+    packed = [
+        PackedItem(index=index, text=items[index].render(kept[index]), truncated=index in truncated)
+        for index in sorted(kept)
+    ]
+    tokens_after = sum(count_tokens(item.text) for item in packed)
+    result = PackResult(
+        items=packed,
+        tokens_before=tokens_before,
+        tokens_after=tokens_after,
+        duplicates_removed=duplicates,
+        dropped=dropped,
+        truncated=len(truncated),
+    )
+    _record(call, result.tokens_after, result.tokens_saved)
+    return result
+
+
+def fit_text(
+    text: str, budget: int | None, count_tokens: TokenCounter = estimate_tokens, call: str = "text"
+) -> str:
+    """Truncate one block of text to `budget` tokens, recording the tokens saved."""
+    before = count_tokens(text)
+    if budget is None or before <= budget:
+        _record(call, before, 0)
+        return text
+    fitted = truncate_to_tokens(text, budget, count_tokens)
+    after = count_tokens(fitted)
+    _record(call, after, before - after)
+    return fitted
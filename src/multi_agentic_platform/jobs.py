@@ -0,0 +1,406 @@
+"""Durable background jobs for long agent and workflow runs.
+
+`POST /jobs/run` and `POST /jobs/workflow/run` persist the request to a sqlite queue and answer
+immediately with a job id, so multi-call LLM chains no longer hold an HTTP connection open past
+gateway timeouts. A pool of workers in each process claims queued jobs, runs them and stores the
+result, which stays fetchable until `jobs_result_ttl_seconds` after the job finished.
+
+Running jobs are leased: their worker refreshes a heartbeat every third of `jobs_lease_seconds`.
+A job whose heartbeat stops (the process was killed or restarted) is queued again, up to
+`jobs_max_attempts` claims, and any process sharing the database may pick it up. On a graceful
+shutdown, running jobs are queued again immediately. Cancelling a queued job removes it from the
+queue; cancelling a running job cancels its task in whichever process runs it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from multi_agentic_platform.metrics import registry, track_stage
+
+JobHandler = Callable[[dict[str, Any]], Awaitable[dict[str, Any]]]
+
+STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+JOBS = registry.gauge("map_jobs", "Jobs in the durable queue by status.", ("status",))
+JOBS_FINISHED = registry.counter(
+    "map_jobs_finished_total", "Jobs finished by this process.", ("kind", "status")
+)
+JOBS_REQUEUED = registry.counter(
+    "map_jobs_requeued_total", "Interrupted jobs put back on the queue.", ("reason",)
+)
+JOB_QUEUE_WAIT_SECONDS = registry.histogram(
+    "map_job_queue_wait_seconds",
+    "Time from submission (or requeue) to a worker claiming the job.",
+    ("kind",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    queued_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_queued ON jobs (status, queued_at);
+CREATE INDEX IF NOT EXISTS jobs_expires ON jobs (expires_at);
+"""
+
+
+def _row(row: sqlite3.Row | None) -> dict[str, Any] | None:
+    if row is None:
+        return None
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+class JobStore:
+    """sqlite-backed job table. Safe to share between threads and between processes."""
+
+    def __init__(self, path: str | Path) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(path), isolation_level=None, check_same_thread=False, timeout=30.0
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL lets readers (status polls) proceed while a worker writes.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def submit(self, kind: str, payload: dict[str, Any]) -> dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, created_at, queued_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(payload), now, now),
+            )
+        job = self.get(job_id)
+        assert job is not None
+        return job
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (job_id, time.time()),
+            ).fetchone()
+        return _row(row)
+
+    def claim(self, worker: str, kinds: tuple[str, ...]) -> dict[str, Any] | None:
+        """Atomically move the oldest queued job of one of `kinds` to running for `worker`."""
+        now = time.time()
+        placeholders = ",".join("?" * len(kinds))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT id FROM jobs WHERE status = 'queued' AND kind IN ({placeholders}) "
+                    "ORDER BY queued_at LIMIT 1",
+                    kinds,
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, "
+                        "started_at = ?, heartbeat_at = ? WHERE id = ?",
+                        (worker, now, now, row["id"]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"]) if row is not None else None
+
+    def heartbeat(self, job_ids: list[str]) -> set[str]:
+        """Refresh the lease of running jobs; returns the ids whose cancellation was requested."""
+        if not job_ids:
+            return set()
+        placeholders = ",".join("?" * len(job_ids))
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' "
+                f"AND id IN ({placeholders})",
+                (time.time(), *job_ids),
+            )
+            rows = self._conn.execute(
+                f"SELECT id FROM jobs WHERE cancel_requested = 1 AND id IN ({placeholders})",
+                job_ids,
+            ).fetchall()
+        return {row["id"] for row in rows}
+
+    def finish(
+        self,
+        job_id: str,
+        worker: str,
+        status: str,
+        ttl_seconds: float,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Record the outcome unless the job was requeued or claimed by another worker meanwhile."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+                "expires_at = ? WHERE id = ? AND status = 'running' AND worker = ?",
+                (
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    now,
+                    now + ttl_seconds,
+                    job_id,
+                    worker,
+                ),
+            )
+
+    def cancel(self, job_id: str, ttl_seconds: float) -> dict[str, Any] | None:
+        """Cancel a queued job outright, or flag a running one for its worker to cancel."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ?, expires_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (now, now + ttl_seconds, job_id),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+        return self.get(job_id)
+
+    def requeue(self, job_ids: list[str]) -> None:
+        """Put jobs this process was running back on the queue (graceful shutdown)."""
+        if not job_ids:
+            return
+        placeholders = ",".join("?" * len(job_ids))
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET status = 'queued', worker = NULL, queued_at = ? "
+                f"WHERE status = 'running' AND id IN ({placeholders})",
+                (time.time(), *job_ids),
+            )
+
+    def requeue_stale(
+        self, lease_seconds: float, max_attempts: int, ttl_seconds: float
+    ) -> tuple[int, list[str]]:
+        """Requeue running jobs whose lease expired; fail those out of attempts.
+
+        Returns the number requeued and the kinds of the jobs failed.
+        """
+        now = time.time()
+        stale = now - lease_seconds
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # SELECT then UPDATE rather than UPDATE ... RETURNING, which needs SQLite 3.35.
+                exhausted = self._conn.execute(
+                    "SELECT id, kind FROM jobs "
+                    "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+                    (stale, max_attempts),
+                ).fetchall()
+                if exhausted:
+                    placeholders = ",".join("?" * len(exhausted))
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'failed', finished_at = ?, expires_at = ?, "
+                        f"error = 'Interrupted too many times.' WHERE id IN ({placeholders})",
+                        (now, now + ttl_seconds, *(row["id"] for row in exhausted)),
+                    )
+                failed = [row["kind"] for row in exhausted]
+                requeued = self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', worker = NULL, queued_at = ? "
+                    "WHERE status = 'running' AND heartbeat_at < ?",
+                    (now, stale),
+                ).rowcount
+                # A cancel requested while no worker held the job takes effect now.
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'cancelled', finished_at = ?, expires_at = ? "
+                    "WHERE status = 'queued' AND cancel_requested = 1",
+                    (now, now + ttl_seconds),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return requeued, failed
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS jobs FROM jobs GROUP BY status"
+            ).fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update({row["status"]: row["jobs"] for row in rows})
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """Worker pool running jobs from a `JobStore` with registered per-kind handlers."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        handlers: dict[str, JobHandler],
+        workers: int = 2,
+        result_ttl_seconds: float = 86400.0,
+        max_attempts: int = 3,
+        lease_seconds: float = 60.0,
+        poll_interval_seconds: float = 1.0,
+    ) -> None:
+        self.store = store
+        self.handlers = handlers
+        self.workers = workers
+        self.result_ttl = result_ttl_seconds
+        self.max_attempts = max_attempts
+        self.lease = lease_seconds
+        self.poll_interval = poll_interval_seconds
+        self._name = f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+        self._running: dict[str, asyncio.Task[dict[str, Any]]] = {}
+        self._tasks: list[asyncio.Task[None]] = []
+        self._wakeup: asyncio.Event | None = None
+
+    async def submit(self, kind: str, payload: dict[str, Any]) -> dict[str, Any]:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = await asyncio.to_thread(self.store.submit, kind, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> dict[str, Any] | None:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def cancel(self, job_id: str) -> dict[str, Any] | None:
+        job = await asyncio.to_thread(self.store.cancel, job_id, self.result_ttl)
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return job
+
+    async def stats(self) -> dict[str, Any]:
+        counts = await asyncio.to_thread(self.store.counts)
+        return {"counts": counts, "workers": self.workers, "running_here": len(self._running)}
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(index), name=f"job-worker-{index}")
+            for index in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._maintain(), name="job-maintenance"))
+
+    async def stop(self) -> None:
+        interrupted = list(self._running)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Hand unfinished work straight back instead of waiting for the lease to expire.
+        await asyncio.to_thread(self.store.requeue, interrupted)
+        if interrupted:
+            JOBS_REQUEUED.inc(len(interrupted), reason="shutdown")
+
+    async def _worker(self, index: int) -> None:
+        assert self._wakeup is not None
+        worker = f"{self._name}/{index}"
+        kinds = tuple(self.handlers)
+        while True:
+            # Cleared before claiming so a submit racing with an empty claim is not missed.
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim, worker, kinds)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: dict[str, Any]) -> None:
+        kind, job_id = job["kind"], job["id"]
+        JOB_QUEUE_WAIT_SECONDS.observe(max(0.0, job["started_at"] - job["queued_at"]), kind=kind)
+        task = asyncio.create_task(self.handlers[kind](job["payload"]))
+        self._running[job_id] = task
+        status, result, error = "failed", None, None
+        try:
+            with track_stage(f"job.{kind}"):
+                await asyncio.wait({task})
+            if task.cancelled():
+                status, error = "cancelled", "Cancelled while running."
+            elif task.exception() is not None:
+                exc = task.exception()
+                error = str(getattr(exc, "detail", None) or exc) or type(exc).__name__
+            else:
+                status, result = "succeeded", task.result()
+        except asyncio.CancelledError:
+            # The worker is stopping; stop() requeues the job.
+            task.cancel()
+            raise
+        finally:
+            self._running.pop(job_id, None)
+        await asyncio.to_thread(
+            self.store.finish, job_id, job["worker"], status, self.result_ttl, result, error
+        )
+        JOBS_FINISHED.inc(kind=kind, status=status)
+
+    async def _maintain(self) -> None:
+        """Heartbeat local jobs, apply remote cancellations, recover stale jobs, expire results."""
+        interval = max(0.05, self.lease / 3)
+        while True:
+            cancelled = await asyncio.to_thread(self.store.heartbeat, list(self._running))
+            for job_id in cancelled:
+                task = self._running.get(job_id)
+                if task is not None:
+                    task.cancel()
+            requeued, failed = await asyncio.to_thread(
+                self.store.requeue_stale, self.lease, self.max_attempts, self.result_ttl
+            )
+            if requeued:
+                JOBS_REQUEUED.inc(requeued, reason="lease_expired")
+                if self._wakeup is not None:
+                    self._wakeup.set()
+            for kind in failed:
+                JOBS_FINISHED.inc(kind=kind, status="failed")
+            await asyncio.to_thread(self.store.purge_expired)
+            for status, count in (await asyncio.to_thread(self.store.counts)).items():
+                JOBS.set(count, status=status)
+            await asyncio.sleep(interval)
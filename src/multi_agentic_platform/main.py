@@ -1,34 +1,185 @@
 from __future__ import annotations
 
 import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from pathlib import Path
+from typing import Callable
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 
+from multi_agentic_platform.admission import AdmissionController, AdmissionMiddleware, PoolLimit
 from multi_agentic_platform.config import settings
-from multi_agentic_platform.mcp import MCPServerConfig, MCPService
+from multi_agentic_platform.context_packing import track_context_tokens
+from multi_agentic_platform.jobs import JobQueue, JobStore
+from multi_agentic_platform.mcp import (
+    MCPServerConfig,
+    MCPService,
+    MCPSessionPool,
+    MCPToolCall,
+    MCPToolResult,
+)
+from multi_agentic_platform.metrics import MetricsMiddleware
+from multi_agentic_platform.metrics import registry as metrics_registry
+from multi_agentic_platform.model_registry import model_registry
 from multi_agentic_platform.orchestrator import Orchestrator
+from multi_agentic_platform.profiling import (
+    Profiler,
+    ProfilingConfig,
+    ProfilingMiddleware,
+    folded,
+    is_admin,
+)
+from multi_agentic_platform.rag.metadata import MetadataFilter
 from multi_agentic_platform.rag.pipeline import RAGPipeline
 from multi_agentic_platform.schemas import (
+    JobQueueStats,
+    JobStatus,
+    MCPBatchToolCallRequest,
+    MCPBatchToolCallResponse,
     MCPServerInfo,
+    MCPSessionStatus,
+    MCPToolCallRequest,
+    MCPToolCallResult,
     MCPToolsResponse,
+    MCPToolStats,
+    ProfileSummary,
+    ProfilingStatus,
+    ProfilingUpdate,
+    RAGCollectionInfo,
+    RAGIndexInfo,
     RAGIngestRequest,
     RAGIngestResponse,
     RAGIngestTextRequest,
+    RAGQueryFilter,
     RAGQueryRequest,
     RAGQueryResponse,
     RAGResult,
     RunRequest,
     RunResponse,
+    WorkflowBatchRunRequest,
+    WorkflowBatchRunResponse,
     WorkflowIngestRequest,
     WorkflowRunRequest,
     WorkflowRunResponse,
 )
+from multi_agentic_platform.startup import Lazy, WarmupTracker
 from multi_agentic_platform.workflow import CompanyWorkflow, LangChainRAGService
 
-app = FastAPI(title="Multi-Agentic Platform", version="0.3.0")
-orchestrator = Orchestrator()
+
+def _warmup_steps() -> list[tuple[str, Callable[[], object]]]:
+    steps: list[tuple[str, Callable[[], object]]] = [("provider", orchestrator.get)]
+    if settings.model_warmup:
+        device = settings.rag_model_device
+        steps += [
+            (
+                "embedding_model",
+                lambda: model_registry.warmup(
+                    [
+                        (
+                            "sentence-transformer",
+                            settings.rag_embedding_model,
+                            device,
+                            settings.rag_embedding_backend,
+                        )
+                    ]
+                ),
+            ),
+            (
+                "reranker_model",
+                lambda: model_registry.warmup(
+                    [
+                        (
+                            "cross-encoder",
+                            settings.rag_reranker_model,
+                            device,
+                            settings.rag_reranker_backend,
+                        )
+                    ]
+                ),
+            ),
+            ("rag_index", rag_service.warmup),
+            ("workflow", workflow_service.warmup),
+        ]
+    return steps
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Warm up in the background so the process answers /health immediately; /ready reports
+    # progress and turns 200 once the required components have loaded.
+    warmup_task = warmup.start(_warmup_steps())
+    if settings.jobs_workers > 0:
+        job_queue.get().start()
+    yield
+    warmup_task.cancel()
+    if job_queue.loaded:
+        await job_queue.get().stop()
+        job_queue.get().store.close()
+    rag_service.close()
+    await mcp_service.close()
+
+
+def _admission_controller() -> AdmissionController:
+    timeout = settings.admission_queue_timeout_seconds
+    return AdmissionController(
+        {
+            "agent": PoolLimit(
+                settings.admission_agent_concurrency, settings.admission_agent_queue, timeout
+            ),
+            "ingest": PoolLimit(
+                settings.admission_ingest_concurrency, settings.admission_ingest_queue, timeout
+            ),
+            "query": PoolLimit(
+                settings.admission_query_concurrency, settings.admission_query_queue, timeout
+            ),
+        }
+    )
+
+
+app = FastAPI(title="Multi-Agentic Platform", version="0.3.0", lifespan=lifespan)
+profiler = Profiler(
+    ProfilingConfig(
+        enabled=settings.profiling_enabled,
+        threshold_ms=settings.profiling_threshold_ms,
+        sample_interval_ms=settings.profiling_sample_interval_ms,
+        allocations=settings.profiling_allocations,
+        buffer_size=settings.profiling_buffer_size,
+        top_allocations=settings.profiling_top_allocations,
+    )
+)
+# Innermost, so profiles cover request handling rather than time queued for admission.
+app.add_middleware(ProfilingMiddleware, profiler=profiler, admin_token=settings.admin_token)
+admission = _admission_controller()
+if settings.admission_enabled:
+    app.add_middleware(AdmissionMiddleware, controller=admission)
+# Added last so it wraps admission control and also counts rejected requests.
+app.add_middleware(MetricsMiddleware, timing_headers=settings.metrics_timing_headers)
+# The planner's MCP lookups go through the gateway's pooled sessions.
+orchestrator: Lazy[Orchestrator] = Lazy(
+    lambda: Orchestrator(tools=lambda calls: mcp_service.run_tools(calls))
+)
+warmup = WarmupTracker(
+    required={name.strip() for name in settings.ready_components.split(",") if name.strip()}
+    or None,
+    retry_seconds=settings.warmup_retry_seconds,
+)
+
+
+def _metadata_filter(filters: RAGQueryFilter | None) -> MetadataFilter | None:
+    if filters is None:
+        return None
+    return MetadataFilter(
+        sources=filters.sources,
+        file_types=[file_type.lower().lstrip(".") for file_type in filters.file_types]
+        if filters.file_types is not None
+        else None,
+        tags=filters.tags,
+        ingested_after=filters.ingested_after.timestamp() if filters.ingested_after else None,
+        ingested_before=filters.ingested_before.timestamp() if filters.ingested_before else None,
+    )
 
 
 class RAGService:
@@ -38,7 +189,7 @@ class RAGService:
     def _get_pipeline(self) -> RAGPipeline:
         if self._pipeline is None:
             try:
-                self._pipeline = RAGPipeline(rerank_with_agent_provider=orchestrator.provider)
+                self._pipeline = RAGPipeline(rerank_with_agent_provider=orchestrator.get().provider)
             except ImportError as exc:
                 raise HTTPException(
                     status_code=500,
@@ -46,19 +197,76 @@ class RAGService:
                 ) from exc
         return self._pipeline
 
-    def ingest_paths(self, paths: list[str]) -> dict[str, int]:
-        return self._get_pipeline().ingest_paths(paths)
+    def warmup(self) -> None:
+        import faiss  # noqa: F401 - the first import is slow, so pay it here
 
-    def ingest_text_documents(self, documents: list[tuple[str, str]]) -> dict[str, int]:
-        return self._get_pipeline().ingest_documents(documents)
+        self._get_pipeline()
 
-    async def query(self, text: str, top_k: int, use_agent_reranker: bool) -> list[RAGResult]:
-        rows = await self._get_pipeline().query(
-            text=text,
-            top_k=top_k,
-            use_agent_reranker=use_agent_reranker,
-        )
-        return [RAGResult(chunk_id=row.chunk_id, source=row.source, text=row.text) for row in rows]
+    def close(self) -> None:
+        if self._pipeline is not None:
+            self._pipeline.close()
+            self._pipeline = None
+
+    def ingest_paths(
+        self, paths: list[str], tags: list[str] | None = None, collection: str = "default"
+    ) -> dict[str, int]:
+        try:
+            return self._get_pipeline().ingest_paths(paths, tags=tags, collection=collection)
+        except PermissionError as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+    def ingest_text_documents(
+        self,
+        documents: list[tuple[str, str]],
+        tags: list[str] | None = None,
+        collection: str = "default",
+    ) -> dict[str, int]:
+        try:
+            return self._get_pipeline().ingest_documents(
+                documents, tags=tags, collection=collection
+            )
+        except PermissionError as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+    def index_info(self) -> RAGIndexInfo:
+        return RAGIndexInfo(**self._get_pipeline().index_info())
+
+    def collections(self) -> list[RAGCollectionInfo]:
+        return [RAGCollectionInfo(**row) for row in self._get_pipeline().collections()]
+
+    async def query(
+        self,
+        text: str,
+        top_k: int,
+        use_agent_reranker: bool,
+        filters: RAGQueryFilter | None = None,
+        collection: str = "default",
+    ) -> list[RAGResult]:
+        try:
+            rows = await self._get_pipeline().query(
+                text=text,
+                top_k=top_k,
+                use_agent_reranker=use_agent_reranker,
+                filters=_metadata_filter(filters),
+                collection=collection,
+            )
+        except PermissionError as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+        return [
+            RAGResult(
+                chunk_id=row.chunk_id,
+                source=row.source,
+                text=row.text,
+                file_type=row.file_type,
+                tags=list(row.tags),
+                duplicate_sources=list(
+                    dict.fromkeys(
+                        alias.source for alias in row.aliases if alias.source != row.source
+                    )
+                ),
+            )
+            for row in rows
+        ]
 
 
 class WorkflowService:
@@ -79,9 +287,15 @@ class WorkflowService:
 
     def _get_workflow(self) -> CompanyWorkflow:
         if self._workflow is None:
-            self._workflow = CompanyWorkflow(provider=orchestrator.provider, rag_service=self._get_rag())
+            self._workflow = CompanyWorkflow(
+                provider=orchestrator.get().provider, rag_service=self._get_rag()
+            )
         return self._workflow
 
+    def warmup(self) -> None:
+        self._get_rag().warmup()
+        self._get_workflow()
+
     def ingest_paths(self, paths: list[str]) -> dict[str, int]:
         try:
             return self._get_rag().ingest_paths(paths)
@@ -95,6 +309,15 @@ class WorkflowService:
             raise HTTPException(status_code=500, detail=str(exc)) from exc
         return WorkflowRunResponse(**result)
 
+    async def run_batch(
+        self, queries: list[str], max_concurrency: int | None
+    ) -> WorkflowBatchRunResponse:
+        try:
+            result = await self._get_workflow().run_batch(queries, max_concurrency=max_concurrency)
+        except ImportError as exc:
+            raise HTTPException(status_code=500, detail=str(exc)) from exc
+        return WorkflowBatchRunResponse(**result)
+
 
 class MCPGatewayService:
     def __init__(self) -> None:
@@ -106,24 +329,109 @@ class MCPGatewayService:
             args_raw = os.getenv(f"MAP_MCP_{key}_ARGS", "")
             if command:
                 servers.append(MCPServerConfig(name=name, command=command, args=args_raw.split()))
-        self._service = MCPService(servers)
+        pool = MCPSessionPool(
+            servers,
+            idle_timeout=settings.mcp_idle_timeout_seconds,
+            health_check_interval=settings.mcp_health_check_interval_seconds,
+            tools_ttl=settings.mcp_tools_cache_ttl_seconds,
+            startup_timeout=settings.mcp_startup_timeout_seconds,
+        )
+        self._service = MCPService(
+            servers,
+            pool=pool,
+            max_concurrency_per_server=settings.mcp_max_concurrency_per_server,
+            call_timeout=settings.mcp_call_timeout_seconds,
+            max_result_chars=settings.mcp_max_result_chars,
+        )
 
     def servers(self) -> list[MCPServerInfo]:
         return [MCPServerInfo(**item) for item in self._service.configured_servers()]
 
+    def sessions(self) -> list[MCPSessionStatus]:
+        return [MCPSessionStatus(**item) for item in self._service.pool_status()]
+
+    def _require_server(self, server_name: str) -> None:
+        if server_name not in self._service.server_names():
+            raise HTTPException(status_code=404, detail=f"Unknown MCP server: {server_name}")
+
     async def list_tools(self, server_name: str) -> MCPToolsResponse:
+        self._require_server(server_name)
         try:
             tools = await self._service.list_tools(server_name)
-        except (ImportError, ValueError) as exc:
+        except (ImportError, ValueError, RuntimeError, TimeoutError) as exc:
             raise HTTPException(status_code=500, detail=str(exc)) from exc
         return MCPToolsResponse(server=server_name, tools=tools)
 
+    async def call_tool(
+        self, server_name: str, tool_name: str, request: MCPToolCallRequest
+    ) -> MCPToolCallResult:
+        self._require_server(server_name)
+        result = await self._service.call_tool(
+            server_name, tool_name, request.arguments, timeout=request.timeout_seconds
+        )
+        return MCPToolCallResult(**asdict(result))
+
+    async def call_tools(self, request: MCPBatchToolCallRequest) -> MCPBatchToolCallResponse:
+        started = time.perf_counter()
+        calls = [
+            MCPToolCall(server=c.server, tool=c.tool, arguments=c.arguments)
+            for c in request.calls
+        ]
+        results = await self._service.call_tools(calls, timeout=request.timeout_seconds)
+        return MCPBatchToolCallResponse(
+            results=[MCPToolCallResult(**asdict(result)) for result in results],
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+        )
+
+    async def run_tools(self, calls: list[MCPToolCall]) -> list[MCPToolResult]:
+        """Agent-facing batch call; failures are reported per result."""
+        return await self._service.call_tools(calls)
+
+    def tool_stats(self) -> list[MCPToolStats]:
+        return [MCPToolStats(**item) for item in self._service.tool_stats()]
+
+    async def close(self) -> None:
+        await self._service.close()
+
 
 rag_service = RAGService()
 workflow_service = WorkflowService()
 mcp_service = MCPGatewayService()
 
 
+async def _run_job(payload: dict[str, object]) -> dict[str, object]:
+    response = await (await orchestrator.aget()).run(RunRequest(**payload))
+    return response.model_dump(mode="json")
+
+
+async def _workflow_job(payload: dict[str, object]) -> dict[str, object]:
+    response = await workflow_service.run(str(payload["query"]))
+    return response.model_dump(mode="json")
+
+
+def _job_queue() -> JobQueue:
+    return JobQueue(
+        JobStore(settings.jobs_db_path),
+        {"run": _run_job, "workflow": _workflow_job},
+        workers=settings.jobs_workers,
+        result_ttl_seconds=settings.jobs_result_ttl_seconds,
+        max_attempts=settings.jobs_max_attempts,
+        lease_seconds=settings.jobs_lease_seconds,
+        poll_interval_seconds=settings.jobs_poll_interval_seconds,
+    )
+
+
+# Built lazily so importing the app does not create the queue database. Startup opens it
+# whenever jobs_workers > 0 (the default); with 0 it opens on the first /jobs request.
+job_queue: Lazy[JobQueue] = Lazy(_job_queue)
+
+
+def _job_status(job: dict[str, object] | None, job_id: str) -> JobStatus:
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired.")
+    return JobStatus(job_id=job["id"], **job)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home() -> str:
     return """
@@ -226,20 +534,102 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    return JSONResponse(
+        {"ready": warmup.ready, "components": warmup.snapshot()},
+        status_code=200 if warmup.ready else 503,
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def _require_admin(x_admin_token: str | None = Header(None)) -> None:
+    # Admin routes do not exist until an admin token is configured.
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required.")
+
+
+@app.get(
+    "/admin/profiling", response_model=ProfilingStatus, dependencies=[Depends(_require_admin)]
+)
+async def profiling_status() -> ProfilingStatus:
+    return ProfilingStatus(**profiler.status())
+
+
+@app.post(
+    "/admin/profiling", response_model=ProfilingStatus, dependencies=[Depends(_require_admin)]
+)
+async def profiling_configure(request: ProfilingUpdate) -> ProfilingStatus:
+    profiler.configure(**request.model_dump())
+    return ProfilingStatus(**profiler.status())
+
+
+@app.get(
+    "/admin/profiles", response_model=list[ProfileSummary], dependencies=[Depends(_require_admin)]
+)
+async def profiles() -> list[ProfileSummary]:
+    return [ProfileSummary(**profile) for profile in profiler.profiles()]
+
+
+@app.delete("/admin/profiles", dependencies=[Depends(_require_admin)])
+async def profiles_clear() -> dict[str, int]:
+    return {"cleared": profiler.clear()}
+
+
+@app.get("/admin/profiles/download", dependencies=[Depends(_require_admin)])
+async def profiles_download() -> JSONResponse:
+    return JSONResponse(
+        profiler.profiles(),
+        headers={"Content-Disposition": 'attachment; filename="profiles.json"'},
+    )
+
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(_require_admin)])
+async def profile_detail(profile_id: int) -> JSONResponse:
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found.")
+    return JSONResponse(profile)
+
+
+@app.get(
+    "/admin/profiles/{profile_id}/folded",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(_require_admin)],
+)
+async def profile_folded(profile_id: int) -> PlainTextResponse:
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found.")
+    return PlainTextResponse(folded(profile))
+
+
 @app.post("/run", response_model=RunResponse)
 async def run(request: RunRequest) -> RunResponse:
-    return await orchestrator.run(request)
+    return await (await orchestrator.aget()).run(request)
 
 
 @app.post("/rag/ingest", response_model=RAGIngestResponse)
 async def rag_ingest(request: RAGIngestRequest) -> RAGIngestResponse:
-    return RAGIngestResponse(**rag_service.ingest_paths(request.paths))
+    return RAGIngestResponse(
+        **rag_service.ingest_paths(request.paths, tags=request.tags, collection=request.collection)
+    )
 
 
 @app.post("/rag/ingest/text", response_model=RAGIngestResponse)
 async def rag_ingest_text(request: RAGIngestTextRequest) -> RAGIngestResponse:
     docs = [(doc.source, doc.content) for doc in request.documents]
-    return RAGIngestResponse(**rag_service.ingest_text_documents(docs))
+    return RAGIngestResponse(
+        **rag_service.ingest_text_documents(docs, tags=request.tags, collection=request.collection)
+    )
 
 
 @app.post("/rag/ingest/samples", response_model=RAGIngestResponse)
@@ -251,10 +641,32 @@ async def rag_ingest_samples() -> RAGIngestResponse:
     return RAGIngestResponse(**rag_service.ingest_paths(paths))
 
 
+@app.get("/rag/index", response_model=RAGIndexInfo)
+async def rag_index() -> RAGIndexInfo:
+    return rag_service.index_info()
+
+
+@app.get("/rag/collections", response_model=list[RAGCollectionInfo])
+async def rag_collections() -> list[RAGCollectionInfo]:
+    return rag_service.collections()
+
+
 @app.post("/rag/query", response_model=RAGQueryResponse)
 async def rag_query(request: RAGQueryRequest) -> RAGQueryResponse:
-    results = await rag_service.query(request.query, request.top_k, request.use_agent_reranker)
-    return RAGQueryResponse(query=request.query, results=results)
+    with track_context_tokens() as tokens:
+        results = await rag_service.query(
+            request.query,
+            request.top_k,
+            request.use_agent_reranker,
+            filters=request.filters,
+            collection=request.collection,
+        )
+    return RAGQueryResponse(
+        query=request.query,
+        results=results,
+        context_tokens=tokens.tokens,
+        context_tokens_saved=tokens.tokens_saved,
+    )
 
 
 @app.post("/workflow/ingest", response_model=RAGIngestResponse)
@@ -276,11 +688,65 @@ async def workflow_run(request: WorkflowRunRequest) -> WorkflowRunResponse:
     return await workflow_service.run(request.query)
 
 
+@app.post("/workflow/run/batch", response_model=WorkflowBatchRunResponse)
+async def workflow_run_batch(request: WorkflowBatchRunRequest) -> WorkflowBatchRunResponse:
+    return await workflow_service.run_batch(request.queries, request.max_concurrency)
+
+
+@app.post("/jobs/run", response_model=JobStatus, status_code=202)
+async def job_run(request: RunRequest) -> JobStatus:
+    job = await job_queue.get().submit("run", request.model_dump(mode="json"))
+    return _job_status(job, job["id"])
+
+
+@app.post("/jobs/workflow/run", response_model=JobStatus, status_code=202)
+async def job_workflow_run(request: WorkflowRunRequest) -> JobStatus:
+    job = await job_queue.get().submit("workflow", request.model_dump(mode="json"))
+    return _job_status(job, job["id"])
+
+
+@app.get("/jobs", response_model=JobQueueStats)
+async def jobs_stats() -> JobQueueStats:
+    return JobQueueStats(**await job_queue.get().stats())
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str) -> JobStatus:
+    return _job_status(await job_queue.get().get(job_id), job_id)
+
+
+@app.delete("/jobs/{job_id}", response_model=JobStatus)
+async def job_cancel(job_id: str) -> JobStatus:
+    return _job_status(await job_queue.get().cancel(job_id), job_id)
+
+
 @app.get("/mcp/servers", response_model=list[MCPServerInfo])
 async def mcp_servers() -> list[MCPServerInfo]:
     return mcp_service.servers()
 
 
+@app.get("/mcp/sessions", response_model=list[MCPSessionStatus])
+async def mcp_sessions() -> list[MCPSessionStatus]:
+    return mcp_service.sessions()
+
+
 @app.get("/mcp/servers/{server_name}/tools", response_model=MCPToolsResponse)
 async def mcp_server_tools(server_name: str) -> MCPToolsResponse:
     return await mcp_service.list_tools(server_name)
+
+
+@app.post("/mcp/servers/{server_name}/tools/{tool_name}/call", response_model=MCPToolCallResult)
+async def mcp_call_tool(
+    server_name: str, tool_name: str, request: MCPToolCallRequest
+) -> MCPToolCallResult:
+    return await mcp_service.call_tool(server_name, tool_name, request)
+
+
+@app.post("/mcp/tools/call", response_model=MCPBatchToolCallResponse)
+async def mcp_call_tools(request: MCPBatchToolCallRequest) -> MCPBatchToolCallResponse:
+    return await mcp_service.call_tools(request)
+
+
+@app.get("/mcp/tools/stats", response_model=list[MCPToolStats])
+async def mcp_tool_stats() -> list[MCPToolStats]:
+    return mcp_service.tool_stats()
@@ -1,3 +1,9 @@
-from multi_agentic_platform.mcp.service import MCPServerConfig, MCPService
+from multi_agentic_platform.mcp.pool import MCPSessionPool
+from multi_agentic_platform.mcp.service import (
+    MCPServerConfig,
+    MCPService,
+    MCPToolCall,
+    MCPToolResult,
+)
 
-__all__ = ["MCPServerConfig", "MCPService"]
+__all__ = ["MCPServerConfig", "MCPService", "MCPSessionPool", "MCPToolCall", "MCPToolResult"]
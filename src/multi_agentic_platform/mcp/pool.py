@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, TypeVar
+
+if TYPE_CHECKING:
+    from multi_agentic_platform.mcp.service import MCPServerConfig
+
+T = TypeVar("T")
+
+_TOOLS_CHANGED = "notifications/tools/list_changed"
+
+
+class _PooledSession:
+    """One long-lived stdio MCP session.
+
+    The stdio transport and ClientSession are async context managers that must be entered and
+    exited from the same task, so the session lives inside a dedicated background task that
+    holds them open until `close()` is called.
+    """
+
+    def __init__(self, config: MCPServerConfig, on_tools_changed: Callable[[str], None]) -> None:
+        self.config = config
+        self.session: Any = None
+        self.last_used = time.monotonic()
+        self._on_tools_changed = on_tools_changed
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._error: BaseException | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self, timeout: float) -> None:
+        try:
+            from mcp import ClientSession, StdioServerParameters
+            from mcp.client.stdio import stdio_client
+        except ImportError as exc:
+            raise ImportError("mcp package is required. Install: pip install mcp") from exc
+
+        params = StdioServerParameters(command=self.config.command, args=self.config.args)
+        self._task = asyncio.create_task(
+            self._run(stdio_client(params), ClientSession), name=f"mcp-session-{self.config.name}"
+        )
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise TimeoutError(f"MCP server {self.config.name} did not initialize in {timeout}s")
+        if self.session is None:
+            raise RuntimeError(f"MCP server {self.config.name} failed to start: {self._error}")
+
+    async def _run(self, transport: Any, session_cls: Any) -> None:
+        try:
+            async with transport as (read, write):
+                async with session_cls(read, write, message_handler=self._on_message) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as exc:  # noqa: BLE001 - surfaced through start()/alive
+            self._error = exc
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def _on_message(self, message: Any) -> None:
+        if getattr(getattr(message, "root", None), "method", None) == _TOOLS_CHANGED:
+            self._on_tools_changed(self.config.name)
+
+    async def ping(self, timeout: float) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=timeout)
+        except Exception:  # noqa: BLE001 - any failure means the session is unhealthy
+            return False
+        return True
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=5)
+        except (asyncio.TimeoutError, Exception):  # noqa: BLE001
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await self._task
+
+
+class MCPSessionPool:
+    """Keeps one initialized session per configured MCP server and caches tool catalogs.
+
+    Sessions start lazily, are restarted when they die or fail a health check, and are closed
+    after `idle_timeout` seconds without use. Tool catalogs are cached for `tools_ttl` seconds
+    and dropped early when the server sends `notifications/tools/list_changed`.
+    """
+
+    def __init__(
+        self,
+        servers: list[MCPServerConfig],
+        idle_timeout: float = 300.0,
+        health_check_interval: float = 30.0,
+        tools_ttl: float = 60.0,
+        startup_timeout: float = 30.0,
+    ) -> None:
+        self._configs = {server.name: server for server in servers}
+        self._idle_timeout = idle_timeout
+        self._health_check_interval = health_check_interval
+        self._tools_ttl = tools_ttl
+        self._startup_timeout = startup_timeout
+        self._sessions: dict[str, _PooledSession] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._tools_cache: dict[str, tuple[float, Any]] = {}
+        self._maintenance_task: asyncio.Task | None = None
+
+    def _config(self, server_name: str) -> MCPServerConfig:
+        config = self._configs.get(server_name)
+        if config is None:
+            raise ValueError(f"Unknown MCP server: {server_name}")
+        return config
+
+    def invalidate_tools(self, server_name: str) -> None:
+        self._tools_cache.pop(server_name, None)
+
+    async def _acquire(self, server_name: str) -> _PooledSession:
+        config = self._config(server_name)
+        pooled = self._sessions.get(server_name)
+        if pooled is not None and pooled.alive:
+            pooled.last_used = time.monotonic()
+            return pooled
+
+        lock = self._locks.setdefault(server_name, asyncio.Lock())
+        async with lock:
+            pooled = self._sessions.get(server_name)
+            if pooled is None or not pooled.alive:
+                if pooled is not None:
+                    await pooled.close()
+                self.invalidate_tools(server_name)
+                pooled = _PooledSession(config, on_tools_changed=self.invalidate_tools)
+                await pooled.start(self._startup_timeout)
+                self._sessions[server_name] = pooled
+            self._ensure_maintenance()
+        pooled.last_used = time.monotonic()
+        return pooled
+
+    async def run(
+        self,
+        server_name: str,
+        operation: Callable[[Any], Awaitable[T]],
+        retry_on_restart: bool = True,
+    ) -> T:
+        """Run `operation(session)` on the pooled session.
+
+        If the session dies mid-call it is restarted and, when `retry_on_restart` is set, the
+        operation is retried once. Non-idempotent callers should pass `retry_on_restart=False`.
+        """
+        pooled = await self._acquire(server_name)
+        try:
+            return await operation(pooled.session)
+        except Exception:
+            if pooled.alive or not retry_on_restart:
+                raise
+        pooled = await self._acquire(server_name)
+        return await operation(pooled.session)
+
+    async def list_tools(self, server_name: str) -> Any:
+        cached = self._tools_cache.get(server_name)
+        if cached is not None and time.monotonic() - cached[0] < self._tools_ttl:
+            return cached[1]
+
+        tools = await self.run(server_name, lambda session: session.list_tools())
+        self._tools_cache[server_name] = (time.monotonic(), tools)
+        return tools
+
+    def status(self) -> list[dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {
+                "name": name,
+                "alive": name in self._sessions and self._sessions[name].alive,
+                "idle_seconds": (
+                    round(now - self._sessions[name].last_used, 3)
+                    if name in self._sessions
+                    else None
+                ),
+                "tools_cached": name in self._tools_cache,
+            }
+            for name in self._configs
+        ]
+
+    def _ensure_maintenance(self) -> None:
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(
+                self._maintain(), name="mcp-pool-maintenance"
+            )
+
+    async def _maintain(self) -> None:
+        while self._sessions:
+            await asyncio.sleep(self._health_check_interval)
+            now = time.monotonic()
+            for name, pooled in list(self._sessions.items()):
+                idle = now - pooled.last_used >= self._idle_timeout
+                if idle or not await pooled.ping(timeout=self._health_check_interval):
+                    # Unhealthy sessions are dropped here and restarted on next use.
+                    self._sessions.pop(name, None)
+                    self.invalidate_tools(name)
+                    await pooled.close()
+
+    async def close(self) -> None:
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._maintenance_task
+            self._maintenance_task = None
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for pooled in sessions:
+            await pooled.close()
+        self._tools_cache.clear()
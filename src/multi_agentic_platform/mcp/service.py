@@ -1,8 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Any
 
+from multi_agentic_platform.mcp.pool import MCPSessionPool
+from multi_agentic_platform.metrics import percentile
+
 
 @dataclass
 class MCPServerConfig:
@@ -11,32 +18,106 @@ class MCPServerConfig:
     args: list[str]
 
 
+@dataclass
+class MCPToolCall:
+    server: str
+    tool: str
+    arguments: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class MCPToolResult:
+    server: str
+    tool: str
+    ok: bool
+    content: list[dict[str, Any]]
+    is_error: bool = False
+    error: str | None = None
+    truncated: bool = False
+    latency_ms: float = 0.0
+
+
+class _ToolLatency:
+    def __init__(self, window: int = 512) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool, timed_out: bool) -> None:
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        self.timeouts += 1 if timed_out else 0
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def snapshot(self) -> dict[str, float]:
+        ordered = sorted(self.recent)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "mean_ms": round(self.total / self.calls * 1000, 3) if self.calls else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+def _normalize_content(items: list[Any], max_chars: int) -> tuple[list[dict[str, Any]], bool]:
+    """Convert MCP content blocks to dicts, capping the total serialized size at `max_chars`."""
+    payload: list[dict[str, Any]] = []
+    remaining = max_chars
+    for item in items:
+        text = getattr(item, "text", None)
+        if isinstance(text, str):
+            block = {"type": getattr(item, "type", "text"), "text": text[:remaining]}
+            remaining -= len(block["text"])
+            payload.append(block)
+            if len(text) > len(block["text"]):
+                return payload, True
+        else:
+            block = item.model_dump(mode="json") if hasattr(item, "model_dump") else dict(item)
+            size = len(json.dumps(block))
+            if size > remaining:
+                return payload, True
+            remaining -= size
+            payload.append(block)
+    return payload, False
+
+
 class MCPService:
-    """Minimal MCP client service to list tools from configured MCP servers."""
+    """MCP client service backed by a pool of long-lived sessions to configured servers."""
 
-    def __init__(self, servers: list[MCPServerConfig]) -> None:
+    def __init__(
+        self,
+        servers: list[MCPServerConfig],
+        pool: MCPSessionPool | None = None,
+        max_concurrency_per_server: int = 4,
+        call_timeout: float = 30.0,
+        max_result_chars: int = 20_000,
+    ) -> None:
         self._servers = servers
+        self._pool = pool or MCPSessionPool(servers)
+        self._call_timeout = call_timeout
+        self._max_result_chars = max_result_chars
+        self._limits = {s.name: asyncio.Semaphore(max_concurrency_per_server) for s in servers}
+        self._stats: dict[tuple[str, str], _ToolLatency] = {}
+
+    def server_names(self) -> set[str]:
+        return set(self._limits)
 
     def configured_servers(self) -> list[dict[str, Any]]:
         return [{"name": s.name, "command": s.command, "args": s.args} for s in self._servers]
 
-    async def list_tools(self, server_name: str) -> list[dict[str, Any]]:
-        server = next((s for s in self._servers if s.name == server_name), None)
-        if server is None:
-            raise ValueError(f"Unknown MCP server: {server_name}")
-
-        try:
-            from mcp import ClientSession, StdioServerParameters
-            from mcp.client.stdio import stdio_client
-        except ImportError as exc:
-            raise ImportError("mcp package is required. Install: pip install mcp") from exc
-
-        params = StdioServerParameters(command=server.command, args=server.args)
+    def pool_status(self) -> list[dict[str, Any]]:
+        return self._pool.status()
 
-        async with stdio_client(params) as (read, write):
-            session = ClientSession(read, write)
-            await session.initialize()
-            tools = await session.list_tools()
+    async def list_tools(self, server_name: str) -> list[dict[str, Any]]:
+        tools = await self._pool.list_tools(server_name)
 
         # `tools` format depends on server/sdk version; normalize to dict list.
         payload: list[dict[str, Any]] = []
@@ -45,5 +126,97 @@ class MCPService:
             description = (
                 getattr(tool, "description", "") if not isinstance(tool, dict) else tool.get("description", "")
             )
-            payload.append({"name": name or "unknown", "description": description})
+            payload.append({"name": name or "unknown", "description": description or ""})
         return payload
+
+    async def call_tool(
+        self,
+        server_name: str,
+        tool_name: str,
+        arguments: dict[str, Any] | None = None,
+        timeout: float | None = None,
+    ) -> MCPToolResult:
+        """Invoke one tool over the pooled session. Failures are reported in the result.
+
+        Tools missing from the server's (cached) catalog are rejected without being called.
+        """
+        call = MCPToolCall(server=server_name, tool=tool_name, arguments=arguments or {})
+        return await self._invoke(call, timeout or self._call_timeout)
+
+    async def call_tools(
+        self, calls: list[MCPToolCall], timeout: float | None = None
+    ) -> list[MCPToolResult]:
+        """Run tool calls concurrently across servers; results keep the order of `calls`.
+
+        Total latency is bounded by the slowest call rather than the sum, subject to the
+        per-server concurrency limit.
+        """
+        deadline = timeout or self._call_timeout
+        return list(await asyncio.gather(*(self._invoke(call, deadline) for call in calls)))
+
+    async def _invoke(self, call: MCPToolCall, timeout: float) -> MCPToolResult:
+        started = time.perf_counter()
+        timed_out = False
+        known_tool = False
+        limit = self._limits.get(call.server)
+        try:
+            if limit is None:
+                raise ValueError(f"Unknown MCP server: {call.server}")
+
+            async def execute() -> Any:
+                nonlocal known_tool
+                catalog = await self.list_tools(call.server)
+                if not any(tool["name"] == call.tool for tool in catalog):
+                    raise ValueError(f"Unknown tool {call.tool!r} on MCP server {call.server}")
+                known_tool = True
+                async with limit:
+                    return await self._pool.run(
+                        call.server,
+                        lambda session: session.call_tool(call.tool, call.arguments),
+                        retry_on_restart=False,
+                    )
+
+            raw = await asyncio.wait_for(execute(), timeout=timeout)
+            content, truncated = _normalize_content(
+                list(getattr(raw, "content", []) or []), self._max_result_chars
+            )
+            is_error = bool(getattr(raw, "isError", False))
+            result = MCPToolResult(
+                server=call.server,
+                tool=call.tool,
+                ok=not is_error,
+                content=content,
+                is_error=is_error,
+                truncated=truncated,
+            )
+        except asyncio.TimeoutError:
+            timed_out = True
+            result = MCPToolResult(
+                server=call.server,
+                tool=call.tool,
+                ok=False,
+                content=[],
+                error=f"Tool call timed out after {timeout}s",
+            )
+        except Exception as exc:  # noqa: BLE001 - reported per call so batches never fail wholesale
+            result = MCPToolResult(
+                server=call.server, tool=call.tool, ok=False, content=[], error=str(exc)
+            )
+
+        elapsed = time.perf_counter() - started
+        result.latency_ms = round(elapsed * 1000, 3)
+        # Keyed by catalog tools only, so client-supplied names cannot grow the map.
+        if known_tool:
+            self._stats.setdefault((call.server, call.tool), _ToolLatency()).record(
+                elapsed, result.ok, timed_out
+            )
+        return result
+
+    def tool_stats(self) -> list[dict[str, Any]]:
+        return [
+            {"server": server, "tool": tool, **stats.snapshot()}
+            for (server, tool), stats in sorted(self._stats.items())
+        ]
+
+    async def close(self) -> None:
+        await self._pool.close()
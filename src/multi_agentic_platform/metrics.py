@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+from multi_agentic_platform.config import settings
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile (`pct` in 0-100) of already sorted samples; 0.0 when empty."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100 * len(sorted_samples)) - 1)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._buckets = tuple(sorted(buckets))
+        # Per label set: [non-cumulative bucket counts..., +Inf count], sum.
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = len(self._buckets)
+        for position, bound in enumerate(self._buckets):
+            if value <= bound:
+                index = position
+                break
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self._buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        lines = self.header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self._buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds process metrics and renders them in the Prometheus text exposition format.
+
+    Rendered output is cached for `render_interval` seconds so frequent scrapes stay cheap.
+    """
+
+    def __init__(self, render_interval: float = 1.0) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._render_interval = render_interval
+        self._rendered: tuple[float, str] | None = None
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        now = time.monotonic()
+        cached = self._rendered
+        if cached is not None and now - cached[0] < self._render_interval:
+            return cached[1]
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        text = "\n".join(lines) + "\n"
+        self._rendered = (now, text)
+        return text
+
+
+registry = MetricsRegistry(render_interval=settings.metrics_render_interval_seconds)
+
+STAGE_SECONDS = registry.histogram(
+    "map_stage_duration_seconds", "Time spent in an instrumented stage.", ("stage",)
+)
+STAGE_ERRORS = registry.counter(
+    "map_stage_errors_total", "Instrumented stages that raised an exception.", ("stage",)
+)
+HTTP_REQUESTS = registry.counter(
+    "map_http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+)
+HTTP_SECONDS = registry.histogram(
+    "map_http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+HTTP_IN_PROGRESS = registry.gauge("map_http_requests_in_progress", "HTTP requests in flight.")
+
+# Per-request list of (stage, seconds), set by the middleware when a breakdown is wanted.
+_request_timings: ContextVar[list[tuple[str, float]] | None] = ContextVar(
+    "map_request_timings", default=None
+)
+
+
+class Span:
+    """A timed stage and the stages it ran, recorded while a request is being profiled."""
+
+    __slots__ = ("name", "started", "duration", "failed", "children")
+
+    def __init__(self, name: str, started: float | None = None) -> None:
+        self.name = name
+        self.started = time.perf_counter() if started is None else started
+        self.duration: float | None = None
+        self.failed = False
+        self.children: list[Span] = []
+
+    def open(self, name: str) -> Span:
+        child = Span(name)
+        self.children.append(child)
+        return child
+
+    def close(self, duration: float, failed: bool = False) -> None:
+        self.duration = duration
+        self.failed = failed
+
+    def to_dict(self, origin: float | None = None) -> dict[str, Any]:
+        origin = self.started if origin is None else origin
+        return {
+            "name": self.name,
+            "start_ms": round((self.started - origin) * 1000, 3),
+            # Still open when the request finished, e.g. a batch the request gave up on.
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "failed": self.failed,
+            "children": [child.to_dict(origin) for child in self.children],
+        }
+
+
+# Innermost open span of the current request; None (the common case) unless it is profiled.
+_current_span: ContextVar[Span | None] = ContextVar("map_current_span", default=None)
+
+
+@contextmanager
+def span_tree(root: Span) -> Iterator[Span]:
+    """Record the stages run inside this block as a tree under `root`."""
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        _current_span.reset(token)
+
+
+def _record(stage: str, elapsed: float, failed: bool) -> None:
+    STAGE_SECONDS.observe(elapsed, stage=stage)
+    if failed:
+        STAGE_ERRORS.inc(stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, elapsed))
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """Time a block of code as `stage` in the stage histogram and the request breakdown."""
+    parent = _current_span.get()
+    span = token = None
+    if parent is not None:
+        span = parent.open(stage)
+        token = _current_span.set(span)
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        _record(stage, elapsed, failed)
+        if span is not None:
+            span.close(elapsed, failed)
+            _current_span.reset(token)
+
+
+class CapturedStages:
+    """Stages timed inside `capture_stages()`, to be replayed into the requests they served."""
+
+    __slots__ = ("timings", "root")
+
+    def __init__(self) -> None:
+        self.timings: list[tuple[str, float]] = []
+        self.root = Span("captured")
+
+
+@contextmanager
+def capture_stages() -> Iterator[CapturedStages]:
+    """Collect the stages timed inside the block, e.g. on a worker thread that serves several
+    requests at once, so `replay_stages` can add them to each of those requests."""
+    captured = CapturedStages()
+    token = _request_timings.set(captured.timings)
+    span_token = _current_span.set(captured.root)
+    try:
+        yield captured
+    finally:
+        _current_span.reset(span_token)
+        _request_timings.reset(token)
+
+
+def replay_stages(captured: CapturedStages) -> None:
+    """Add captured stages to the current request's breakdown and profile. The stage histogram
+    already observed them when they ran."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.extend(captured.timings)
+    span = _current_span.get()
+    if span is not None:
+        span.children.extend(captured.root.children)
+
+
+def timed(stage: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of `track_stage` for sync and async functions."""
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with track_stage(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with track_stage(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _server_timing(timings: list[tuple[str, float]]) -> str:
+    totals: dict[str, float] = {}
+    for stage, elapsed in timings:
+        totals[stage] = totals.get(stage, 0.0) + elapsed
+    return ", ".join(f"{stage};dur={elapsed * 1000:.2f}" for stage, elapsed in totals.items())
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording HTTP metrics and, on request, a `Server-Timing` breakdown.
+
+    The breakdown is added when `MAP_METRICS_TIMING_HEADERS` is enabled or the client sends
+    `X-Timing-Breakdown: 1`.
+    """
+
+    def __init__(self, app: Any, timing_headers: bool = False) -> None:
+        self.app = app
+        self.timing_headers = timing_headers
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        wants_breakdown = self.timing_headers or any(
+            name == b"x-timing-breakdown" and value not in (b"0", b"false")
+            for name, value in scope.get("headers", [])
+        )
+        timings: list[tuple[str, float]] | None = [] if wants_breakdown else None
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timings is not None:
+                    elapsed = time.perf_counter() - started
+                    value = _server_timing(timings + [("total", elapsed)])
+                    message = {
+                        **message,
+                        "headers": [
+                            *message.get("headers", []),
+                            (b"server-timing", value.encode()),
+                        ],
+                    }
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            _request_timings.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_SECONDS.observe(time.perf_counter() - started, method=method, route=route_path)
+            HTTP_REQUESTS.inc(method=method, route=route_path, status=str(status))
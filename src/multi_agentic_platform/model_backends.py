@@ -0,0 +1,186 @@
+"""CPU inference backends for the sentence-transformers embedding and cross-encoder models.
+
+Backends:
+    torch       PyTorch fp32 (the sentence-transformers default)
+    torch-int8  PyTorch with dynamic int8 quantization of the Linear layers
+    onnx        ONNX Runtime
+    onnx-int8   ONNX Runtime with a dynamically int8-quantized graph
+
+ONNX exports are written once to `<model_cache_dir>/<kind>/<model>/<backend>` and loaded from
+there afterwards, so only the first start pays for the conversion. ONNX needs the `onnx` extra
+(`pip install "multi-agentic-platform[onnx]"`): optimum with ONNX Runtime, and
+sentence-transformers>=3.2 (>=4 for cross-encoders).
+"""
+
+from __future__ import annotations
+
+import re
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
+
+from multi_agentic_platform.config import settings
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+# First sentence-transformers releases whose model classes accept backend="onnx".
+_ONNX_MIN_VERSION = {"sentence-transformer": (3, 2), "cross-encoder": (4, 0)}
+_ONNX_INSTALL_HINT = 'Install with: pip install "multi-agentic-platform[onnx]"'
+
+
+def _model_class(kind: str) -> Any:
+    try:
+        from sentence_transformers import CrossEncoder, SentenceTransformer
+    except ImportError as exc:
+        raise ImportError(
+            "sentence-transformers is required for embedding and reranking. "
+            "Install with: pip install sentence-transformers"
+        ) from exc
+    return CrossEncoder if kind == "cross-encoder" else SentenceTransformer
+
+
+def _export_dir(kind: str, name: str, backend: str) -> Path:
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "--", name)
+    return Path(settings.model_cache_dir) / kind / safe_name / backend
+
+
+def configure_threads(threads: int | None = None) -> None:
+    """Cap PyTorch intra-op threads; ONNX Runtime sessions get the same cap in `load_model`."""
+    threads = threads or settings.inference_threads
+    if not threads:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+
+
+def _onnx_model_kwargs(file_name: str | None = None) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {"provider": "CPUExecutionProvider"}
+    if file_name:
+        kwargs["file_name"] = file_name
+    if settings.inference_threads:
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = settings.inference_threads
+        options.inter_op_num_threads = 1
+        kwargs["session_options"] = options
+    return kwargs
+
+
+def _version_tuple(version: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in re.findall(r"\d+", version)[:2])
+
+
+def _check_onnx_support(kind: str) -> None:
+    minimum = _ONNX_MIN_VERSION[kind]
+    try:
+        installed = metadata.version("sentence-transformers")
+    except metadata.PackageNotFoundError:
+        installed = None
+    if installed is None or _version_tuple(installed) < minimum:
+        raise ImportError(
+            f"The ONNX backends for {kind} models need sentence-transformers>="
+            f"{'.'.join(map(str, minimum))} (found {installed or 'none'}). {_ONNX_INSTALL_HINT}"
+        )
+    try:
+        import onnxruntime  # noqa: F401
+        import optimum.onnxruntime  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            f"The ONNX backends need optimum and onnxruntime. {_ONNX_INSTALL_HINT}"
+        ) from exc
+
+
+def _load_onnx(kind: str, name: str, quantized: bool) -> Any:
+    _check_onnx_support(kind)
+    model_class = _model_class(kind)
+    export_dir = _export_dir(kind, name, "onnx")
+    exported = (export_dir / "onnx" / "model.onnx").exists()
+    if not exported:
+        # First use: sentence-transformers converts the checkpoint through optimum; keep the
+        # export so later starts load the graph directly.
+        model = model_class(name, device="cpu", backend="onnx", model_kwargs=_onnx_model_kwargs())
+        model.save_pretrained(str(export_dir))
+        if not quantized:
+            return model
+
+    if not quantized:
+        return model_class(
+            str(export_dir), device="cpu", backend="onnx", model_kwargs=_onnx_model_kwargs()
+        )
+
+    config = settings.onnx_quantization
+    file_name = f"onnx/model_qint8_{config}.onnx"
+    if not (export_dir / file_name).exists():
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        base = model_class(
+            str(export_dir), device="cpu", backend="onnx", model_kwargs=_onnx_model_kwargs()
+        )
+        export_dynamic_quantized_onnx_model(base, config, str(export_dir))
+    return model_class(
+        str(export_dir), device="cpu", backend="onnx", model_kwargs=_onnx_model_kwargs(file_name)
+    )
+
+
+def load_model(kind: str, name: str, device: str | None, backend: str = "torch") -> Any:
+    """Load a "sentence-transformer" or "cross-encoder" model on the requested backend."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend} (expected one of {BACKENDS})")
+
+    configure_threads()
+    if backend in {"onnx", "onnx-int8"}:
+        return _load_onnx(kind, name, quantized=backend == "onnx-int8")
+
+    if backend == "torch-int8":
+        device = "cpu"
+    model = _model_class(kind)(name, device=device)
+    if backend == "torch-int8":
+        import torch
+
+        # Dynamic quantization runs on CPU only, hence the forced device above.
+        inner = model.model if kind == "cross-encoder" else model
+        torch.quantization.quantize_dynamic(
+            inner, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+    return model
+
+
+def run_bucketed(texts: Sequence[str], run: Callable[[list[Any]], Any], items=None) -> Any:
+    """Apply `run` to length buckets of `items` (default `texts`) and restore the input order."""
+    import numpy as np
+
+    items = texts if items is None else items
+    outputs: list[Any] = [None] * len(items)
+    for bucket in length_buckets([len(text) for text in texts]):
+        for index, output in zip(bucket, run([items[index] for index in bucket]), strict=True):
+            outputs[index] = output
+    return np.asarray(outputs)
+
+
+def length_buckets(
+    lengths: Sequence[int],
+    max_batch_chars: int | None = None,
+    max_batch_size: int | None = None,
+) -> Iterator[list[int]]:
+    """Yield index batches of similar-length inputs.
+
+    Inputs are sorted by length and cut into batches whose padded size (longest input times
+    batch size) stays under `max_batch_chars`, so short texts run in large batches, long texts
+    in small ones, and little compute is spent on padding.
+    """
+    max_batch_chars = max_batch_chars or settings.inference_batch_chars
+    max_batch_size = max_batch_size or settings.inference_max_batch_size
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    batch: list[int] = []
+    for index in order:
+        longest = max(lengths[index], 1)
+        size = len(batch) + 1
+        if batch and (size > max_batch_size or longest * size > max_batch_chars):
+            yield batch
+            batch = []
+        batch.append(index)
+    if batch:
+        yield batch
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import gc
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from multi_agentic_platform.model_backends import load_model
+
+ModelLoader = Callable[[str, "str | None", str], Any]
+
+
+def _load_sentence_transformer(name: str, device: str | None, backend: str) -> Any:
+    return load_model("sentence-transformer", name, device, backend)
+
+
+def _load_cross_encoder(name: str, device: str | None, backend: str) -> Any:
+    return load_model("cross-encoder", name, device, backend)
+
+
+@dataclass(frozen=True)
+class ModelKey:
+    kind: str
+    name: str
+    device: str | None = None
+    backend: str = "torch"
+
+
+@dataclass
+class _Entry:
+    key: ModelKey
+    model: Any = None
+    refs: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ModelHandle:
+    """Shared reference to a registry model. The model loads on first access."""
+
+    def __init__(self, registry: ModelRegistry, entry: _Entry) -> None:
+        self._registry = registry
+        self._entry = entry
+        self._released = False
+
+    @property
+    def key(self) -> ModelKey:
+        return self._entry.key
+
+    @property
+    def loaded(self) -> bool:
+        return self._entry.model is not None
+
+    @property
+    def model(self) -> Any:
+        if self._released:
+            raise RuntimeError(f"Model handle for {self.key.name} was already released.")
+        return self._registry._materialize(self._entry)
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._registry._release(self._entry)
+
+
+class ModelRegistry:
+    """Process-wide cache of embedding/reranker models keyed by kind, name, device and backend."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[ModelKey, _Entry] = {}
+        self._loaders: dict[str, ModelLoader] = {
+            "sentence-transformer": _load_sentence_transformer,
+            "cross-encoder": _load_cross_encoder,
+        }
+
+    def register_loader(self, kind: str, loader: ModelLoader) -> None:
+        self._loaders[kind] = loader
+
+    def acquire(
+        self, kind: str, name: str, device: str | None = None, backend: str = "torch"
+    ) -> ModelHandle:
+        if kind not in self._loaders:
+            raise ValueError(f"Unknown model kind: {kind}")
+
+        key = ModelKey(kind=kind, name=name, device=device, backend=backend)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(key=key)
+                self._entries[key] = entry
+            entry.refs += 1
+        return ModelHandle(self, entry)
+
+    def warmup(self, specs: list[tuple[str, str, str | None, str]]) -> None:
+        """Load models ahead of first use. Warmed models stay pinned for the process lifetime.
+
+        Each spec is (kind, name, device, backend).
+        """
+        for kind, name, device, backend in specs:
+            self.acquire(kind, name, device, backend).model
+
+    def loaded_models(self) -> list[dict[str, Any]]:
+        with self._lock:
+            entries = list(self._entries.values())
+        return [
+            {
+                "kind": entry.key.kind,
+                "name": entry.key.name,
+                "device": entry.key.device,
+                "backend": entry.key.backend,
+                "refs": entry.refs,
+                "loaded": entry.model is not None,
+            }
+            for entry in entries
+        ]
+
+    def _materialize(self, entry: _Entry) -> Any:
+        model = entry.model
+        if model is not None:
+            return model
+
+        with entry.lock:
+            if entry.model is None:
+                loader = self._loaders[entry.key.kind]
+                entry.model = loader(entry.key.name, entry.key.device, entry.key.backend)
+            return entry.model
+
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            self._entries.pop(entry.key, None)
+        with entry.lock:
+            entry.model = None
+        gc.collect()
+
+
+model_registry = ModelRegistry()
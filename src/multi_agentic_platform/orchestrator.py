@@ -1,38 +1,65 @@
 import uuid
 
+from multi_agentic_platform.agents.base import ToolRunner
 from multi_agentic_platform.agents.presets import (
     create_coder,
     create_planner,
     create_reviewer,
 )
 from multi_agentic_platform.config import settings
+from multi_agentic_platform.mcp.service import MCPToolCall, MCPToolResult
 from multi_agentic_platform.providers.base import LLMProvider
-from multi_agentic_platform.providers.huggingface_provider import HuggingFaceProvider
 from multi_agentic_platform.providers.mock import MockProvider
-from multi_agentic_platform.providers.openai_provider import OpenAIProvider
 from multi_agentic_platform.schemas import AgentTrace, RunRequest, RunResponse
 from multi_agentic_platform.sandbox.executor import SandboxExecutor
 
 
 def _load_provider() -> LLMProvider:
+    # Provider modules pull in openai/tenacity/transformers, so import only the selected one.
     if settings.provider == "openai":
+        from multi_agentic_platform.providers.openai_provider import OpenAIProvider
+
         return OpenAIProvider()
     if settings.provider in {"hf", "huggingface"}:
+        from multi_agentic_platform.providers.huggingface_provider import HuggingFaceProvider
+
         return HuggingFaceProvider()
     return MockProvider()
 
 
+def _format_tool_results(results: list[MCPToolResult]) -> str:
+    lines = []
+    for result in results:
+        if result.ok:
+            text = "\n".join(str(block.get("text", block)) for block in result.content)
+        else:
+            text = f"error: {result.error or 'tool reported an error'}"
+        lines.append(f"[{result.server}.{result.tool}]\n{text}")
+    return "\n\n".join(lines)
+
+
 class Orchestrator:
-    def __init__(self) -> None:
+    def __init__(self, tools: ToolRunner | None = None) -> None:
         self.provider = _load_provider()
-        self.planner = create_planner(self.provider)
+        self.planner = create_planner(self.provider, tools=tools)
         self.coder = create_coder(self.provider)
         self.reviewer = create_reviewer(self.provider)
         self.sandbox = SandboxExecutor()
 
     async def run(self, request: RunRequest) -> RunResponse:
         request_id = str(uuid.uuid4())
-        plan = await self.planner.act(request.prompt)
+        planner_prompt = request.prompt
+        tool_traces: list[AgentTrace] = []
+        if request.tool_calls:
+            calls = [
+                MCPToolCall(server=call.server, tool=call.tool, arguments=call.arguments)
+                for call in request.tool_calls
+            ]
+            tool_output = _format_tool_results(await self.planner.lookup(calls))
+            planner_prompt = f"{request.prompt}\n\nTool results:\n{tool_output}"
+            tool_traces.append(AgentTrace(agent="tools", output=tool_output))
+
+        plan = await self.planner.act(planner_prompt)
         code_prompt = (
             f"User request:\n{request.prompt}\n\n"
             f"Target language: {request.language}\n\n"
@@ -41,6 +68,7 @@ class Orchestrator:
         code = await self.coder.act(code_prompt)
         review = None
         traces = [
+            *tool_traces,
             AgentTrace(agent=self.planner.name, output=plan),
             AgentTrace(agent=self.coder.name, output=code),
         ]
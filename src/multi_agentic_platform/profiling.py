@@ -0,0 +1,328 @@
+"""On-demand request profiling for diagnosing slow requests after the fact.
+
+Profiling is off by default and is switched on at runtime with `POST /admin/profiling`, or for a
+single request with the `X-Profile: 1` header. While it is on, each request gets:
+
+- a span tree of its `track_stage` stages (RAG pipeline, LLM providers, agents, workflow nodes,
+  sandbox), with start offsets and durations;
+- a sampling profile: a background thread samples every thread's stack each
+  `sample_interval_ms` and counts folded stacks (`a;b;c count`, the flame graph input format).
+  Samples are process-wide, so requests running concurrently see each other's stacks;
+- optionally, allocation stats from `tracemalloc`: traced-memory growth over the request and the
+  top live allocation sites when it finished.
+
+Requests slower than `threshold_ms` (and every `X-Profile` request) are kept in a ring buffer of
+the last `buffer_size` profiles, served by the `/admin/profiles` routes. When profiling is off, the
+cost is a flag check per request and a context variable lookup per stage.
+"""
+
+from __future__ import annotations
+
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any
+
+from multi_agentic_platform.metrics import Span, registry, span_tree
+
+PROFILES_CAPTURED = registry.counter(
+    "map_profiles_captured_total", "Request profiles stored in the ring buffer.", ("trigger",)
+)
+PROFILED_REQUESTS = registry.counter(
+    "map_profiled_requests_total", "Requests that ran with profiling on."
+)
+
+# Never profiled: the profiler's own routes and cheap probes.
+EXCLUDED_PREFIXES = ("/admin", "/metrics", "/health", "/ready")
+# Leaf frames of threads parked waiting for work; sampling them adds nothing but noise.
+_IDLE_FILES = frozenset({"threading.py", "queue.py", "selectors.py", "thread.py"})
+_MAX_STACK_DEPTH = 64
+_MAX_STACKS = 500
+
+
+@dataclass
+class ProfilingConfig:
+    enabled: bool = False
+    threshold_ms: float = 1000.0
+    sample_interval_ms: float = 5.0
+    allocations: bool = False
+    buffer_size: int = 50
+    top_allocations: int = 20
+
+
+def _fold(thread_name: str, frame: Any) -> str | None:
+    names: list[str] = []
+    while frame is not None and len(names) < _MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    if not names:
+        return None
+    names.append(thread_name)
+    return ";".join(reversed(names))
+
+
+class _Samples:
+    __slots__ = ("stacks", "count")
+
+    def __init__(self) -> None:
+        self.stacks: Counter[str] = Counter()
+        self.count = 0
+
+
+class StackSampler:
+    """One background thread sampling all thread stacks while any request is registered."""
+
+    def __init__(self) -> None:
+        self.interval = 0.005
+        # Registered samples and the thread each request was received on. Those threads are
+        # sampled even when idle: an event loop waiting in select means the request waits on I/O.
+        self._active: dict[_Samples, int] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def register(self, samples: _Samples, thread_ident: int) -> None:
+        with self._lock:
+            self._active[samples] = thread_ident
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="map-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def unregister(self, samples: _Samples) -> None:
+        with self._lock:
+            self._active.pop(samples, None)
+
+    def _sample(self, own: int, keep_idle: set[int]) -> list[str]:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            leaf = os.path.basename(frame.f_code.co_filename)
+            if ident not in keep_idle and leaf in _IDLE_FILES:
+                continue
+            stack = _fold(names.get(ident, f"thread-{ident}"), frame)
+            if stack is not None:
+                stacks.append(stack)
+        return stacks
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                targets = list(self._active)
+                keep_idle = set(self._active.values())
+            stacks = self._sample(own, keep_idle)
+            for samples in targets:
+                samples.count += 1
+                samples.stacks.update(stacks)
+            time.sleep(self.interval)
+
+
+class _Capture:
+    __slots__ = (
+        "id", "method", "path", "forced", "root", "samples", "wall_started", "traced_started"
+    )
+
+    def __init__(self, profile_id: int, method: str, path: str, forced: bool) -> None:
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.forced = forced
+        self.root = Span(f"{method} {path}")
+        self.samples = _Samples()
+        self.wall_started = time.time()
+        self.traced_started = (
+            tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        )
+
+
+class Profiler:
+    """Runtime-switchable request profiler with a bounded buffer of recent slow requests."""
+
+    def __init__(self, config: ProfilingConfig) -> None:
+        self.config = config
+        self.sampler = StackSampler()
+        self._profiles: deque[dict[str, Any]] = deque(maxlen=max(1, config.buffer_size))
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._tracing = False
+        self.configure()
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    def configure(self, **changes: Any) -> ProfilingConfig:
+        for name, value in changes.items():
+            if value is not None:
+                setattr(self.config, name, value)
+        self.sampler.interval = max(0.001, self.config.sample_interval_ms / 1000)
+        with self._lock:
+            if self._profiles.maxlen != max(1, self.config.buffer_size):
+                self._profiles = deque(self._profiles, maxlen=max(1, self.config.buffer_size))
+        # Only stop tracing this profiler started (not e.g. PYTHONTRACEMALLOC).
+        wants_tracing = self.config.enabled and self.config.allocations
+        if wants_tracing and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        elif not wants_tracing and self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+        return self.config
+
+    def begin(self, method: str, path: str, forced: bool = False) -> _Capture:
+        PROFILED_REQUESTS.inc()
+        capture = _Capture(next(self._ids), method, path, forced)
+        self.sampler.register(capture.samples, threading.get_ident())
+        return capture
+
+    def finish(self, capture: _Capture, status: int) -> dict[str, Any] | None:
+        """Close the capture and store its profile if it was slow or explicitly requested."""
+        self.sampler.unregister(capture.samples)
+        elapsed = time.perf_counter() - capture.root.started
+        capture.root.close(elapsed, status >= 500)
+        if not capture.forced and elapsed * 1000 < self.config.threshold_ms:
+            return None
+
+        profile: dict[str, Any] = {
+            "id": capture.id,
+            "method": capture.method,
+            "path": capture.path,
+            "status": status,
+            "started_at": capture.wall_started,
+            "duration_ms": round(elapsed * 1000, 3),
+            "trigger": "header" if capture.forced else "threshold",
+            "spans": capture.root.to_dict(),
+            "samples": {
+                "interval_ms": self.sampler.interval * 1000,
+                "count": capture.samples.count,
+                "stacks": dict(capture.samples.stacks.most_common(_MAX_STACKS)),
+            },
+            "allocations": self._allocations(capture),
+        }
+        with self._lock:
+            self._profiles.append(profile)
+        PROFILES_CAPTURED.inc(trigger=profile["trigger"])
+        return profile
+
+    def _allocations(self, capture: _Capture) -> dict[str, Any] | None:
+        if capture.traced_started is None or not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                # The sampler's own folded-stack strings.
+                tracemalloc.Filter(False, __file__),
+            )
+        )
+        return {
+            "traced_growth_bytes": current - capture.traced_started,
+            "traced_peak_bytes": peak,
+            "top_sites": [
+                {
+                    "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "bytes": stat.size,
+                    "blocks": stat.count,
+                }
+                for stat in snapshot.statistics("lineno")[: self.config.top_allocations]
+            ],
+        }
+
+    def profiles(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return list(self._profiles)
+
+    def get(self, profile_id: int) -> dict[str, Any] | None:
+        return next((profile for profile in self.profiles() if profile["id"] == profile_id), None)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._profiles)
+            self._profiles.clear()
+        return count
+
+    def status(self) -> dict[str, Any]:
+        return {**vars(self.config), "stored_profiles": len(self.profiles())}
+
+
+def folded(profile: dict[str, Any]) -> str:
+    """A profile's samples as folded stacks, one `frame;frame;frame count` line each."""
+    return "".join(f"{stack} {count}\n" for stack, count in profile["samples"]["stacks"].items())
+
+
+def is_admin(token: str | None, admin_token: str | None) -> bool:
+    """Whether `token` grants admin access; nothing does while no admin token is configured."""
+    if not admin_token or token is None:
+        return False
+    return hmac.compare_digest(token.encode(), admin_token.encode())
+
+
+def _header(scope: dict[str, Any], name: bytes) -> str | None:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1").strip()
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests while the profiler is on or `X-Profile` is sent.
+
+    `X-Profile` only takes effect alongside an `X-Admin-Token` matching `admin_token`, and is
+    ignored altogether when no token is configured. Requests profiled because of the header get an
+    `X-Profile-Id` response header.
+    """
+
+    def __init__(self, app: Any, profiler: Profiler, admin_token: str | None = None) -> None:
+        self.app = app
+        self.profiler = profiler
+        self.admin_token = admin_token
+
+    def _forced(self, scope: dict[str, Any]) -> bool:
+        if (_header(scope, b"x-profile") or "0").lower() in ("0", "false", ""):
+            return False
+        return is_admin(_header(scope, b"x-admin-token"), self.admin_token)
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path", "").startswith(EXCLUDED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        forced = self._forced(scope)
+        if not (forced or self.profiler.enabled):
+            await self.app(scope, receive, send)
+            return
+
+        capture = self.profiler.begin(scope.get("method", ""), scope.get("path", ""), forced)
+        status = 500
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if forced:
+                    message = {
+                        **message,
+                        "headers": [
+                            *message.get("headers", []),
+                            (b"x-profile-id", str(capture.id).encode()),
+                        ],
+                    }
+            await send(message)
+
+        try:
+            with span_tree(capture.root):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            self.profiler.finish(capture, status)
@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
 
+from multi_agentic_platform.context_packing import estimate_tokens
+
 
 class LLMProvider(ABC):
     @abstractmethod
     async def generate(self, system: str, prompt: str) -> str:
         raise NotImplementedError
+
+    def count_tokens(self, text: str) -> int:
+        """Token count of `text` for this provider's model; used to enforce context budgets."""
+        return estimate_tokens(text)
@@ -1,28 +1,88 @@
 from __future__ import annotations
 
+import copy
+
 from multi_agentic_platform.config import settings
+from multi_agentic_platform.metrics import timed, track_stage
 from multi_agentic_platform.providers.base import LLMProvider
+from multi_agentic_platform.providers.prefix_cache import PrefixKVCache
 
 
 class HuggingFaceProvider(LLMProvider):
-    """Local open-source model provider via transformers pipeline."""
+    """Local open-source model provider via transformers.
+
+    The key/value state of each system prompt is computed once and kept in a `PrefixKVCache`
+    (`hf_prefix_cache_mb`), so a call only prefills its user prompt. Set `prefix_cache` to None
+    to always run the full prompt.
+    """
 
     def __init__(self) -> None:
         model_name = settings.hf_model
         try:
-            from transformers import pipeline
+            from transformers import AutoModelForCausalLM, AutoTokenizer
         except ImportError as exc:
             raise ImportError("transformers is required. Install: pip install transformers") from exc
 
-        self._pipe = pipeline(
-            "text-generation",
-            model=model_name,
-            tokenizer=model_name,
-            device_map="auto",
+        self._tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self._model = AutoModelForCausalLM.from_pretrained(model_name, device_map="auto")
+        self._model.eval()
+        self.prefix_cache: PrefixKVCache | None = (
+            PrefixKVCache(settings.hf_prefix_cache_mb * 1024 * 1024)
+            if settings.hf_prefix_cache_mb > 0
+            else None
+        )
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False))
+
+    def _encode(self, text: str, special_tokens: bool):
+        ids = self._tokenizer(text, return_tensors="pt", add_special_tokens=special_tokens)
+        return ids["input_ids"].to(self._model.device)
+
+    def _prefix_state(self, prefix: str):
+        """Token ids and a private copy of the KV cache for `prefix`, or None without a cache."""
+        import torch
+        from transformers import DynamicCache
+
+        if self.prefix_cache is None:
+            return self._encode(prefix, True), None
+        cached = self.prefix_cache.get(prefix)
+        if cached is None:
+            prefix_ids = self._encode(prefix, True)
+            with track_stage("llm.huggingface.prefill"), torch.no_grad():
+                out = self._model(prefix_ids, past_key_values=DynamicCache(), use_cache=True)
+            self.prefix_cache.put(prefix, prefix_ids, out.past_key_values)
+            cached = (prefix_ids, out.past_key_values)
+        prefix_ids, cache = cached
+        # generate() appends to the cache in place; the stored entry must stay prefix-only.
+        return prefix_ids, copy.deepcopy(cache)
+
+    def complete(self, system: str, prompt: str, max_new_tokens: int | None = None) -> str:
+        import torch
+
+        # Prefix and suffix are tokenized separately so the prefix ids, and therefore its cached
+        # state, are identical for every prompt sharing the system message.
+        prefix_ids, past = self._prefix_state(f"System: {system}\n\n")
+        suffix_ids = self._encode(f"User: {prompt}\n\nAssistant:", False)
+        input_ids = torch.cat([prefix_ids, suffix_ids], dim=-1)
+        sampling = (
+            {"temperature": settings.temperature}
+            if settings.temperature > 0
+            else {"do_sample": False, "temperature": None, "top_p": None, "top_k": None}
         )
+        with torch.no_grad():
+            output = self._model.generate(
+                input_ids=input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                past_key_values=past,
+                max_new_tokens=max_new_tokens or settings.max_tokens,
+                pad_token_id=self._tokenizer.pad_token_id or self._tokenizer.eos_token_id,
+                **sampling,
+            )
+        return self._tokenizer.decode(
+            output[0, input_ids.shape[-1] :], skip_special_tokens=True
+        ).strip()
 
+    @timed("llm.huggingface")
     async def generate(self, system: str, prompt: str) -> str:
-        full_prompt = f"System: {system}\n\nUser: {prompt}\n\nAssistant:"
-        out = self._pipe(full_prompt, max_new_tokens=settings.max_tokens, temperature=settings.temperature)
-        text = out[0].get("generated_text", "")
-        return text[len(full_prompt) :].strip() if text.startswith(full_prompt) else text
+        return self.complete(system, prompt)
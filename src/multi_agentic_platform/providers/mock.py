@@ -1,8 +1,23 @@
+import asyncio
+import random
+
+from multi_agentic_platform.config import settings
+from multi_agentic_platform.metrics import timed
 from multi_agentic_platform.providers.base import LLMProvider
 
 
 class MockProvider(LLMProvider):
+    """Canned output with optional artificial latency (`MAP_MOCK_LATENCY_MS` +/- jitter)."""
+
+    def __init__(self, latency_ms: float | None = None, jitter_ms: float | None = None) -> None:
+        self._latency_ms = settings.mock_latency_ms if latency_ms is None else latency_ms
+        self._jitter_ms = settings.mock_latency_jitter_ms if jitter_ms is None else jitter_ms
+
+    @timed("llm.mock")
     async def generate(self, system: str, prompt: str) -> str:
+        if self._latency_ms > 0 or self._jitter_ms > 0:
+            delay = self._latency_ms + random.uniform(-self._jitter_ms, self._jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
         return (
             "# Mock output\n"
             "def example():\n"
@@ -2,15 +2,35 @@ from openai import AsyncOpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from multi_agentic_platform.config import settings
+from multi_agentic_platform.metrics import timed
 from multi_agentic_platform.providers.base import LLMProvider
 
 
+def _load_encoding(model: str):
+    """tiktoken encoding for `model`, or None when tiktoken is not installed."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
 class OpenAIProvider(LLMProvider):
     def __init__(self) -> None:
         if not settings.openai_api_key:
             raise ValueError("MAP_OPENAI_API_KEY is required for the OpenAI provider.")
         self._client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self._encoding = _load_encoding(settings.openai_model)
+
+    def count_tokens(self, text: str) -> int:
+        if self._encoding is None:
+            return super().count_tokens(text)
+        return len(self._encoding.encode(text, disallowed_special=()))
 
+    @timed("llm.openai")
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8))
     async def generate(self, system: str, prompt: str) -> str:
         response = await self._client.chat.completions.create(
@@ -0,0 +1,86 @@
+"""LRU cache of transformer key/value state for system-prompt prefixes.
+
+Agents and workflow nodes send the same few fixed system prompts with every call. The key/value
+tensors a causal model computes for those tokens depend only on the tokens themselves, so they can
+be computed once and reused: generation then only has to prefill the user prompt. Entries are
+evicted least-recently-used once their tensors exceed the memory budget.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any
+
+from multi_agentic_platform.metrics import registry
+
+PREFIX_CACHE_LOOKUPS = registry.counter(
+    "map_llm_prefix_cache_total", "System-prompt KV cache lookups by result.", ("result",)
+)
+PREFIX_CACHE_BYTES = registry.gauge(
+    "map_llm_prefix_cache_bytes", "Memory held by cached system-prompt KV state."
+)
+
+
+def kv_cache_nbytes(cache: Any) -> int:
+    """Bytes held by the tensors of a transformers KV cache (or nested tuples of tensors)."""
+    if cache is None:
+        return 0
+    if hasattr(cache, "element_size") and hasattr(cache, "numel"):
+        return cache.element_size() * cache.numel()
+    if isinstance(cache, (list, tuple)):
+        return sum(kv_cache_nbytes(item) for item in cache)
+    layers = getattr(cache, "layers", None)
+    if layers is not None:
+        return sum(
+            kv_cache_nbytes(getattr(layer, "keys", None))
+            + kv_cache_nbytes(getattr(layer, "values", None))
+            for layer in layers
+        )
+    return kv_cache_nbytes(getattr(cache, "key_cache", None)) + kv_cache_nbytes(
+        getattr(cache, "value_cache", None)
+    )
+
+
+class PrefixKVCache:
+    """Maps a prefix string to `(token_ids, kv_cache)`, bounded by total tensor bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, Any, int]] = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, prefix: str) -> tuple[Any, Any] | None:
+        entry = self._entries.get(prefix)
+        if entry is None:
+            PREFIX_CACHE_LOOKUPS.inc(result="miss")
+            return None
+        self._entries.move_to_end(prefix)
+        PREFIX_CACHE_LOOKUPS.inc(result="hit")
+        return entry[0], entry[1]
+
+    def put(self, prefix: str, token_ids: Any, cache: Any) -> None:
+        nbytes = kv_cache_nbytes(cache)
+        if nbytes > self.max_bytes:
+            # Would evict everything and still not fit; recompute it per call instead.
+            return
+        previous = self._entries.pop(prefix, None)
+        if previous is not None:
+            self._bytes -= previous[2]
+        self._entries[prefix] = (token_ids, cache, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+        PREFIX_CACHE_BYTES.set(self._bytes)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        PREFIX_CACHE_BYTES.set(0)
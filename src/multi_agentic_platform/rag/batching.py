@@ -0,0 +1,186 @@
+"""Cross-request micro-batching for the embedding and cross-encoder models.
+
+Concurrent `/rag/query` calls each need one query embedding and one rerank pass. Run one by one,
+the models spend most of their time on per-call overhead. `MicroBatcher` queues those calls, waits
+at most `max_wait_ms` for more to arrive (or until `max_batch_size` are queued), runs the whole
+batch as one forward pass on a dedicated thread and hands each caller its own result.
+
+While a batch is running, new calls keep queueing, so batches grow with load on their own. A call
+that arrives alone right after a batch of one runs immediately: traffic that looks serial gains
+nothing from waiting, so a lone client pays no batching delay.
+
+Stages timed inside `run` (e.g. `rag.embed`) are captured on the worker thread and replayed into
+every caller's request breakdown and profile, so they still show up in `Server-Timing` and
+in request profiles.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generic, Sequence, TypeVar
+
+from multi_agentic_platform.metrics import (
+    CapturedStages,
+    capture_stages,
+    registry,
+    replay_stages,
+    track_stage,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BATCH_SIZE = registry.histogram(
+    "map_batch_size",
+    "Requests served by one batched model call.",
+    ("batcher",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+BATCH_WAIT_SECONDS = registry.histogram(
+    "map_batch_wait_seconds",
+    "Time a request spent queued before its batch started.",
+    ("batcher",),
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+
+class _Pending(Generic[T, R]):
+    __slots__ = ("item", "future", "queued_at")
+
+    def __init__(self, item: T, future: asyncio.Future[tuple[R, CapturedStages]]) -> None:
+        self.item = item
+        self.future = future
+        self.queued_at = time.perf_counter()
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collect concurrent `submit` calls into batches for `run(items) -> results`.
+
+    `run` is called from a single worker thread, so the wrapped model never sees concurrent
+    calls. It must return one result per item, in order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[list[T]], Sequence[R]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.name = name
+        self._run = run
+        self._max_batch_size = max_batch_size
+        self._max_wait = max(0.0, max_wait_ms) / 1000
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"batch-{name}")
+        self._pending: list[_Pending[T, R]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._full: asyncio.Event | None = None
+        self._last_batch_size = 1
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        # First use, or the previous loop is gone (e.g. one asyncio.run per benchmark level).
+        self._loop = loop
+        self._pending = []
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        # The worker serves every caller, so it must not inherit the first caller's context
+        # (request timings, profiles).
+        self._worker = contextvars.Context().run(
+            loop.create_task, self._work(), name=f"batch-{self.name}"
+        )
+
+    async def submit(self, item: T) -> R:
+        self._ensure_worker()
+        assert self._wakeup is not None and self._full is not None
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[tuple[R, CapturedStages]] = loop.create_future()
+        self._pending.append(_Pending(item, future))
+        if len(self._pending) >= self._max_batch_size:
+            self._full.set()
+        self._wakeup.set()
+        with track_stage(f"batch.{self.name}"):
+            result, captured = await future
+            replay_stages(captured)
+        return result
+
+    async def _work(self) -> None:
+        assert self._wakeup is not None and self._full is not None
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self._pending:
+                    await self._fill()
+                    batch = self._pending[: self._max_batch_size]
+                    del self._pending[: self._max_batch_size]
+                    if len(self._pending) < self._max_batch_size:
+                        self._full.clear()
+                    # Callers that gave up (client disconnects, timeouts) are not computed.
+                    batch = [entry for entry in batch if not entry.future.done()]
+                    if batch:
+                        await self._dispatch(loop, batch)
+        finally:
+            for entry in self._pending:
+                entry.future.cancel()
+            self._pending = []
+
+    async def _fill(self) -> None:
+        """Wait until the batch is full or the oldest queued call has waited `max_wait`."""
+        assert self._full is not None
+        if len(self._pending) >= self._max_batch_size:
+            return
+        if len(self._pending) == 1 and self._last_batch_size == 1:
+            return
+        remaining = self._max_wait - (time.perf_counter() - self._pending[0].queued_at)
+        if remaining <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._full.wait(), remaining)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _dispatch(
+        self, loop: asyncio.AbstractEventLoop, batch: list[_Pending[T, R]]
+    ) -> None:
+        started = time.perf_counter()
+        self._last_batch_size = len(batch)
+        BATCH_SIZE.observe(len(batch), batcher=self.name)
+        for entry in batch:
+            BATCH_WAIT_SECONDS.observe(started - entry.queued_at, batcher=self.name)
+        try:
+            results, captured = await loop.run_in_executor(
+                self._executor, self._run_captured, [entry.item for entry in batch]
+            )
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Batcher {self.name} expected {len(batch)} results, got {len(results)}"
+                )
+        except Exception as exc:
+            for entry in batch:
+                if not entry.future.done():
+                    entry.future.set_exception(exc)
+            return
+        for entry, result in zip(batch, results):
+            if not entry.future.done():
+                entry.future.set_result((result, captured))
+
+    def _run_captured(self, items: list[T]) -> tuple[Sequence[R], CapturedStages]:
+        with capture_stages() as captured:
+            return self._run(items), captured
+
+    def close(self) -> None:
+        if self._worker is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._worker.cancel)
+        self._worker = None
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,311 @@
+"""Named RAG collections kept under a memory budget.
+
+Each collection has its own vector store, chunk records and metadata index, so teams' corpora are
+searched separately. `CollectionManager` keeps recently used collections resident and, when their
+estimated memory exceeds the budget, spills the least recently used ones to on-disk snapshots
+(the same layout as the shared index generations). A spilled collection is reloaded on its next
+ingest or query. Collections in use by a query or ingest are pinned and never spilled.
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from multi_agentic_platform.metrics import registry, track_stage
+from multi_agentic_platform.rag.dedup import NearDuplicateIndex
+from multi_agentic_platform.rag.metadata import ChunkAlias, ChunkRecord, MetadataIndex
+from multi_agentic_platform.rag.shared_index import IndexGeneration, IndexPublisher
+
+DEFAULT_COLLECTION = "default"
+
+# Rough per-chunk cost of a ChunkRecord and its list slot, on top of the text itself.
+_CHUNK_OVERHEAD_BYTES = 200
+
+RESIDENT_COLLECTIONS = registry.gauge(
+    "map_rag_collections_resident", "RAG collections held in memory."
+)
+RESIDENT_BYTES = registry.gauge(
+    "map_rag_collections_resident_bytes", "Estimated memory of the resident RAG collections."
+)
+COLLECTION_SPILLS = registry.counter(
+    "map_rag_collection_spills_total", "RAG collections evicted to disk."
+)
+COLLECTION_LOADS = registry.counter(
+    "map_rag_collection_loads_total", "Spilled RAG collections reloaded from disk."
+)
+
+
+class RAGCollection:
+    """Vector store, chunk records and metadata index of one collection."""
+
+    def __init__(self, name: str, new_store: Callable[[int, str], Any]) -> None:
+        self.name = name
+        self._new_store = new_store
+        self.store: Any = None
+        self.chunks: list[ChunkRecord] = []
+        self.metadata = MetadataIndex()
+        # True when the in-memory state differs from the last snapshot on disk.
+        self.dirty = False
+        self._text_bytes = 0
+        self._pins = 0
+        self._dedup: NearDuplicateIndex | None = None
+
+    @property
+    def size(self) -> int:
+        return self.store.size if self.store is not None else 0
+
+    @property
+    def memory_bytes(self) -> int:
+        index_bytes = self.store.index_bytes if self.store is not None else 0
+        dedup_bytes = self._dedup.memory_bytes if self._dedup is not None else 0
+        return (
+            index_bytes
+            + dedup_bytes
+            + self._text_bytes
+            + _CHUNK_OVERHEAD_BYTES * len(self.chunks)
+        )
+
+    def dedup_index(self, threshold: float, num_perm: int) -> NearDuplicateIndex:
+        """Near-duplicate index over the stored chunks, rebuilt after a reload."""
+        dedup = self._dedup
+        if dedup is None or dedup.threshold != threshold or dedup.num_perm != num_perm:
+            dedup = NearDuplicateIndex(threshold=threshold, num_perm=num_perm)
+            for chunk in self.chunks:
+                dedup.add(chunk.chunk_id, dedup.signature(chunk.text))
+            self._dedup = dedup
+        return dedup
+
+    def invalidate_dedup(self) -> None:
+        """Drop the near-duplicate index, e.g. after an ingest failed part-way."""
+        self._dedup = None
+
+    def add_alias(self, chunk_id: int, alias: ChunkAlias) -> None:
+        """Record that `alias` contained a near-duplicate of chunk `chunk_id`."""
+        record = self.chunks[chunk_id]
+        own = ChunkAlias(record.source, record.file_type, record.tags)
+        if alias == own or alias in record.aliases:
+            return
+        record.aliases += (alias,)
+        self.metadata.add_alias(chunk_id, alias)
+        self.dirty = True
+
+    def add(
+        self,
+        embeddings,
+        texts: list[str],
+        source: str,
+        file_type: str,
+        ingested_at: float,
+        tags: tuple[str, ...],
+    ) -> None:
+        if self.store is None:
+            self.store = self._new_store(int(embeddings.shape[1]), self.name)
+        self.store.add(embeddings)
+        self.metadata.add(len(self.chunks), len(texts), source, file_type, ingested_at, tags)
+        for text in texts:
+            self.chunks.append(
+                ChunkRecord(
+                    chunk_id=len(self.chunks),
+                    source=source,
+                    text=text,
+                    file_type=file_type,
+                    ingested_at=ingested_at,
+                    tags=tags,
+                )
+            )
+            self._text_bytes += len(text.encode("utf-8"))
+        self.dirty = True
+
+    def restore(self, generation: IndexGeneration | None) -> None:
+        """Replace the contents with a snapshot or published generation."""
+        if generation is None or generation.size == 0:
+            return
+        import numpy as np
+
+        vectors = np.asarray(generation.store.vectors())
+        if self.store is not None:
+            self.store.close()
+        self.store = self._new_store(int(vectors.shape[1]), self.name)
+        self.store.add(vectors)
+        self.chunks = [generation.chunk(chunk_id) for chunk_id in range(generation.size)]
+        self.metadata = MetadataIndex.from_records(self.chunks)
+        self._text_bytes = sum(len(chunk.text.encode("utf-8")) for chunk in self.chunks)
+        self._dedup = None
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+        self.store = None
+        self.chunks = []
+        self.metadata = MetadataIndex()
+        self._text_bytes = 0
+        self._dedup = None
+
+
+class CollectionManager:
+    """Keeps the most recently used collections within `memory_budget_bytes`.
+
+    `memory_budget_bytes=None` keeps everything resident. Snapshots go to a fresh temporary
+    directory under `spill_dir` (the system temp dir when unset) that is removed on `close()`.
+    """
+
+    def __init__(
+        self,
+        new_store: Callable[[int, str], Any],
+        memory_budget_bytes: int | None = None,
+        spill_dir: str | None = None,
+    ) -> None:
+        self._new_store = new_store
+        self._budget = memory_budget_bytes
+        self._spill_parent = spill_dir
+        self._spill_root: Path | None = None
+        self._resident: OrderedDict[str, RAGCollection] = OrderedDict()
+        # Spilled collection name -> chunk count.
+        self._spilled: dict[str, int] = {}
+        self._lock = threading.RLock()
+        # Serialises reloads of each spilled collection without holding `_lock`.
+        self._load_locks: dict[str, threading.Lock] = {}
+
+    def _snapshot_dir(self, name: str) -> Path:
+        if self._spill_root is None:
+            if self._spill_parent:
+                Path(self._spill_parent).mkdir(parents=True, exist_ok=True)
+            self._spill_root = Path(
+                tempfile.mkdtemp(prefix="rag-collections-", dir=self._spill_parent)
+            )
+        return self._spill_root / name
+
+    def add(self, collection: RAGCollection) -> None:
+        with self._lock:
+            self._resident[collection.name] = collection
+            self._spilled.pop(collection.name, None)
+            self._enforce_budget()
+
+    def get(self, name: str) -> RAGCollection | None:
+        """Return a resident collection without loading or pinning it."""
+        with self._lock:
+            return self._resident.get(name)
+
+    @contextmanager
+    def use(self, name: str, create: bool = False) -> Iterator[RAGCollection | None]:
+        """Pin `name` in memory for the duration of the block, loading it if it was spilled.
+
+        Yields None when the collection does not exist and `create` is False.
+        """
+        collection = self._pin(name, create)
+        try:
+            yield collection
+        finally:
+            if collection is not None:
+                with self._lock:
+                    collection._pins -= 1
+                    self._enforce_budget()
+
+    def _pin(self, name: str, create: bool) -> RAGCollection | None:
+        while True:
+            with self._lock:
+                collection = self._resident.get(name)
+                if collection is None and name not in self._spilled:
+                    if not create:
+                        return None
+                    collection = RAGCollection(name, self._new_store)
+                    self._resident[name] = collection
+                if collection is not None:
+                    self._resident.move_to_end(name)
+                    collection._pins += 1
+                    return collection
+                load_lock = self._load_locks.setdefault(name, threading.Lock())
+            # Loading reads the whole snapshot, so it runs outside the manager lock: other
+            # collections stay usable meanwhile, and callers of `name` wait for a single load.
+            with load_lock:
+                with self._lock:
+                    if name not in self._spilled:
+                        # Loaded (or replaced) while this caller waited; pin that instead.
+                        continue
+                loaded = self._load(name)
+                with self._lock:
+                    if name in self._spilled:
+                        del self._spilled[name]
+                        self._resident[name] = loaded
+                        self._resident.move_to_end(name)
+                        loaded._pins += 1
+                        COLLECTION_LOADS.inc()
+                        return loaded
+                loaded.close()
+
+    def _load(self, name: str) -> RAGCollection:
+        with track_stage("rag.collection_load"):
+            collection = RAGCollection(name, self._new_store)
+            collection.restore(IndexPublisher(self._snapshot_dir(name), keep=1).latest())
+        return collection
+
+    def _spill(self, collection: RAGCollection) -> None:
+        with track_stage("rag.collection_spill"):
+            path = self._snapshot_dir(collection.name)
+            # An unchanged collection already has a current snapshot from its last spill.
+            if collection.dirty or not path.exists():
+                if collection.store is not None:
+                    vectors = collection.store.vectors()
+                    IndexPublisher(path, keep=1).publish(vectors, collection.chunks)
+                else:
+                    path.mkdir(parents=True, exist_ok=True)
+            self._spilled[collection.name] = len(collection.chunks)
+            del self._resident[collection.name]
+            collection.close()
+        COLLECTION_SPILLS.inc()
+
+    def _enforce_budget(self) -> None:
+        if self._budget is not None:
+            total = sum(collection.memory_bytes for collection in self._resident.values())
+            # The most recently used collection stays resident even if it alone exceeds the
+            # budget, so a single large collection is not reloaded on every request.
+            for collection in list(self._resident.values())[:-1]:
+                if total <= self._budget:
+                    break
+                if collection._pins:
+                    continue
+                total -= collection.memory_bytes
+                self._spill(collection)
+        RESIDENT_COLLECTIONS.set(len(self._resident))
+        RESIDENT_BYTES.set(sum(collection.memory_bytes for collection in self._resident.values()))
+
+    def chunk_count(self, name: str) -> int:
+        """Chunks stored in `name`, whether it is resident or spilled, without loading it."""
+        with self._lock:
+            collection = self._resident.get(name)
+            if collection is not None:
+                return len(collection.chunks)
+            return self._spilled.get(name, 0)
+
+    def describe(self) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = [
+                {
+                    "name": name,
+                    "resident": True,
+                    "chunks": len(collection.chunks),
+                    "memory_bytes": collection.memory_bytes,
+                }
+                for name, collection in self._resident.items()
+            ]
+            rows += [
+                {"name": name, "resident": False, "chunks": chunks, "memory_bytes": 0}
+                for name, chunks in self._spilled.items()
+            ]
+        return sorted(rows, key=lambda row: row["name"])
+
+    def close(self) -> None:
+        with self._lock:
+            for collection in self._resident.values():
+                collection.close()
+            self._resident.clear()
+            self._spilled.clear()
+            if self._spill_root is not None:
+                shutil.rmtree(self._spill_root, ignore_errors=True)
+                self._spill_root = None
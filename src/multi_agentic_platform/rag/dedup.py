@@ -0,0 +1,151 @@
+"""Near-duplicate chunk detection with MinHash signatures and an LSH band index.
+
+Each chunk is reduced to word 3-gram shingles and a MinHash signature whose agreement rate with
+another signature estimates the Jaccard similarity of the two shingle sets. Signatures are split
+into bands; chunks sharing any band bucket become candidates and are confirmed when the
+estimated similarity reaches the threshold. Ingest uses this to store one vector per group of
+near-identical chunks (repeated headers, disclaimers, re-ingested files) instead of embedding
+and indexing each copy.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from dataclasses import dataclass
+
+from multi_agentic_platform.metrics import registry
+
+DEDUP_CHUNKS = registry.counter(
+    "map_rag_dedup_chunks_total", "Ingested chunks by near-duplicate check result.", ("result",)
+)
+DEDUP_BYTES_SAVED = registry.counter(
+    "map_rag_dedup_index_bytes_saved_total", "Index bytes not stored thanks to deduplication."
+)
+
+# With a, b < 2^31 and 32-bit shingle hashes, a * x + b stays below 2^64.
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 3) -> set[int]:
+    """Hashed word `size`-grams of the lower-cased text (the whole text if it is shorter)."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {
+        zlib.crc32(" ".join(words[start : start + size]).encode("utf-8"))
+        for start in range(len(words) - size + 1)
+    }
+
+
+def _band_layout(num_perm: int, threshold: float) -> tuple[int, int]:
+    """(bands, rows) whose LSH threshold (1/bands)^(1/rows) is the highest not above `threshold`.
+
+    Erring low favours recall; false candidates are removed by the exact signature comparison.
+    """
+    best = (num_perm, 1)
+    best_threshold = -1.0
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        lsh_threshold = (1 / bands) ** (1 / rows)
+        if best_threshold < lsh_threshold <= threshold:
+            best, best_threshold = (bands, rows), lsh_threshold
+    return best
+
+
+@dataclass
+class DedupReport:
+    chunks: int = 0
+    duplicates: int = 0
+    index_bytes_saved: int = 0
+
+    @property
+    def embeddings_saved(self) -> int:
+        return self.duplicates
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index mapping chunk signatures to the id of the first chunk seen."""
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, seed: int = 1) -> None:
+        import numpy as np
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self._bands, self._rows = _band_layout(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(self._bands)]
+        self._signatures: dict[int, object] = {}
+
+    def signature(self, text: str):
+        import numpy as np
+
+        hashes = np.fromiter(shingles(text), dtype=np.uint64)
+        values = (np.outer(self._a, hashes) + self._b[:, None]) % np.uint64(_MERSENNE_PRIME)
+        return values.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature) -> list[bytes]:
+        return [
+            signature[band * self._rows : (band + 1) * self._rows].tobytes()
+            for band in range(self._bands)
+        ]
+
+    def find(self, signature) -> int | None:
+        """Id of an indexed chunk whose estimated similarity reaches the threshold."""
+        import numpy as np
+
+        seen: set[int] = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            for chunk_id in buckets.get(key, ()):
+                if chunk_id in seen:
+                    continue
+                seen.add(chunk_id)
+                similarity = float(np.mean(self._signatures[chunk_id] == signature))
+                if similarity >= self.threshold:
+                    return chunk_id
+        return None
+
+    def add(self, chunk_id: int, signature) -> None:
+        self._signatures[chunk_id] = signature
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(key, []).append(chunk_id)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    @property
+    def memory_bytes(self) -> int:
+        # Signature array plus rough dict/list entry costs for the signature and band slots.
+        return len(self._signatures) * (self.num_perm * 4 + 100 + self._bands * 40)
+
+
+def collapse_duplicates(
+    index: NearDuplicateIndex, chunks: list[str], next_id: int
+) -> tuple[list[str], list[int]]:
+    """Split `chunks` into new chunks and the ids of stored chunks the others duplicate.
+
+    New chunks are added to `index` under the ids they will get when stored from `next_id` on,
+    so duplicates within the same batch are collapsed too.
+    """
+    unique: list[str] = []
+    collapsed: list[int] = []
+    for chunk in chunks:
+        signature = index.signature(chunk)
+        canonical = index.find(signature)
+        if canonical is None:
+            index.add(next_id + len(unique), signature)
+            unique.append(chunk)
+        else:
+            collapsed.append(canonical)
+    return unique, collapsed
+
+
+def record_dedup(report: DedupReport) -> None:
+    DEDUP_CHUNKS.inc(report.chunks - report.duplicates, result="unique")
+    DEDUP_CHUNKS.inc(report.duplicates, result="duplicate")
+    DEDUP_BYTES_SAVED.inc(report.index_bytes_saved)
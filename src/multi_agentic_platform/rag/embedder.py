@@ -1,16 +1,34 @@
 from __future__ import annotations
 
+import importlib.util
+
+from multi_agentic_platform.config import settings
+from multi_agentic_platform.metrics import track_stage
+from multi_agentic_platform.model_backends import run_bucketed
+from multi_agentic_platform.model_registry import ModelRegistry, model_registry
+
 
 class SentenceTransformerEmbedder:
-    def __init__(self, model_name: str) -> None:
-        try:
-            from sentence_transformers import SentenceTransformer
-        except ImportError as exc:
+    def __init__(
+        self,
+        model_name: str,
+        device: str | None = None,
+        registry: ModelRegistry | None = None,
+        backend: str | None = None,
+    ) -> None:
+        if importlib.util.find_spec("sentence_transformers") is None:
             raise ImportError(
                 "sentence-transformers is required for embedding. Install with: pip install sentence-transformers"
-            ) from exc
+            )
+
+        self.backend = backend or settings.rag_embedding_backend
+        self._handle = (registry or model_registry).acquire(
+            "sentence-transformer", model_name, device, self.backend
+        )
 
-        self._model = SentenceTransformer(model_name)
+    @property
+    def model(self):
+        return self._handle.model
 
     def encode(self, texts: list[str]):
         try:
@@ -18,5 +36,16 @@ class SentenceTransformerEmbedder:
         except ImportError as exc:
             raise ImportError("numpy is required for embeddings. Install with: pip install numpy") from exc
 
-        vectors = self._model.encode(texts, normalize_embeddings=True)
+        model = self._handle.model
+        if not texts:
+            dimension = model.get_sentence_embedding_dimension()
+            return np.empty((0, dimension), dtype="float32")
+        with track_stage("rag.embed"):
+            vectors = run_bucketed(
+                texts,
+                lambda batch: model.encode(batch, batch_size=len(batch), normalize_embeddings=True),
+            )
         return np.asarray(vectors, dtype="float32")
+
+    def close(self) -> None:
+        self._handle.release()
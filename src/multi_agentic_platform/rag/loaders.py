@@ -4,6 +4,8 @@ import csv
 import json
 from pathlib import Path
 
+from multi_agentic_platform.metrics import track_stage
+
 
 def _load_pdf(path: Path) -> str:
     try:
@@ -41,12 +43,16 @@ def load_document(path_str: str) -> tuple[str, str]:
 
     suffix = path.suffix.lower()
     if suffix == ".pdf":
-        content = _load_pdf(path)
+        with track_stage("loader.pdf"):
+            content = _load_pdf(path)
     elif suffix == ".json":
-        content = _load_json(path)
+        with track_stage("loader.json"):
+            content = _load_json(path)
     elif suffix == ".csv":
-        content = _load_csv(path)
+        with track_stage("loader.csv"):
+            content = _load_csv(path)
     else:
-        content = _load_text(path)
+        with track_stage("loader.text"):
+            content = _load_text(path)
 
     return str(path), content
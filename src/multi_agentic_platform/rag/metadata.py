@@ -0,0 +1,245 @@
+"""Chunk metadata and the posting-list index used to pre-filter vector search.
+
+Every chunk carries its source, file type, ingest time and tags. `MetadataIndex` keeps one sorted
+posting list of chunk ids per source, file type and tag plus a column of ingest times, so a
+`MetadataFilter` resolves to the eligible chunk ids without touching the vectors. The vector
+stores then restrict the FAISS scan to those ids through an ID selector.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+
+@dataclass(frozen=True)
+class ChunkAlias:
+    """Another document containing a near-duplicate of a stored chunk."""
+
+    source: str
+    file_type: str = "text"
+    tags: tuple[str, ...] = ()
+
+
+@dataclass
+class ChunkRecord:
+    chunk_id: int
+    source: str
+    text: str
+    file_type: str = "text"
+    ingested_at: float = 0.0
+    tags: tuple[str, ...] = ()
+    # Near-duplicates collapsed into this chunk at ingest time.
+    aliases: tuple[ChunkAlias, ...] = ()
+
+
+def file_type_of(source: str) -> str:
+    suffix = Path(source).suffix.lower().lstrip(".")
+    return suffix or "text"
+
+
+@dataclass
+class MetadataFilter:
+    """Conditions a chunk must meet. Values within a list are alternatives, except `tags`,
+    which must all be present; different fields are combined with AND."""
+
+    sources: list[str] | None = None
+    file_types: list[str] | None = None
+    tags: list[str] | None = None
+    ingested_after: float | None = None
+    ingested_before: float | None = None
+
+    @property
+    def empty(self) -> bool:
+        return (
+            self.sources is None
+            and self.file_types is None
+            and not self.tags
+            and self.ingested_after is None
+            and self.ingested_before is None
+        )
+
+
+class _GrowableArray:
+    """Append-only numpy array with amortized doubling."""
+
+    def __init__(self, dtype: str, capacity: int = 256) -> None:
+        import numpy as np
+
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    @classmethod
+    def wrap(cls, values) -> _GrowableArray:
+        """Use `values` (e.g. a read-only memory map) as storage; the first `extend` copies it."""
+        array = cls.__new__(cls)
+        array._data = values
+        array._size = len(values)
+        return array
+
+    def extend(self, values) -> None:
+        import numpy as np
+
+        count = len(values)
+        if self._size + count > len(self._data):
+            grown = np.empty(max(2 * len(self._data), self._size + count), dtype=self._data.dtype)
+            grown[: self._size] = self._data[: self._size]
+            self._data = grown
+        self._data[self._size : self._size + count] = values
+        self._size += count
+
+    @property
+    def values(self):
+        return self._data[: self._size]
+
+
+class MetadataIndex:
+    """Posting lists per source, file type and tag, plus per-chunk ingest times."""
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[str, _GrowableArray]] = {
+            "source": {},
+            "file_type": {},
+            "tag": {},
+        }
+        self._ingested_at = _GrowableArray("float64")
+        # Postings that received out-of-order alias ids and must be re-sorted before use.
+        self._unsorted: set[tuple[str, str]] = set()
+
+    @property
+    def size(self) -> int:
+        return len(self._ingested_at.values)
+
+    def _post(self, name: str, value: str, ids) -> None:
+        postings = self._postings[name]
+        if value not in postings:
+            postings[value] = _GrowableArray("int64")
+        postings[value].extend(ids)
+
+    def add(
+        self, first_id: int, count: int, source: str, file_type: str, ingested_at: float, tags
+    ) -> None:
+        """Index `count` consecutive chunk ids that share one document's metadata."""
+        import numpy as np
+
+        if first_id != self.size:
+            raise ValueError(f"Expected chunk id {self.size}, got {first_id}")
+        ids = np.arange(first_id, first_id + count, dtype=np.int64)
+        self._post("source", source, ids)
+        self._post("file_type", file_type, ids)
+        for tag in dict.fromkeys(tags):
+            self._post("tag", tag, ids)
+        self._ingested_at.extend(np.full(count, ingested_at, dtype=np.float64))
+
+    def add_alias(self, chunk_id: int, alias: ChunkAlias) -> None:
+        """Make an existing chunk also match filters on a near-duplicate's metadata."""
+        import numpy as np
+
+        ids = np.asarray([chunk_id], dtype=np.int64)
+        for name, value in [("source", alias.source), ("file_type", alias.file_type)] + [
+            ("tag", tag) for tag in dict.fromkeys(alias.tags)
+        ]:
+            self._post(name, value, ids)
+            self._unsorted.add((name, value))
+
+    @classmethod
+    def from_records(cls, records: list[ChunkRecord]) -> MetadataIndex:
+        index = cls()
+        start = 0
+        # Chunks of one document are contiguous and share metadata, so index them as runs.
+        for position in range(1, len(records) + 1):
+            if position < len(records) and _same_document(records[position - 1], records[position]):
+                continue
+            head = records[start]
+            index.add(
+                start, position - start, head.source, head.file_type, head.ingested_at, head.tags
+            )
+            start = position
+        for record in records:
+            for alias in record.aliases:
+                index.add_alias(record.chunk_id, alias)
+        return index
+
+    def posting_lists(self, name: str) -> tuple[list[str], Any, Any]:
+        """Flatten one field's postings to `(values, ids, offsets)`, where
+        `ids[offsets[i]:offsets[i + 1]]` are the sorted chunk ids of `values[i]`."""
+        import numpy as np
+
+        values = list(self._postings[name])
+        lists = [self._union(name, [value]) for value in values]
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in lists], out=offsets[1:])
+        ids = np.concatenate(lists) if lists else np.empty(0, dtype=np.int64)
+        return values, ids.astype(np.int64, copy=False), offsets
+
+    @classmethod
+    def from_posting_lists(
+        cls, ingested_at, postings: dict[str, tuple[list[str], Any, Any]]
+    ) -> MetadataIndex:
+        """Serve flattened `posting_lists` output without copying it, so memory-mapped postings
+        stay shared between processes."""
+        index = cls()
+        index._ingested_at = _GrowableArray.wrap(ingested_at)
+        for name, (values, ids, offsets) in postings.items():
+            index._postings[name] = {
+                value: _GrowableArray.wrap(ids[int(offsets[i]) : int(offsets[i + 1])])
+                for i, value in enumerate(values)
+            }
+        return index
+
+    def _union(self, name: str, values: list[str]):
+        import numpy as np
+
+        postings = self._postings[name]
+        for value in values:
+            if (name, value) in self._unsorted:
+                ids = np.unique(postings[value].values)
+                postings[value] = _GrowableArray("int64", max(len(ids), 1))
+                postings[value].extend(ids)
+                self._unsorted.discard((name, value))
+        lists = [postings[value].values for value in values if value in postings]
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+        return lists[0] if len(lists) == 1 else np.unique(np.concatenate(lists))
+
+    def select(self, query: MetadataFilter | None) -> Any:
+        """Return the sorted eligible chunk ids, or None when every chunk is eligible."""
+        import numpy as np
+
+        if query is None or query.empty:
+            return None
+
+        candidates = None
+        conditions = [("source", query.sources), ("file_type", query.file_types)]
+        conditions += [("tag", [tag]) for tag in query.tags or []]
+        for name, values in conditions:
+            if values is None:
+                continue
+            ids = self._union(name, values)
+            if candidates is not None:
+                ids = np.intersect1d(candidates, ids, assume_unique=True)
+            candidates = ids
+            if len(candidates) == 0:
+                return candidates
+
+        if query.ingested_after is not None or query.ingested_before is not None:
+            times = self._ingested_at.values
+            if candidates is not None:
+                times = times[candidates]
+            keep = np.ones(len(times), dtype=bool)
+            if query.ingested_after is not None:
+                keep &= times >= query.ingested_after
+            if query.ingested_before is not None:
+                keep &= times < query.ingested_before
+            candidates = candidates[keep] if candidates is not None else np.flatnonzero(keep)
+        return candidates
+
+
+def _same_document(left: ChunkRecord, right: ChunkRecord) -> bool:
+    return (
+        left.source == right.source
+        and left.file_type == right.file_type
+        and left.ingested_at == right.ingested_at
+        and left.tags == right.tags
+    )
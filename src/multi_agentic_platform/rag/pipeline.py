@@ -1,65 +1,235 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
 
 from multi_agentic_platform.config import settings
+from multi_agentic_platform.metrics import track_stage
 from multi_agentic_platform.providers.base import LLMProvider
+from multi_agentic_platform.rag.batching import MicroBatcher
 from multi_agentic_platform.rag.chunking import chunk_text
+from multi_agentic_platform.rag.collection_manager import (
+    DEFAULT_COLLECTION,
+    CollectionManager,
+    RAGCollection,
+)
+from multi_agentic_platform.rag.dedup import DedupReport, collapse_duplicates, record_dedup
 from multi_agentic_platform.rag.embedder import SentenceTransformerEmbedder
 from multi_agentic_platform.rag.loaders import load_document
+from multi_agentic_platform.rag.metadata import (
+    ChunkAlias,
+    ChunkRecord,
+    MetadataFilter,
+    MetadataIndex,
+    file_type_of,
+)
 from multi_agentic_platform.rag.reranker import Candidate, CrossEncoderReranker, LLMRerankerAgent
-from multi_agentic_platform.rag.vector_store import FaissStore
-
-
-@dataclass
-class ChunkRecord:
-    chunk_id: int
-    source: str
-    text: str
+from multi_agentic_platform.rag.shared_index import (
+    IndexGeneration,
+    IndexPublisher,
+    MmapFlatStore,
+    SharedIndexReader,
+)
+from multi_agentic_platform.rag.vector_store import FaissStore, ShardedFaissStore, create_store
 
 
 class RAGPipeline:
-    def __init__(self, rerank_with_agent_provider: LLMProvider | None = None) -> None:
-        self._embedder = SentenceTransformerEmbedder(settings.rag_embedding_model)
-        self._reranker = CrossEncoderReranker(settings.rag_reranker_model)
+    def __init__(
+        self,
+        rerank_with_agent_provider: LLMProvider | None = None,
+        embedder: SentenceTransformerEmbedder | None = None,
+        reranker: CrossEncoderReranker | None = None,
+    ) -> None:
+        self._embedder = embedder or SentenceTransformerEmbedder(
+            settings.rag_embedding_model, device=settings.rag_model_device
+        )
+        self._reranker = reranker or CrossEncoderReranker(
+            settings.rag_reranker_model, device=settings.rag_model_device
+        )
         self._agent_reranker = (
             LLMRerankerAgent(rerank_with_agent_provider) if rerank_with_agent_provider else None
         )
+        self._embed_batcher: MicroBatcher | None = None
+        self._rerank_batcher: MicroBatcher | None = None
+        if settings.rag_batch_max_size > 1:
+            self._embed_batcher = MicroBatcher(
+                "embed",
+                self._embedder.encode,
+                max_batch_size=settings.rag_batch_max_size,
+                max_wait_ms=settings.rag_batch_max_wait_ms,
+            )
+            self._rerank_batcher = MicroBatcher(
+                "rerank",
+                self._reranker.rerank_many,
+                max_batch_size=settings.rag_batch_max_size,
+                max_wait_ms=settings.rag_batch_max_wait_ms,
+            )
+
+        budget_mb = settings.rag_collection_memory_budget_mb
+        self._collections = CollectionManager(
+            self._new_store,
+            memory_budget_bytes=budget_mb * 1024 * 1024 if budget_mb > 0 else None,
+            spill_dir=settings.rag_collection_spill_dir,
+        )
+
+        role = settings.rag_index_role
+        if role not in {"standalone", "writer", "reader"}:
+            raise ValueError(f"Unknown rag_index_role: {role}")
+        self._role = role
+        self._publisher = (
+            IndexPublisher(settings.rag_shared_index_dir, keep=settings.rag_shared_index_keep)
+            if role == "writer"
+            else None
+        )
+        self._reader = (
+            SharedIndexReader(
+                settings.rag_shared_index_dir, poll_seconds=settings.rag_shared_index_poll_seconds
+            )
+            if role == "reader"
+            else None
+        )
+        if self._publisher is not None:
+            self._restore(self._publisher.latest())
+        elif self._reader is not None:
+            self._reader.current()
+
+    @staticmethod
+    def _new_store(dimension: int, collection: str) -> FaissStore | ShardedFaissStore:
+        # Each collection needs its own re-scoring file; opening one truncates it.
+        rescore_path = (
+            str(Path(settings.rag_rescore_path) / f"{collection}.f32")
+            if settings.rag_rescore_path
+            else None
+        )
+        return create_store(
+            dimension,
+            num_shards=settings.rag_index_shards,
+            max_workers=settings.rag_shard_search_threads,
+            storage=settings.rag_vector_storage,
+            exact_rescore=settings.rag_exact_rescore,
+            rescore_factor=settings.rag_rescore_factor,
+            rescore_path=rescore_path,
+        )
+
+    def _restore(self, generation: IndexGeneration | None) -> None:
+        """Resume a writer from the last published generation."""
+        collection = RAGCollection(DEFAULT_COLLECTION, self._new_store)
+        collection.restore(generation)
+        self._collections.add(collection)
+
+    def _check_collection(self, collection: str) -> None:
+        if self._role != "standalone" and collection != DEFAULT_COLLECTION:
+            raise PermissionError(
+                f"Named collections need rag_index_role=standalone; the {self._role} role only "
+                f"serves the '{DEFAULT_COLLECTION}' collection."
+            )
+
+    @contextmanager
+    def _snapshot(
+        self, collection: str = DEFAULT_COLLECTION
+    ) -> Iterator[
+        tuple[
+            FaissStore | ShardedFaissStore | MmapFlatStore | None,
+            Callable[[int], ChunkRecord] | None,
+            MetadataIndex | None,
+        ]
+    ]:
+        """Yield a consistent (store, chunk lookup, metadata index) triple for one query.
 
-        self._store: FaissStore | None = None
-        self._chunks: list[ChunkRecord] = []
+        The collection stays pinned in memory until the block exits.
+        """
+        if self._reader is not None:
+            generation = self._reader.current()
+            if generation is None:
+                yield None, None, None
+            else:
+                yield generation.store, generation.chunk, generation.metadata
+            return
 
-    def ingest_paths(self, paths: list[str]) -> dict[str, int]:
+        with self._collections.use(collection) as pinned:
+            if pinned is None:
+                yield None, None, None
+            else:
+                yield pinned.store, pinned.chunks.__getitem__, pinned.metadata
+
+    def ingest_paths(
+        self,
+        paths: list[str],
+        tags: list[str] | None = None,
+        collection: str = DEFAULT_COLLECTION,
+    ) -> dict[str, int]:
         documents: list[tuple[str, str]] = [load_document(path) for path in paths]
-        return self.ingest_documents(documents)
+        return self.ingest_documents(documents, tags=tags, collection=collection)
 
-    def ingest_documents(self, documents: list[tuple[str, str]]) -> dict[str, int]:
+    def ingest_documents(
+        self,
+        documents: list[tuple[str, str]],
+        tags: list[str] | None = None,
+        collection: str = DEFAULT_COLLECTION,
+    ) -> dict[str, int]:
+        """Chunk, embed and index `documents` into `collection`, tagging every chunk with `tags`."""
+        if self._reader is not None:
+            raise PermissionError(
+                "This worker serves a read-only shared index; send ingestion to the writer process."
+            )
+        self._check_collection(collection)
         added_chunks = 0
+        ingested_at = time.time()
+        chunk_tags = tuple(dict.fromkeys(tags or ()))
 
-        for source, content in documents:
-            chunks = chunk_text(
-                content,
-                chunk_size=settings.rag_chunk_size,
-                chunk_overlap=settings.rag_chunk_overlap,
+        report = DedupReport()
+        with self._collections.use(collection, create=True) as target:
+            assert target is not None
+            dedup = (
+                target.dedup_index(settings.rag_dedup_threshold, settings.rag_dedup_num_perm)
+                if settings.rag_dedup_threshold > 0
+                else None
             )
-            if not chunks:
-                continue
+            for source, content in documents:
+                with track_stage("rag.chunk"):
+                    chunks = chunk_text(
+                        content,
+                        chunk_size=settings.rag_chunk_size,
+                        chunk_overlap=settings.rag_chunk_overlap,
+                    )
+                if not chunks:
+                    continue
 
-            embeddings = self._embedder.encode(chunks)
-            if self._store is None:
-                self._store = FaissStore(dimension=int(embeddings.shape[1]))
-            self._store.add(embeddings)
+                file_type = file_type_of(source)
+                unique, collapsed = chunks, []
+                if dedup is not None:
+                    with track_stage("rag.dedup"):
+                        unique, collapsed = collapse_duplicates(dedup, chunks, len(target.chunks))
+                if unique:
+                    try:
+                        embeddings = self._embedder.encode(unique)
+                    except BaseException:
+                        # The index already holds ids for chunks that will not be stored.
+                        target.invalidate_dedup()
+                        raise
+                    target.add(embeddings, unique, source, file_type, ingested_at, chunk_tags)
+                for canonical_id in collapsed:
+                    target.add_alias(canonical_id, ChunkAlias(source, file_type, chunk_tags))
+                report.chunks += len(chunks)
+                report.duplicates += len(collapsed)
+                added_chunks += len(unique)
 
-            for chunk in chunks:
-                self._chunks.append(
-                    ChunkRecord(chunk_id=len(self._chunks), source=source, text=chunk)
-                )
-            added_chunks += len(chunks)
+            if self._publisher is not None and target.store is not None and report.chunks:
+                self._publisher.publish(target.store.vectors(), target.chunks)
+            index_size = target.size
+            if target.store is not None and target.size:
+                bytes_per_vector = target.store.index_bytes // target.size
+                report.index_bytes_saved = report.duplicates * bytes_per_vector
+        record_dedup(report)
 
         return {
             "documents": len(documents),
             "chunks": added_chunks,
-            "index_size": len(self._chunks),
+            "index_size": index_size,
+            "duplicates": report.duplicates,
+            "index_bytes_saved": report.index_bytes_saved,
         }
 
     async def query(
@@ -67,29 +237,95 @@ class RAGPipeline:
         text: str,
         top_k: int = 5,
         use_agent_reranker: bool = False,
+        filters: MetadataFilter | None = None,
+        collection: str = DEFAULT_COLLECTION,
     ) -> list[ChunkRecord]:
-        if self._store is None or self._store.size == 0:
-            return []
+        self._check_collection(collection)
+        with self._snapshot(collection) as (store, lookup, metadata):
+            if store is None or lookup is None or metadata is None or store.size == 0:
+                return []
 
-        query_embedding = self._embedder.encode([text])[0]
-        retrieved = self._store.search(query_embedding, top_k=max(top_k * 3, top_k))
+            # Filters become an id selector inside the vector search, so the reranker only sees
+            # eligible chunks and a filtered query costs no more than an unfiltered one.
+            allowed_ids = metadata.select(filters)
+            if allowed_ids is not None and len(allowed_ids) == 0:
+                return []
 
-        candidates = [
-            Candidate(
-                chunk_id=item.chunk_id,
-                text=self._chunks[item.chunk_id].text,
-                retrieval_score=item.score,
+            query_embedding = await self._embed_query(text)
+            retrieved = store.search(
+                query_embedding, top_k=max(top_k * 3, top_k), allowed_ids=allowed_ids
             )
-            for item in retrieved
-        ]
 
-        if use_agent_reranker and self._agent_reranker is not None:
-            reranked = await self._agent_reranker.rerank(text, candidates, top_k=top_k)
-        else:
-            reranked = self._reranker.rerank(text, candidates, top_k=top_k)
+            candidates = [
+                Candidate(
+                    chunk_id=item.chunk_id,
+                    text=lookup(item.chunk_id).text,
+                    retrieval_score=item.score,
+                )
+                for item in retrieved
+            ]
+
+            if use_agent_reranker and self._agent_reranker is not None:
+                reranked = await self._agent_reranker.rerank(text, candidates, top_k=top_k)
+            else:
+                reranked = await self._cross_encoder_rerank(text, candidates, top_k)
+
+            return [lookup(item.chunk_id) for item in reranked]
 
-        return [self._chunks[item.chunk_id] for item in reranked]
+    async def _embed_query(self, text: str):
+        if self._embed_batcher is None:
+            return self._embedder.encode([text])[0]
+        return await self._embed_batcher.submit(text)
+
+    async def _cross_encoder_rerank(
+        self, text: str, candidates: list[Candidate], top_k: int
+    ) -> list[Candidate]:
+        if self._rerank_batcher is None or not candidates:
+            return self._reranker.rerank(text, candidates, top_k=top_k)
+        return await self._rerank_batcher.submit((text, candidates, top_k))
+
+    @property
+    def store(self) -> FaissStore | ShardedFaissStore | MmapFlatStore | None:
+        """Store of the default collection (None while it is spilled or empty)."""
+        if self._reader is not None:
+            generation = self._reader.current()
+            return generation.store if generation is not None else None
+        collection = self._collections.get(DEFAULT_COLLECTION)
+        return collection.store if collection is not None else None
 
     @property
     def indexed_chunks(self) -> int:
-        return len(self._chunks)
+        """Chunks in the default collection, including while it is spilled to disk."""
+        if self._reader is not None:
+            store = self.store
+            return store.size if store is not None else 0
+        return self._collections.chunk_count(DEFAULT_COLLECTION)
+
+    def collections(self) -> list[dict[str, int | str | bool]]:
+        if self._reader is not None:
+            return [
+                {
+                    "name": DEFAULT_COLLECTION,
+                    "resident": True,
+                    "chunks": self.indexed_chunks,
+                    "memory_bytes": 0,
+                }
+            ]
+        return self._collections.describe()
+
+    def index_info(self) -> dict[str, int | str | None]:
+        generation: int | None = None
+        if self._reader is not None:
+            current = self._reader.current()
+            generation = current.generation if current is not None else None
+        elif self._publisher is not None:
+            generation = self._publisher.current_generation()
+        return {"role": self._role, "generation": generation, "chunks": self.indexed_chunks}
+
+    def close(self) -> None:
+        for batcher in (self._embed_batcher, self._rerank_batcher):
+            if batcher is not None:
+                batcher.close()
+        self._collections.close()
+        self._embedder.close()
+        self._reranker.close()
@@ -1,9 +1,24 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import importlib.util
+import json
+import re
+from collections import OrderedDict
 from dataclasses import dataclass
 
+from multi_agentic_platform.config import settings
+from multi_agentic_platform.context_packing import ContextItem, pack_context
+from multi_agentic_platform.metrics import registry, timed, track_stage
+from multi_agentic_platform.model_backends import run_bucketed
+from multi_agentic_platform.model_registry import ModelRegistry, model_registry
 from multi_agentic_platform.providers.base import LLMProvider
 
+RERANK_CACHE = registry.counter(
+    "map_llm_rerank_window_cache_total", "LLM rerank window lookups by cache result.", ("result",)
+)
+
 
 @dataclass
 class Candidate:
@@ -13,62 +28,195 @@ class Candidate:
 
 
 class CrossEncoderReranker:
-    def __init__(self, model_name: str) -> None:
-        try:
-            from sentence_transformers import CrossEncoder
-        except ImportError as exc:
+    def __init__(
+        self,
+        model_name: str,
+        device: str | None = None,
+        registry: ModelRegistry | None = None,
+        backend: str | None = None,
+    ) -> None:
+        if importlib.util.find_spec("sentence_transformers") is None:
             raise ImportError(
                 "sentence-transformers is required for reranking. Install with: pip install sentence-transformers"
-            ) from exc
+            )
 
-        self._model = CrossEncoder(model_name)
+        self.backend = backend or settings.rag_reranker_backend
+        self._handle = (registry or model_registry).acquire(
+            "cross-encoder", model_name, device, self.backend
+        )
 
     def rerank(self, query: str, candidates: list[Candidate], top_k: int = 5) -> list[Candidate]:
-        if not candidates:
-            return []
+        return self.rerank_many([(query, candidates, top_k)])[0]
+
+    @timed("rag.rerank")
+    def rerank_many(
+        self, requests: list[tuple[str, list[Candidate], int]]
+    ) -> list[list[Candidate]]:
+        """Rerank several (query, candidates, top_k) requests with one batched predict call."""
+        pairs = [
+            [query, candidate.text] for query, candidates, _ in requests for candidate in candidates
+        ]
+        if not pairs:
+            return [[] for _ in requests]
+
+        model = self._handle.model
+        scores = run_bucketed(
+            [pair[1] for pair in pairs],
+            lambda batch: model.predict(batch, batch_size=len(batch)),
+            items=pairs,
+        )
+        results: list[list[Candidate]] = []
+        offset = 0
+        for _, candidates, top_k in requests:
+            scored = list(zip(candidates, scores[offset : offset + len(candidates)], strict=True))
+            offset += len(candidates)
+            scored.sort(key=lambda item: float(item[1]), reverse=True)
+            results.append([item[0] for item in scored[:top_k]])
+        return results
+
+    def close(self) -> None:
+        self._handle.release()
+
+
+def _json_ranking(output: str) -> list[int]:
+    for fragment in re.findall(r"\{.*\}", output, re.DOTALL) + re.findall(r"\[[^\[\]]*\]", output):
+        try:
+            parsed = json.loads(fragment)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            parsed = next((value for value in parsed.values() if isinstance(value, list)), None)
+        if isinstance(parsed, list) and parsed and all(isinstance(item, int) for item in parsed):
+            return parsed
+    return []
+
 
-        pairs = [[query, candidate.text] for candidate in candidates]
-        scores = self._model.predict(pairs)
-        scored = list(zip(candidates, scores, strict=True))
-        scored.sort(key=lambda item: float(item[1]), reverse=True)
-        return [item[0] for item in scored[:top_k]]
+def parse_ranking(output: str, count: int) -> list[int]:
+    """Extract a ranking of `count` candidate indexes from free-form model output.
+
+    Accepts a JSON array or an object holding one (`{"ranking": [2, 0, 1]}`), bracketed indexes
+    such as `[2] > [0]`, or bare comma/space separated numbers. Out-of-range and repeated indexes
+    are ignored and any index the model left out is appended in its original order, so a partial
+    answer still yields a complete ranking.
+    """
+    bracketed = re.findall(r"\[(\d+)\]", output)
+    indexes = [int(raw) for raw in bracketed] if len(bracketed) > 1 else _json_ranking(output)
+    if not indexes:
+        indexes = [int(raw) for raw in re.findall(r"\d+", output)]
+
+    ranking = list(dict.fromkeys(index for index in indexes if 0 <= index < count))
+    seen = set(ranking)
+    return ranking + [index for index in range(count) if index not in seen]
 
 
 class LLMRerankerAgent:
-    def __init__(self, provider: LLMProvider) -> None:
+    """Listwise LLM reranking over sliding windows.
+
+    Up to `window_size` candidates are ranked in one prompt. Larger pools run as a tournament:
+    overlapping windows (`window_stride` apart) are ranked concurrently, candidates beaten by
+    `top_k` others in any window are eliminated, and rounds repeat until one window remains, so
+    latency grows with the number of rounds rather than with the pool size. Window rankings are
+    cached by query and candidate texts. `window_size=0` ranks the whole pool in one prompt.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        window_size: int | None = None,
+        window_stride: int | None = None,
+        max_concurrency: int | None = None,
+        cache_size: int | None = None,
+    ) -> None:
         self._provider = provider
+        self._window_size = settings.llm_rerank_window_size if window_size is None else window_size
+        stride = settings.llm_rerank_window_stride if window_stride is None else window_stride
+        self._window_stride = max(1, min(stride, self._window_size or 1))
+        self._semaphore = asyncio.Semaphore(max_concurrency or settings.llm_rerank_max_concurrency)
+        self._cache_size = settings.llm_rerank_cache_size if cache_size is None else cache_size
+        self._cache: OrderedDict[str, list[int]] = OrderedDict()
 
-    async def rerank(self, query: str, candidates: list[Candidate], top_k: int = 5) -> list[Candidate]:
-        if not candidates:
-            return []
+    def _windows(self, size: int) -> list[range]:
+        window, stride = self._window_size, self._window_stride
+        starts = list(range(0, max(size - window, 0) + 1, stride))
+        if starts[-1] + window < size:
+            starts.append(size - window)
+        return [range(start, min(start + window, size)) for start in starts]
+
+    async def _rank_window(self, query: str, window: list[Candidate]) -> list[int]:
+        """Rank `window` best first, returning positions within the window."""
+        key = hashlib.sha1(
+            "\x1f".join([query, *(candidate.text for candidate in window)]).encode("utf-8")
+        ).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            RERANK_CACHE.inc(result="hit")
+            return cached
+        RERANK_CACHE.inc(result="miss")
 
-        indexed_candidates = "\n\n".join(
-            f"[{idx}] retrieval_score={candidate.retrieval_score:.4f}\n{candidate.text}"
-            for idx, candidate in enumerate(candidates)
+        packed = pack_context(
+            [ContextItem(text=c.text, score=c.retrieval_score) for c in window],
+            budget=settings.context_token_budget or None,
+            count_tokens=self._provider.count_tokens,
+            min_overlap_chars=settings.context_min_overlap_chars,
+            call="llm_rerank",
         )
+        indexed_candidates = "\n\n".join(f"[{item.index}]\n{item.text}" for item in packed.items)
         prompt = (
-            "Rank the candidate chunks for relevance to the query. Return only comma-separated "
-            f"indexes of the best {top_k} chunks in descending order.\n\n"
+            "Rank the candidate chunks by relevance to the query. Return only a JSON array of "
+            "the candidate indexes, most relevant first.\n\n"
             f"Query:\n{query}\n\nCandidates:\n{indexed_candidates}"
         )
-        output = await self._provider.generate(
-            system=(
-                "You are a retrieval reranking agent. Respond only with comma-separated indexes "
-                "such as: 2,0,3"
-            ),
-            prompt=prompt,
-        )
+        async with self._semaphore:
+            with track_stage("rag.llm_rerank_window"):
+                output = await self._provider.generate(
+                    system=(
+                        "You are a retrieval reranking agent. Respond only with a JSON array of "
+                        "indexes such as: [2, 0, 3, 1]"
+                    ),
+                    prompt=prompt,
+                )
+
+        # Candidates packing left out were never shown, so they rank after the shown ones.
+        shown = {item.index for item in packed.items}
+        ranking = [index for index in parse_ranking(output, len(window)) if index in shown]
+        ranking += [index for index in range(len(window)) if index not in shown]
+        if self._cache_size > 0:
+            self._cache[key] = ranking
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return ranking
+
+    @timed("rag.llm_rerank")
+    async def rerank(
+        self, query: str, candidates: list[Candidate], top_k: int = 5
+    ) -> list[Candidate]:
+        if not candidates:
+            return []
+
+        window = self._window_size or len(candidates)
+        pool = list(range(len(candidates)))
+        while len(pool) > window:
+            windows = self._windows(len(pool))
+            rankings = await asyncio.gather(
+                *(self._rank_window(query, [candidates[pool[i]] for i in span]) for span in windows)
+            )
+            # A candidate that `top_k` others beat in any window cannot be in the overall top_k,
+            # so it is eliminated; overlapping windows give every survivor two chances to lose.
+            worst = {candidate: 0 for candidate in pool}
+            for span, ranking in zip(windows, rankings):
+                for position, local in enumerate(ranking):
+                    candidate = pool[span[local]]
+                    worst[candidate] = max(worst[candidate], position)
+            survivors = [candidate for candidate in pool if worst[candidate] < top_k]
+            if len(survivors) < top_k or len(survivors) == len(pool):
+                # Inconsistent rankings, or windows too small to eliminate anyone: fall back to
+                # ordering by worst position (ties keep the retrieval order).
+                ordered = sorted(pool, key=lambda candidate: worst[candidate])
+                if len(survivors) == len(pool):
+                    return [candidates[candidate] for candidate in ordered[:top_k]]
+                survivors = ordered[: max(top_k, window)]
+            pool = survivors
 
-        chosen: list[Candidate] = []
-        for raw in output.replace(" ", "").split(","):
-            if not raw.isdigit():
-                continue
-            idx = int(raw)
-            if 0 <= idx < len(candidates):
-                candidate = candidates[idx]
-                if candidate not in chosen:
-                    chosen.append(candidate)
-            if len(chosen) >= top_k:
-                break
-
-        return chosen or candidates[:top_k]
+        ranking = await self._rank_window(query, [candidates[i] for i in pool])
+        return [candidates[pool[local]] for local in ranking[:top_k]]
@@ -0,0 +1,324 @@
+"""Immutable on-disk index generations shared between processes.
+
+A single writer process publishes each ingest as a new generation directory and then atomically
+repoints `CURRENT` at it. Reader processes memory-map the vectors, chunk texts, metadata columns
+and filter posting lists of the current generation, so every worker shares the same page-cache
+pages instead of holding its own copy, and swap to a newer generation by replacing one reference.
+
+Layout of `<root>/gen-00000042/`:
+    manifest.json     generation, count, dimension
+    vectors.npy       float32 [count, dimension], L2-normalized embeddings
+    text.bin          UTF-8 chunk texts, concatenated
+    text_offsets.npy  int64 [count + 1] byte offsets into text.bin
+    source_ids.npy    int32 [count] index into sources.json
+    sources.json      list of distinct source names
+    file_type_ids.npy, file_types.json, tag_set_ids.npy, tag_sets.json, ingested_at.npy
+                      chunk metadata columns, interned the same way
+    postings.json     {"source": [...], "file_type": [...], "tag": [...]} posting list values
+    postings.npy      int64 sorted chunk ids of every posting list, concatenated in that order
+    posting_offsets.npy
+                      int64 offsets into postings.npy, one list per value plus the end
+    alias_chunk_ids.npy
+                      int64 sorted ids of chunks that absorbed near-duplicates, one row per alias
+    alias_source_ids.npy, alias_file_type_ids.npy, alias_tag_set_ids.npy
+                      int32 metadata of each alias, interned into the chunk tables above
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from multi_agentic_platform.metrics import timed
+from multi_agentic_platform.rag.metadata import ChunkAlias, ChunkRecord, MetadataIndex
+from multi_agentic_platform.rag.vector_store import ScoredChunk
+
+_CURRENT = "CURRENT"
+
+logger = logging.getLogger(__name__)
+
+
+def _generation_name(generation: int) -> str:
+    return f"gen-{generation:08d}"
+
+
+def _intern(values) -> tuple[list, list[int]]:
+    table: dict = {}
+    ids = [table.setdefault(value, len(table)) for value in values]
+    return list(table), ids
+
+
+def _read_current(root: Path) -> str | None:
+    try:
+        return (root / _CURRENT).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class MmapFlatStore:
+    """Read-only exact inner-product search over a memory-mapped float32 matrix."""
+
+    def __init__(self, vectors) -> None:
+        self._vectors = vectors
+
+    @timed("rag.search")
+    def search(self, query_embedding, top_k: int, allowed_ids=None) -> list[ScoredChunk]:
+        import numpy as np
+
+        if self.size == 0 or (allowed_ids is not None and len(allowed_ids) == 0):
+            return []
+        query = np.asarray(query_embedding, dtype="float32").reshape(-1)
+        if allowed_ids is None:
+            ids = None
+            scores = self._vectors @ query
+        else:
+            # Only the eligible rows are read from the mapping.
+            ids = np.asarray(allowed_ids, dtype=np.int64)
+            scores = self._vectors[ids] @ query
+        k = min(top_k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            ScoredChunk(chunk_id=int(idx if ids is None else ids[idx]), score=float(scores[idx]))
+            for idx in top
+        ]
+
+    def vectors(self):
+        return self._vectors
+
+    @property
+    def size(self) -> int:
+        return int(self._vectors.shape[0])
+
+
+class IndexGeneration:
+    """One published generation, opened read-only via mmap."""
+
+    def __init__(self, path: Path) -> None:
+        import numpy as np
+
+        self.path = path
+        manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+        self.generation = int(manifest["generation"])
+        self.store = MmapFlatStore(np.load(path / "vectors.npy", mmap_mode="r"))
+        self._offsets = np.load(path / "text_offsets.npy", mmap_mode="r")
+        self._source_ids = np.load(path / "source_ids.npy", mmap_mode="r")
+        self._sources: list[str] = json.loads((path / "sources.json").read_text(encoding="utf-8"))
+        self._file_type_ids = np.load(path / "file_type_ids.npy", mmap_mode="r")
+        self._file_types: list[str] = json.loads(
+            (path / "file_types.json").read_text(encoding="utf-8")
+        )
+        self._tag_set_ids = np.load(path / "tag_set_ids.npy", mmap_mode="r")
+        self._tag_sets = [
+            tuple(tags) for tags in json.loads((path / "tag_sets.json").read_text(encoding="utf-8"))
+        ]
+        self._ingested_at = np.load(path / "ingested_at.npy", mmap_mode="r")
+        self._alias_chunk_ids = np.load(path / "alias_chunk_ids.npy", mmap_mode="r")
+        self._alias_columns = tuple(
+            np.load(path / f"alias_{name}_ids.npy", mmap_mode="r")
+            for name in ("source", "file_type", "tag_set")
+        )
+        with open(path / "text.bin", "rb") as f:
+            self._text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        values = json.loads((path / "postings.json").read_text(encoding="utf-8"))
+        ids = np.load(path / "postings.npy", mmap_mode="r")
+        offsets = np.load(path / "posting_offsets.npy", mmap_mode="r")
+        postings, first = {}, 0
+        for name, names in values.items():
+            postings[name] = (names, ids, offsets[first : first + len(names) + 1])
+            first += len(names)
+        self.metadata = MetadataIndex.from_posting_lists(self._ingested_at, postings)
+
+    @property
+    def size(self) -> int:
+        return self.store.size
+
+    def _aliases(self, chunk_id: int) -> tuple[ChunkAlias, ...]:
+        import numpy as np
+
+        first, last = np.searchsorted(self._alias_chunk_ids, [chunk_id, chunk_id + 1]).tolist()
+        source_ids, file_type_ids, tag_set_ids = self._alias_columns
+        return tuple(
+            ChunkAlias(
+                self._sources[int(source_ids[row])],
+                self._file_types[int(file_type_ids[row])],
+                self._tag_sets[int(tag_set_ids[row])],
+            )
+            for row in range(first, last)
+        )
+
+    def chunk(self, chunk_id: int) -> ChunkRecord:
+        start, end = int(self._offsets[chunk_id]), int(self._offsets[chunk_id + 1])
+        return ChunkRecord(
+            chunk_id=chunk_id,
+            source=self._sources[int(self._source_ids[chunk_id])],
+            text=self._text[start:end].decode("utf-8"),
+            file_type=self._file_types[int(self._file_type_ids[chunk_id])],
+            ingested_at=float(self._ingested_at[chunk_id]),
+            tags=self._tag_sets[int(self._tag_set_ids[chunk_id])],
+            aliases=self._aliases(chunk_id),
+        )
+
+
+class IndexPublisher:
+    """Writer side: publishes full snapshots as new generations and prunes old ones."""
+
+    def __init__(self, root: str | Path, keep: int = 3) -> None:
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._keep = max(1, keep)
+        self._remove_partial_publishes()
+
+    def _remove_partial_publishes(self) -> None:
+        """Clean up after a writer that died mid-publish, so the next publish can proceed."""
+        current = self.current_generation() or 0
+        for path in self._root.iterdir():
+            if ".tmp-" in path.name:
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink(missing_ok=True)
+                continue
+            suffix = path.name.split("-")[1] if path.name.startswith("gen-") else ""
+            # Renamed into place but never made current: its number will be published again.
+            if suffix.isdigit() and int(suffix) > current:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def latest(self) -> IndexGeneration | None:
+        name = _read_current(self._root)
+        return IndexGeneration(self._root / name) if name else None
+
+    def current_generation(self) -> int | None:
+        name = _read_current(self._root)
+        return int(name.split("-")[1]) if name else None
+
+    @timed("rag.publish")
+    def publish(self, vectors, chunks: list[ChunkRecord]) -> int:
+        import numpy as np
+
+        generation = (self.current_generation() or 0) + 1
+        final = self._root / _generation_name(generation)
+        staging = Path(tempfile.mkdtemp(prefix=f"{final.name}.tmp-", dir=self._root))
+        # mkdtemp creates the directory private; readers may run as another user.
+        staging.chmod(0o755)
+
+        # Aliases are interned into the chunk tables; their ids follow the chunks' own.
+        alias_rows = [(chunk.chunk_id, alias) for chunk in chunks for alias in chunk.aliases]
+        rows = [*chunks, *(alias for _, alias in alias_rows)]
+        count = len(chunks)
+        sources, source_ids = _intern(row.source for row in rows)
+        file_types, file_type_ids = _intern(row.file_type for row in rows)
+        tag_sets, tag_set_ids = _intern(tuple(row.tags) for row in rows)
+        encoded = [chunk.text.encode("utf-8") for chunk in chunks]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+
+        np.save(staging / "vectors.npy", np.ascontiguousarray(vectors, dtype="float32"))
+        np.save(staging / "text_offsets.npy", offsets)
+        columns = (("source", source_ids), ("file_type", file_type_ids), ("tag_set", tag_set_ids))
+        for name, ids in columns:
+            np.save(staging / f"{name}_ids.npy", np.asarray(ids[:count], dtype=np.int32))
+            np.save(staging / f"alias_{name}_ids.npy", np.asarray(ids[count:], dtype=np.int32))
+        np.save(
+            staging / "alias_chunk_ids.npy",
+            np.asarray([chunk_id for chunk_id, _ in alias_rows], dtype=np.int64),
+        )
+        np.save(
+            staging / "ingested_at.npy",
+            np.asarray([chunk.ingested_at for chunk in chunks], dtype=np.float64),
+        )
+        (staging / "text.bin").write_bytes(b"".join(encoded))
+        tables = (("sources", sources), ("file_types", file_types), ("tag_sets", tag_sets))
+        for name, table in tables:
+            (staging / f"{name}.json").write_text(json.dumps(table), encoding="utf-8")
+        metadata = MetadataIndex.from_records(chunks)
+        posting_values, posting_ids, posting_offsets = {}, [], [np.zeros(1, dtype=np.int64)]
+        for name in ("source", "file_type", "tag"):
+            values, ids, offsets = metadata.posting_lists(name)
+            posting_values[name] = values
+            posting_offsets.append(offsets[1:] + sum(len(part) for part in posting_ids))
+            posting_ids.append(ids)
+        np.save(staging / "postings.npy", np.concatenate(posting_ids))
+        np.save(staging / "posting_offsets.npy", np.concatenate(posting_offsets))
+        (staging / "postings.json").write_text(json.dumps(posting_values), encoding="utf-8")
+        manifest = {
+            "generation": generation,
+            "count": len(chunks),
+            "dimension": int(vectors.shape[1]) if len(chunks) else 0,
+            "created_at": time.time(),
+        }
+        (staging / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+        os.rename(staging, final)
+        pointer = self._root / f"{_CURRENT}.tmp-{os.getpid()}"
+        pointer.write_text(final.name, encoding="utf-8")
+        os.replace(pointer, self._root / _CURRENT)
+        self._prune(generation)
+        return generation
+
+    def _prune(self, generation: int) -> None:
+        # Readers that still map a pruned generation keep working: unlinked files stay
+        # readable until their last mapping is closed.
+        oldest_kept = generation - self._keep + 1
+        for path in self._root.glob("gen-*"):
+            suffix = path.name.split("-")[1]
+            if suffix.isdigit() and int(suffix) < oldest_kept:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+class SharedIndexReader:
+    """Reader side: follows `CURRENT`, polling for a new generation every `poll_seconds`.
+
+    A generation that cannot be opened is logged and the previous one keeps serving queries.
+    """
+
+    def __init__(self, root: str | Path, poll_seconds: float = 1.0) -> None:
+        self._root = Path(root)
+        self._poll_seconds = poll_seconds
+        self._generation: IndexGeneration | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> IndexGeneration | None:
+        now = time.monotonic()
+        if now - self._checked_at < self._poll_seconds:
+            return self._generation
+
+        with self._lock:
+            if now - self._checked_at >= self._poll_seconds:
+                self._refresh()
+                self._checked_at = time.monotonic()
+        return self._generation
+
+    def _refresh(self, attempts: int = 3) -> None:
+        for _ in range(attempts):
+            name = _read_current(self._root)
+            loaded = self._generation
+            if not name or (loaded is not None and loaded.path.name == name):
+                return
+            try:
+                # Callers hold their own reference, so swapping never disturbs a query that is
+                # still reading the previous generation.
+                self._generation = IndexGeneration(self._root / name)
+                return
+            except FileNotFoundError:
+                # The writer published again and pruned this generation before it was opened;
+                # CURRENT already names a newer one.
+                continue
+            except (OSError, ValueError, KeyError) as exc:
+                logger.warning("Cannot open index generation %s: %s", self._root / name, exc)
+                break
+        # Keep serving the last good generation (or nothing) and try again on the next poll.
+        loaded = self._generation
+        logger.warning(
+            "No readable index generation under %s; serving %s",
+            self._root,
+            loaded.path.name if loaded is not None else "no index",
+        )
@@ -1,6 +1,21 @@
 from __future__ import annotations
 
+import heapq
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from multi_agentic_platform.metrics import timed, track_stage
+
+STORAGE_MODES = ("float32", "fp16", "int8")
+
+# Resolved paths of open `ExactVectorFile`s; opening one truncates it, so paths cannot be shared.
+_open_vector_files: set[str] = set()
+_open_vector_files_lock = threading.Lock()
 
 
 @dataclass
@@ -9,38 +24,427 @@ class ScoredChunk:
     score: float
 
 
+def _import_faiss() -> Any:
+    try:
+        import faiss
+    except ImportError as exc:
+        raise ImportError("faiss-cpu is required. Install with: pip install faiss-cpu") from exc
+    return faiss
+
+
+def _new_index(faiss: Any, dimension: int, storage: str) -> Any:
+    """Build an inner-product index storing float32, fp16 or int8 codes."""
+    import numpy as np
+
+    if storage == "float32":
+        return faiss.IndexFlatIP(dimension)
+    if storage == "fp16":
+        return faiss.IndexScalarQuantizer(
+            dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+        )
+    if storage == "int8":
+        index = faiss.IndexScalarQuantizer(
+            dimension, faiss.ScalarQuantizer.QT_8bit_uniform, faiss.METRIC_INNER_PRODUCT
+        )
+        # Embeddings are L2-normalized, so every component lies in [-1, 1]. Training on those
+        # bounds fixes the quantizer range up front instead of guessing it from the first batch.
+        index.train(np.stack([np.full(dimension, -1.0), np.full(dimension, 1.0)]).astype("float32"))
+        return index
+    raise ValueError(f"Unknown vector storage mode: {storage} (expected one of {STORAGE_MODES})")
+
+
+def _id_selector(faiss: Any, allowed_ids, ntotal: int) -> Any:
+    """FAISS selector for `allowed_ids`: a hash set when sparse, a bitmap otherwise."""
+    import numpy as np
+
+    if len(allowed_ids) * 64 < ntotal:
+        return faiss.IDSelectorBatch(np.ascontiguousarray(allowed_ids, dtype=np.int64))
+    mask = np.zeros(ntotal, dtype=bool)
+    mask[allowed_ids] = True
+    return faiss.IDSelectorBitmap(np.packbits(mask, bitorder="little"))
+
+
+def _as_query(query_embedding):
+    import numpy as np
+
+    if query_embedding.ndim == 1:
+        query_embedding = np.expand_dims(query_embedding, axis=0)
+    if query_embedding.dtype != np.float32:
+        query_embedding = query_embedding.astype("float32")
+    return query_embedding
+
+
+class ExactVectorFile:
+    """Append-only float32 copy of the vectors on disk, memory-mapped for exact re-scoring.
+
+    Only the rows of shortlisted candidates are paged in, so the full-precision vectors cost
+    disk and page cache rather than resident memory. Without a path a temporary file is used and
+    removed on `close()`. A given path is truncated on open and may back one open file at a time.
+    """
+
+    def __init__(self, dimension: int, path: str | None = None) -> None:
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="map-vectors-", suffix=".f32")
+            os.close(fd)
+            self._owned = True
+        else:
+            self._owned = False
+        self._key = os.path.realpath(path)
+        with _open_vector_files_lock:
+            if self._key in _open_vector_files:
+                raise ValueError(f"Vector file {path} is already open in another store.")
+            _open_vector_files.add(self._key)
+        if not self._owned:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_bytes(b"")
+        self.path = path
+        self._dimension = dimension
+        self._rows = 0
+        self._map: Any = None
+        self._lock = threading.Lock()
+
+    def append(self, embeddings) -> None:
+        import numpy as np
+
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(np.ascontiguousarray(embeddings, dtype="float32").tobytes())
+            self._rows += len(embeddings)
+            self._map = None
+
+    def _mapped(self):
+        import numpy as np
+
+        with self._lock:
+            if self._map is None and self._rows:
+                self._map = np.memmap(
+                    self.path, dtype="float32", mode="r", shape=(self._rows, self._dimension)
+                )
+            return self._map
+
+    def rescore(self, query, chunk_ids: list[int], top_k: int) -> list[ScoredChunk]:
+        """Exact inner products for `chunk_ids`, best first."""
+        import numpy as np
+
+        if not chunk_ids:
+            return []
+        ids = np.asarray(chunk_ids, dtype=np.int64)
+        scores = self._mapped()[ids] @ query.reshape(-1)
+        order = np.argsort(-scores)[:top_k]
+        return [ScoredChunk(chunk_id=int(ids[i]), score=float(scores[i])) for i in order]
+
+    def vectors(self):
+        import numpy as np
+
+        mapped = self._mapped()
+        return np.array(mapped) if mapped is not None else np.empty((0, self._dimension), "float32")
+
+    def close(self) -> None:
+        with self._lock:
+            self._map = None
+        with _open_vector_files_lock:
+            _open_vector_files.discard(self._key)
+        if self._owned:
+            Path(self.path).unlink(missing_ok=True)
+
+
 class FaissStore:
-    def __init__(self, dimension: int) -> None:
-        try:
-            import faiss
-        except ImportError as exc:
-            raise ImportError("faiss-cpu is required. Install with: pip install faiss-cpu") from exc
+    """Flat inner-product index.
+
+    With `storage="fp16"` or `"int8"` vectors are kept as scalar-quantized codes (2 or 1 bytes per
+    dimension instead of 4). When `exact_rescore` is on, search shortlists `rescore_factor * top_k`
+    candidates from the codes and re-ranks them with full-precision vectors read from an
+    `ExactVectorFile`.
+    """
 
-        self._index = faiss.IndexFlatIP(dimension)
+    def __init__(
+        self,
+        dimension: int,
+        storage: str = "float32",
+        exact_rescore: bool = False,
+        rescore_factor: int = 4,
+        rescore_path: str | None = None,
+    ) -> None:
+        self._faiss = _import_faiss()
+        self._index = _new_index(self._faiss, dimension, storage)
+        self.storage = storage
+        self._rescore_factor = max(1, rescore_factor)
+        self._exact = (
+            ExactVectorFile(dimension, rescore_path)
+            if exact_rescore and storage != "float32"
+            else None
+        )
 
+    @timed("rag.index_add")
     def add(self, embeddings) -> None:
         import numpy as np
 
         if embeddings.dtype != np.float32:
             embeddings = embeddings.astype("float32")
         self._index.add(embeddings)
+        if self._exact is not None:
+            self._exact.append(embeddings)
 
-    def search(self, query_embedding, top_k: int) -> list[ScoredChunk]:
-        import numpy as np
-
-        if query_embedding.ndim == 1:
-            query_embedding = np.expand_dims(query_embedding, axis=0)
-        if query_embedding.dtype != np.float32:
-            query_embedding = query_embedding.astype("float32")
+    @timed("rag.search")
+    def search(self, query_embedding, top_k: int, allowed_ids=None) -> list[ScoredChunk]:
+        """Top `top_k` chunks by inner product, restricted to `allowed_ids` when given."""
+        query_embedding = _as_query(query_embedding)
+        shortlist = top_k * self._rescore_factor if self._exact is not None else top_k
 
-        scores, indices = self._index.search(query_embedding, top_k)
+        params = None
+        if allowed_ids is not None:
+            if len(allowed_ids) == 0:
+                return []
+            selector = _id_selector(self._faiss, allowed_ids, self.size)
+            params = self._faiss.SearchParameters(sel=selector)
+            shortlist = min(shortlist, len(allowed_ids))
+        scores, indices = self._index.search(query_embedding, shortlist, params=params)
         results: list[ScoredChunk] = []
         for score, idx in zip(scores[0], indices[0]):
             if idx < 0:
                 continue
             results.append(ScoredChunk(chunk_id=int(idx), score=float(score)))
+        if self._exact is not None:
+            with track_stage("rag.rescore"):
+                return self._exact.rescore(
+                    query_embedding, [item.chunk_id for item in results], top_k
+                )
         return results
 
+    def vectors(self):
+        """Return a copy of all stored vectors, in insertion order."""
+        if self._exact is not None:
+            return self._exact.vectors()
+        return self._index.reconstruct_n(0, self.size)
+
+    @property
+    def index_bytes(self) -> int:
+        """Bytes held by the in-memory index codes."""
+        return self.size * int(self._index.sa_code_size())
+
     @property
     def size(self) -> int:
         return int(self._index.ntotal)
+
+    def close(self) -> None:
+        if self._exact is not None:
+            self._exact.close()
+
+
+def create_store(
+    dimension: int,
+    num_shards: int = 1,
+    max_workers: int | None = None,
+    storage: str = "float32",
+    exact_rescore: bool = False,
+    rescore_factor: int = 4,
+    rescore_path: str | None = None,
+) -> FaissStore | ShardedFaissStore:
+    options = {
+        "storage": storage,
+        "exact_rescore": exact_rescore,
+        "rescore_factor": rescore_factor,
+        "rescore_path": rescore_path,
+    }
+    if num_shards > 1:
+        return ShardedFaissStore(
+            dimension, num_shards=num_shards, max_workers=max_workers, **options
+        )
+    return FaissStore(dimension, **options)
+
+
+class _Shard:
+    """One FAISS index plus the global chunk id of each of its rows."""
+
+    def __init__(self, index: Any) -> None:
+        import numpy as np
+
+        self.index = index
+        self._ids = np.empty(1024, dtype=np.int64)
+
+    @property
+    def size(self) -> int:
+        return int(self.index.ntotal)
+
+    @property
+    def ids(self):
+        return self._ids[: self.size]
+
+    def add(self, embeddings, first_id: int) -> None:
+        import numpy as np
+
+        size, count = self.size, len(embeddings)
+        if size + count > len(self._ids):
+            grown = np.empty(max(2 * len(self._ids), size + count), dtype=np.int64)
+            grown[:size] = self._ids[:size]
+            self._ids = grown
+        self._ids[size : size + count] = np.arange(first_id, first_id + count)
+        self.index.add(embeddings)
+
+    def search(self, query, top_k: int, allowed_mask=None) -> list[tuple[float, int]]:
+        import faiss
+        import numpy as np
+
+        if self.size == 0:
+            return []
+        ids = self.ids
+        params = None
+        if allowed_mask is not None:
+            local = allowed_mask[ids]
+            eligible = int(local.sum())
+            if eligible == 0:
+                return []
+            top_k = min(top_k, eligible)
+            bitmap = np.packbits(local, bitorder="little")
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBitmap(bitmap))
+        scores, positions = self.index.search(query, min(top_k, self.size), params=params)
+        return [
+            (float(score), int(ids[position]))
+            for score, position in zip(scores[0], positions[0])
+            if position >= 0
+        ]
+
+
+class ShardedFaissStore:
+    """Flat inner-product index partitioned across shards and searched in parallel.
+
+    Chunk ids stay global: each shard keeps the global ids of the rows it holds. New vectors go
+    to the least-filled shards, so shards added with `add_shard` absorb growth until the store is
+    balanced again. FAISS releases the GIL while searching, so a thread pool scans all shards
+    concurrently and the per-shard top-k lists are merged with a heap. Storage and exact
+    re-scoring options behave as in `FaissStore`; re-scoring runs once on the merged shortlist.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        num_shards: int = 4,
+        max_workers: int | None = None,
+        storage: str = "float32",
+        exact_rescore: bool = False,
+        rescore_factor: int = 4,
+        rescore_path: str | None = None,
+    ) -> None:
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        self._faiss = _import_faiss()
+        self._dimension = dimension
+        self._max_workers = max_workers
+        self.storage = storage
+        self._rescore_factor = max(1, rescore_factor)
+        self._exact = (
+            ExactVectorFile(dimension, rescore_path)
+            if exact_rescore and storage != "float32"
+            else None
+        )
+        self._shards: list[_Shard] = []
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._size = 0
+        for _ in range(num_shards):
+            self.add_shard()
+
+    def add_shard(self) -> int:
+        """Add an empty shard and return the new shard count."""
+        index = _new_index(self._faiss, self._dimension, self.storage)
+        with self._lock:
+            self._shards = [*self._shards, _Shard(index)]
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            return len(self._shards)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers or len(self._shards),
+                    thread_name_prefix="faiss-shard",
+                )
+            return self._executor
+
+    @timed("rag.index_add")
+    def add(self, embeddings) -> None:
+        import numpy as np
+
+        if embeddings.dtype != np.float32:
+            embeddings = embeddings.astype("float32")
+        with self._lock:
+            shards = sorted(self._shards, key=lambda shard: shard.size)
+            total = sum(shard.size for shard in shards) + len(embeddings)
+            target = -(-total // len(shards))
+            start = 0
+            for shard in shards:
+                count = min(max(target - shard.size, 0), len(embeddings) - start)
+                if count:
+                    shard.add(embeddings[start : start + count], first_id=self._size + start)
+                    start += count
+            if self._exact is not None:
+                # Rows are appended in global id order, so file row == chunk id.
+                self._exact.append(embeddings)
+            self._size += len(embeddings)
+
+    @timed("rag.search")
+    def search(self, query_embedding, top_k: int, allowed_ids=None) -> list[ScoredChunk]:
+        import numpy as np
+
+        query_embedding = _as_query(query_embedding)
+        shortlist = top_k * self._rescore_factor if self._exact is not None else top_k
+
+        mask = None
+        if allowed_ids is not None:
+            if len(allowed_ids) == 0:
+                return []
+            # Global ids map to different local rows per shard, so each shard derives its own
+            # bitmap from one global mask.
+            mask = np.zeros(self._size, dtype=bool)
+            mask[allowed_ids] = True
+
+        shards = self._shards
+        if len(shards) == 1:
+            partials = [shards[0].search(query_embedding, shortlist, mask)]
+        else:
+            partials = list(
+                self._pool().map(
+                    lambda shard: shard.search(query_embedding, shortlist, mask), shards
+                )
+            )
+        merged = heapq.nlargest(shortlist, (hit for partial in partials for hit in partial))
+        if self._exact is not None:
+            with track_stage("rag.rescore"):
+                return self._exact.rescore(
+                    query_embedding, [chunk_id for _, chunk_id in merged], top_k
+                )
+        return [ScoredChunk(chunk_id=chunk_id, score=score) for score, chunk_id in merged]
+
+    def vectors(self):
+        """Return a copy of all stored vectors, in global id order."""
+        import numpy as np
+
+        if self._exact is not None:
+            return self._exact.vectors()
+        with self._lock:
+            out = np.empty((self._size, self._dimension), dtype="float32")
+            for shard in self._shards:
+                if shard.size:
+                    out[shard.ids] = shard.index.reconstruct_n(0, shard.size)
+        return out
+
+    def shard_sizes(self) -> list[int]:
+        return [shard.size for shard in self._shards]
+
+    @property
+    def index_bytes(self) -> int:
+        return sum(shard.size * int(shard.index.sa_code_size()) for shard in self._shards)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        if self._exact is not None:
+            self._exact.close()
@@ -2,6 +2,8 @@ import asyncio
 import subprocess
 from dataclasses import dataclass
 
+from multi_agentic_platform.metrics import timed
+
 
 @dataclass
 class SandboxResult:
@@ -14,6 +16,7 @@ class SandboxExecutor:
     def __init__(self, timeout_seconds: int = 8) -> None:
         self.timeout_seconds = timeout_seconds
 
+    @timed("sandbox.python")
     async def run_python(self, code: str) -> SandboxResult:
         process = await asyncio.create_subprocess_exec(
             "python",
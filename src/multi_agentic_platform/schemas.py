@@ -1,10 +1,21 @@
+from datetime import datetime
+from typing import Annotated, Any
+
 from pydantic import BaseModel, Field
 
 
+class MCPBatchToolCall(BaseModel):
+    server: str
+    tool: str
+    arguments: dict[str, Any] = Field(default_factory=dict)
+
+
 class RunRequest(BaseModel):
     prompt: str = Field(..., min_length=3, max_length=8000)
     language: str = Field("python", min_length=2, max_length=32)
     require_review: bool = True
+    # MCP lookups the planner runs concurrently before planning; results join its prompt.
+    tool_calls: list[MCPBatchToolCall] = Field(default_factory=list, max_length=16)
 
 
 class AgentTrace(BaseModel):
@@ -19,8 +30,15 @@ class RunResponse(BaseModel):
     traces: list[AgentTrace]
 
 
+Tag = Annotated[str, Field(min_length=1, max_length=64)]
+# Collection names double as snapshot directory names.
+CollectionName = Annotated[str, Field(min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")]
+
+
 class RAGIngestRequest(BaseModel):
     paths: list[str] = Field(default_factory=list, min_length=1)
+    tags: list[Tag] = Field(default_factory=list, max_length=32)
+    collection: CollectionName = "default"
 
 
 class RAGTextDocument(BaseModel):
@@ -30,29 +48,69 @@ class RAGTextDocument(BaseModel):
 
 class RAGIngestTextRequest(BaseModel):
     documents: list[RAGTextDocument] = Field(default_factory=list, min_length=1)
+    tags: list[Tag] = Field(default_factory=list, max_length=32)
+    collection: CollectionName = "default"
 
 
 class RAGIngestResponse(BaseModel):
     documents: int
     chunks: int
     index_size: int
+    # Near-duplicate chunks collapsed into stored ones (each saved one embedding) and the index
+    # bytes their vectors would have taken.
+    duplicates: int = 0
+    index_bytes_saved: int = 0
+
+
+class RAGIndexInfo(BaseModel):
+    role: str
+    generation: int | None
+    chunks: int
+
+
+class RAGCollectionInfo(BaseModel):
+    name: str
+    # False while the collection is spilled to disk.
+    resident: bool
+    chunks: int
+    memory_bytes: int
+
+
+class RAGQueryFilter(BaseModel):
+    """Restricts retrieval to matching chunks. Any listed source or file type matches; all
+    listed tags are required."""
+
+    sources: list[str] | None = None
+    file_types: list[str] | None = None
+    tags: list[Tag] | None = None
+    ingested_after: datetime | None = None
+    ingested_before: datetime | None = None
 
 
 class RAGQueryRequest(BaseModel):
     query: str = Field(..., min_length=2, max_length=8000)
     top_k: int = Field(5, ge=1, le=20)
     use_agent_reranker: bool = False
+    filters: RAGQueryFilter | None = None
+    collection: CollectionName = "default"
 
 
 class RAGResult(BaseModel):
     chunk_id: int
     source: str
     text: str
+    file_type: str = "text"
+    tags: list[str] = Field(default_factory=list)
+    # Other sources that contained a near-duplicate of this chunk.
+    duplicate_sources: list[str] = Field(default_factory=list)
 
 
 class RAGQueryResponse(BaseModel):
     query: str
     results: list[RAGResult]
+    # Context tokens sent to the LLM reranker, and tokens removed by packing.
+    context_tokens: int = 0
+    context_tokens_saved: int = 0
 
 
 class WorkflowIngestRequest(BaseModel):
@@ -69,6 +127,30 @@ class WorkflowRunResponse(BaseModel):
     draft: str
     compliance_notes: str
     final_answer: str
+    # Context and draft tokens sent across the LLM calls, and tokens removed by packing.
+    context_tokens: int = 0
+    context_tokens_saved: int = 0
+
+
+class WorkflowBatchRunRequest(BaseModel):
+    queries: list[Annotated[str, Field(min_length=2, max_length=8000)]] = Field(
+        ..., min_length=1, max_length=256
+    )
+    max_concurrency: int | None = Field(None, ge=1, le=64)
+
+
+class WorkflowBatchStats(BaseModel):
+    queries: int
+    unique_queries: int
+    max_concurrency: int
+    retrieval_seconds: float
+    elapsed_seconds: float
+    queries_per_second: float
+
+
+class WorkflowBatchRunResponse(BaseModel):
+    results: list[WorkflowRunResponse]
+    stats: WorkflowBatchStats
 
 
 class MCPServerInfo(BaseModel):
@@ -80,3 +162,98 @@ class MCPServerInfo(BaseModel):
 class MCPToolsResponse(BaseModel):
     server: str
     tools: list[dict[str, str]]
+
+
+class MCPSessionStatus(BaseModel):
+    name: str
+    alive: bool
+    idle_seconds: float | None
+    tools_cached: bool
+
+
+class MCPToolCallRequest(BaseModel):
+    arguments: dict[str, Any] = Field(default_factory=dict)
+    timeout_seconds: float | None = Field(None, gt=0, le=600)
+
+
+class MCPBatchToolCallRequest(BaseModel):
+    calls: list[MCPBatchToolCall] = Field(..., min_length=1, max_length=64)
+    timeout_seconds: float | None = Field(None, gt=0, le=600)
+
+
+class MCPToolCallResult(BaseModel):
+    server: str
+    tool: str
+    ok: bool
+    content: list[dict[str, Any]]
+    is_error: bool
+    error: str | None
+    truncated: bool
+    latency_ms: float
+
+
+class MCPBatchToolCallResponse(BaseModel):
+    results: list[MCPToolCallResult]
+    elapsed_ms: float
+
+
+class MCPToolStats(BaseModel):
+    server: str
+    tool: str
+    calls: int
+    errors: int
+    timeouts: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+class ProfilingUpdate(BaseModel):
+    enabled: bool | None = None
+    threshold_ms: float | None = Field(None, ge=0)
+    sample_interval_ms: float | None = Field(None, ge=1, le=1000)
+    allocations: bool | None = None
+    buffer_size: int | None = Field(None, ge=1, le=10000)
+    top_allocations: int | None = Field(None, ge=0, le=1000)
+
+
+class ProfilingStatus(BaseModel):
+    enabled: bool
+    threshold_ms: float
+    sample_interval_ms: float
+    allocations: bool
+    buffer_size: int
+    top_allocations: int
+    stored_profiles: int
+
+
+class ProfileSummary(BaseModel):
+    id: int
+    method: str
+    path: str
+    status: int
+    started_at: datetime
+    duration_ms: float
+    trigger: str
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    attempts: int
+    cancel_requested: bool
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+    expires_at: datetime | None
+    # The RunResponse or WorkflowRunResponse of a succeeded job.
+    result: dict[str, Any] | None
+    error: str | None
+
+
+class JobQueueStats(BaseModel):
+    counts: dict[str, int]
+    workers: int
+    running_here: int
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """Thread-safe lazily built singleton.
+
+    `get()` builds on first use; `aget()` does the same without blocking the event loop while a
+    slow factory (e.g. a local model load) runs.
+    """
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self._factory = factory
+        self._value: T | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not None
+
+    def get(self) -> T:
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+        return self._value
+
+    async def aget(self) -> T:
+        if self._value is not None:
+            return self._value
+        return await asyncio.to_thread(self.get)
+
+
+@dataclass
+class ComponentStatus:
+    state: str = "pending"
+    seconds: float | None = None
+    error: str | None = None
+
+
+class WarmupTracker:
+    """Runs warmup steps off the event loop and records per-component readiness.
+
+    Only the `required` components (all of them when None) gate `ready`; the others are loaded
+    opportunistically and their failures are reported without blocking readiness. A required
+    component that was never registered keeps the tracker not ready, as does having no components
+    at all. Failed steps are retried after `retry_seconds`, backing off to at most
+    `max_retry_seconds` (0 disables).
+    """
+
+    def __init__(
+        self,
+        required: set[str] | None = None,
+        retry_seconds: float = 0.0,
+        max_retry_seconds: float = 600.0,
+    ) -> None:
+        self._components: dict[str, ComponentStatus] = {}
+        self._required = required
+        self._retry_seconds = retry_seconds
+        self._max_retry_seconds = max_retry_seconds
+
+    def register(self, name: str) -> None:
+        self._components.setdefault(name, ComponentStatus())
+
+    def start(self, steps: list[tuple[str, Callable[[], Any]]]) -> asyncio.Task[None]:
+        """Register every step as pending, then run them in a background task."""
+        for name, _ in steps:
+            self.register(name)
+        return asyncio.create_task(self.run(steps))
+
+    async def run(self, steps: list[tuple[str, Callable[[], Any]]]) -> None:
+        for name, _ in steps:
+            self.register(name)
+        pending = steps
+        delay = self._retry_seconds
+        while True:
+            for name, step in pending:
+                await self._run_step(name, step)
+            pending = [(name, step) for name, step in pending if not self._is_ready(name)]
+            if not pending or self._retry_seconds <= 0:
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self._max_retry_seconds)
+
+    async def _run_step(self, name: str, step: Callable[[], Any]) -> None:
+        status = self._components[name]
+        status.state = "loading"
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(step)
+        except Exception as exc:  # noqa: BLE001 - reported through /ready
+            status.state = "failed"
+            status.error = str(getattr(exc, "detail", None) or exc)
+        else:
+            status.state = "ready"
+            status.error = None
+        status.seconds = round(time.perf_counter() - started, 3)
+
+    def _is_ready(self, name: str) -> bool:
+        status = self._components.get(name)
+        return status is not None and status.state == "ready"
+
+    def _is_required(self, name: str) -> bool:
+        return self._required is None or name in self._required
+
+    @property
+    def ready(self) -> bool:
+        required = self._components if self._required is None else self._required
+        return bool(required) and all(self._is_ready(name) for name in required)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        snapshot = {
+            name: {
+                "state": status.state,
+                "seconds": status.seconds,
+                "error": status.error,
+                "required": self._is_required(name),
+            }
+            for name, status in self._components.items()
+        }
+        for name in sorted((self._required or set()) - self._components.keys()):
+            snapshot[name] = {
+                "state": "unregistered",
+                "seconds": None,
+                "error": "required for readiness but not warmed (see MAP_MODEL_WARMUP)",
+                "required": True,
+            }
+        return snapshot
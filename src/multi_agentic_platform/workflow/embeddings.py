@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from langchain_core.embeddings import Embeddings
+
+from multi_agentic_platform.rag.embedder import SentenceTransformerEmbedder
+
+
+class SharedEmbeddings(Embeddings):
+    """LangChain embeddings adapter over the process-wide shared sentence-transformer."""
+
+    def __init__(self, embedder: SentenceTransformerEmbedder) -> None:
+        self._embedder = embedder
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embedder.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embedder.encode([text])[0].tolist()
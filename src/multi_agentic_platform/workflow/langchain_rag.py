@@ -1,8 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from multi_agentic_platform.config import settings
+from multi_agentic_platform.rag.dedup import (
+    DedupReport,
+    NearDuplicateIndex,
+    collapse_duplicates,
+    record_dedup,
+)
+from multi_agentic_platform.rag.embedder import SentenceTransformerEmbedder
 from multi_agentic_platform.rag.loaders import load_document
 
 
@@ -11,6 +18,7 @@ class RetrievedContext:
     source: str
     text: str
     score: float
+    duplicate_sources: list[str] = field(default_factory=list)
 
 
 class LangChainRAGService:
@@ -18,65 +26,137 @@ class LangChainRAGService:
 
     def __init__(self) -> None:
         self._vs = None
+        self._embedder: SentenceTransformerEmbedder | None = None
+        self._embeddings = None
         self._documents: list[tuple[str, str]] = []
+        # Keyed by FAISS position, which follows the order of `_documents`.
+        self._dedup: NearDuplicateIndex | None = None
 
     def _ensure_imports(self):
         try:
-            from langchain_community.embeddings import HuggingFaceEmbeddings
             from langchain_community.vectorstores import FAISS
             from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+            from multi_agentic_platform.workflow.embeddings import SharedEmbeddings
         except ImportError as exc:
             raise ImportError(
                 "LangChain deps missing. Install: pip install langchain langchain-community "
                 "langchain-text-splitters"
             ) from exc
 
-        return HuggingFaceEmbeddings, FAISS, RecursiveCharacterTextSplitter
+        return SharedEmbeddings, FAISS, RecursiveCharacterTextSplitter
+
+    def warmup(self) -> None:
+        shared_embeddings_cls, _, _ = self._ensure_imports()
+        self._get_embeddings(shared_embeddings_cls)
+
+    def _get_embeddings(self, shared_embeddings_cls):
+        if self._embeddings is None:
+            self._embedder = SentenceTransformerEmbedder(
+                settings.rag_embedding_model, device=settings.rag_model_device
+            )
+            self._embeddings = shared_embeddings_cls(self._embedder)
+        return self._embeddings
 
     def ingest_paths(self, paths: list[str]) -> dict[str, int]:
         docs = [load_document(path) for path in paths]
         return self.ingest_documents(docs)
 
     def ingest_documents(self, docs: list[tuple[str, str]]) -> dict[str, int]:
-        HuggingFaceEmbeddings, FAISS, RecursiveCharacterTextSplitter = self._ensure_imports()
+        SharedEmbeddings, FAISS, RecursiveCharacterTextSplitter = self._ensure_imports()
 
         splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.rag_chunk_size,
             chunk_overlap=settings.rag_chunk_overlap,
         )
-        embeddings = HuggingFaceEmbeddings(model_name=settings.rag_embedding_model)
+        embeddings = self._get_embeddings(SharedEmbeddings)
 
+        if settings.rag_dedup_threshold > 0 and self._dedup is None:
+            self._dedup = NearDuplicateIndex(
+                threshold=settings.rag_dedup_threshold, num_perm=settings.rag_dedup_num_perm
+            )
+            for position, (_, text) in enumerate(self._documents):
+                self._dedup.add(position, self._dedup.signature(text))
+
+        base = len(self._documents)
         texts: list[str] = []
-        metadatas: list[dict[str, str]] = []
+        metadatas: list[dict] = []
+        report = DedupReport()
         for source, content in docs:
             chunks = splitter.split_text(content)
-            texts.extend(chunks)
-            metadatas.extend({"source": source} for _ in chunks)
-            self._documents.extend((source, chunk) for chunk in chunks)
-
-        if not texts:
-            return {"documents": len(docs), "chunks": 0, "index_size": len(self._documents)}
+            unique, collapsed = chunks, []
+            if self._dedup is not None:
+                unique, collapsed = collapse_duplicates(self._dedup, chunks, base + len(texts))
+            texts.extend(unique)
+            metadatas.extend({"source": source} for _ in unique)
+            for canonical in collapsed:
+                metadata = (
+                    metadatas[canonical - base]
+                    if canonical >= base
+                    else self._stored_metadata(canonical)
+                )
+                others = metadata.setdefault("duplicate_sources", [])
+                if source != metadata["source"] and source not in others:
+                    others.append(source)
+            report.chunks += len(chunks)
+            report.duplicates += len(collapsed)
+
+        result = {"documents": len(docs), "chunks": len(texts), "duplicates": report.duplicates}
+        if texts:
+            try:
+                new_vs = FAISS.from_texts(texts=texts, embedding=embeddings, metadatas=metadatas)
+            except BaseException:
+                # The index already holds positions for chunks that were not stored.
+                self._dedup = None
+                raise
+            if self._vs is None:
+                self._vs = new_vs
+            else:
+                self._vs.merge_from(new_vs)
+            self._documents.extend(
+                (metadata["source"], text) for metadata, text in zip(metadatas, texts)
+            )
+        if self._vs is not None:
+            report.index_bytes_saved = report.duplicates * int(self._vs.index.d) * 4
+        record_dedup(report)
 
-        new_vs = FAISS.from_texts(texts=texts, embedding=embeddings, metadatas=metadatas)
-        if self._vs is None:
-            self._vs = new_vs
-        else:
-            self._vs.merge_from(new_vs)
+        return {
+            **result,
+            "index_size": len(self._documents),
+            "index_bytes_saved": report.index_bytes_saved,
+        }
 
-        return {"documents": len(docs), "chunks": len(texts), "index_size": len(self._documents)}
+    def _stored_metadata(self, position: int) -> dict:
+        return self._vs.docstore.search(self._vs.index_to_docstore_id[position]).metadata
 
     def retrieve(self, query: str, top_k: int = 5) -> list[RetrievedContext]:
-        if self._vs is None:
-            return []
-
-        docs_and_scores = self._vs.similarity_search_with_score(query, k=max(top_k * 3, top_k))
-        contexts = [
-            RetrievedContext(
-                source=item[0].metadata.get("source", "unknown"),
-                text=item[0].page_content,
-                score=float(item[1]),
-            )
-            for item in docs_and_scores
-        ]
-        contexts.sort(key=lambda row: row.score)
-        return contexts[:top_k]
+        return self.retrieve_batch([query], top_k=top_k)[0]
+
+    def retrieve_batch(self, queries: list[str], top_k: int = 5) -> list[list[RetrievedContext]]:
+        """Embed all queries in one forward pass and search them with one FAISS call."""
+        if self._vs is None or self._embedder is None or not queries:
+            return [[] for _ in queries]
+
+        unique_queries = list(dict.fromkeys(queries))
+        query_vectors = self._embedder.encode(unique_queries)
+        k = min(max(top_k * 3, top_k), int(self._vs.index.ntotal))
+        scores, indices = self._vs.index.search(query_vectors, k)
+
+        by_query: dict[str, list[RetrievedContext]] = {}
+        for query, row_scores, row_indices in zip(unique_queries, scores, indices):
+            contexts: list[RetrievedContext] = []
+            for score, idx in zip(row_scores, row_indices):
+                if idx < 0:
+                    continue
+                doc = self._vs.docstore.search(self._vs.index_to_docstore_id[int(idx)])
+                contexts.append(
+                    RetrievedContext(
+                        source=doc.metadata.get("source", "unknown"),
+                        text=doc.page_content,
+                        score=float(score),
+                        duplicate_sources=list(doc.metadata.get("duplicate_sources", [])),
+                    )
+                )
+            contexts.sort(key=lambda row: row.score)
+            by_query[query] = contexts[:top_k]
+        return [by_query[query] for query in queries]
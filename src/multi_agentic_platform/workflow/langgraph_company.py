@@ -1,7 +1,17 @@
 from __future__ import annotations
 
-from typing import TypedDict
-
+import asyncio
+import time
+from typing import Any, TypedDict
+
+from multi_agentic_platform.config import settings
+from multi_agentic_platform.context_packing import (
+    ContextItem,
+    fit_text,
+    pack_context,
+    track_context_tokens,
+)
+from multi_agentic_platform.metrics import timed, track_stage
 from multi_agentic_platform.providers.base import LLMProvider
 from multi_agentic_platform.workflow.langchain_rag import LangChainRAGService
 
@@ -14,14 +24,33 @@ class CompanyWorkflowState(TypedDict):
     final_answer: str
 
 
+def _context_items(contexts: list[str]) -> list[ContextItem]:
+    # Contexts arrive best first as "[source] text"; the rank stands in for the score and the
+    # source prefix is kept out of overlap detection.
+    items: list[ContextItem] = []
+    for rank, context in enumerate(contexts):
+        header, separator, body = context.partition("] ")
+        if context.startswith("[") and separator:
+            items.append(ContextItem(text=body, score=-rank, header=f"{header}]"))
+        else:
+            items.append(ContextItem(text=context, score=-rank))
+    return items
+
+
 class CompanyWorkflow:
     """LangGraph workflow representing a core company request lifecycle."""
 
     def __init__(self, provider: LLMProvider, rag_service: LangChainRAGService) -> None:
         self._provider = provider
         self._rag = rag_service
+        self._graphs: dict[bool, Any] = {}
 
-    def _build_graph(self):
+    def _get_graph(self, with_retrieval: bool = True):
+        if with_retrieval not in self._graphs:
+            self._graphs[with_retrieval] = self._build_graph(with_retrieval)
+        return self._graphs[with_retrieval]
+
+    def _build_graph(self, with_retrieval: bool = True):
         try:
             from langgraph.graph import END, START, StateGraph
         except ImportError as exc:
@@ -29,12 +58,24 @@ class CompanyWorkflow:
 
         graph = StateGraph(CompanyWorkflowState)
 
+        @timed("workflow.retrieve")
         async def retrieve_node(state: CompanyWorkflowState) -> CompanyWorkflowState:
             results = self._rag.retrieve(state["query"], top_k=5)
             return {**state, "contexts": [f"[{r.source}] {r.text}" for r in results]}
 
+        budget = settings.context_token_budget or None
+        count_tokens = self._provider.count_tokens
+
+        @timed("workflow.draft")
         async def draft_node(state: CompanyWorkflowState) -> CompanyWorkflowState:
-            context_block = "\n\n".join(state["contexts"]) if state["contexts"] else "No context"
+            packed = pack_context(
+                _context_items(state["contexts"]),
+                budget=budget,
+                count_tokens=count_tokens,
+                min_overlap_chars=settings.context_min_overlap_chars,
+                call="workflow.draft",
+            )
+            context_block = "\n\n".join(item.text for item in packed.items) or "No context"
             draft = await self._provider.generate(
                 system=(
                     "You are an open-source enterprise operations assistant. "
@@ -44,17 +85,28 @@ class CompanyWorkflow:
             )
             return {**state, "draft": draft}
 
+        @timed("workflow.compliance")
         async def compliance_node(state: CompanyWorkflowState) -> CompanyWorkflowState:
             notes = await self._provider.generate(
                 system=(
                     "You are a compliance reviewer. Return 2-4 concise bullets focused on "
                     "privacy, security, and policy risks."
                 ),
-                prompt=f"Evaluate this draft response:\n{state['draft']}",
+                prompt=(
+                    "Evaluate this draft response:\n"
+                    f"{fit_text(state['draft'], budget, count_tokens, call='workflow.compliance')}"
+                ),
             )
             return {**state, "compliance_notes": notes}
 
+        @timed("workflow.finalize")
         async def finalize_node(state: CompanyWorkflowState) -> CompanyWorkflowState:
+            # The draft gets whatever budget the request and compliance notes leave over.
+            draft_budget = None
+            if budget is not None:
+                overhead = count_tokens(state["query"]) + count_tokens(state["compliance_notes"])
+                draft_budget = max(0, budget - overhead)
+            draft = fit_text(state["draft"], draft_budget, count_tokens, call="workflow.finalize")
             final_answer = await self._provider.generate(
                 system=(
                     "You are a final response editor. Produce a clean final answer with action "
@@ -62,34 +114,40 @@ class CompanyWorkflow:
                 ),
                 prompt=(
                     f"Original request:\n{state['query']}\n\n"
-                    f"Draft:\n{state['draft']}\n\n"
+                    f"Draft:\n{draft}\n\n"
                     f"Compliance notes:\n{state['compliance_notes']}"
                 ),
             )
             return {**state, "final_answer": final_answer}
 
-        graph.add_node("retrieve", retrieve_node)
         graph.add_node("draft", draft_node)
         graph.add_node("compliance", compliance_node)
         graph.add_node("finalize", finalize_node)
-        graph.add_edge(START, "retrieve")
-        graph.add_edge("retrieve", "draft")
+        if with_retrieval:
+            graph.add_node("retrieve", retrieve_node)
+            graph.add_edge(START, "retrieve")
+            graph.add_edge("retrieve", "draft")
+        else:
+            # Batch runs retrieve for every query up front and seed the state with contexts.
+            graph.add_edge(START, "draft")
         graph.add_edge("draft", "compliance")
         graph.add_edge("compliance", "finalize")
         graph.add_edge("finalize", END)
 
         return graph.compile()
 
-    async def run(self, query: str) -> dict[str, str | list[str]]:
-        app = self._build_graph()
-        initial_state: CompanyWorkflowState = {
+    @staticmethod
+    def _initial_state(query: str, contexts: list[str] | None = None) -> CompanyWorkflowState:
+        return {
             "query": query,
-            "contexts": [],
+            "contexts": contexts or [],
             "draft": "",
             "compliance_notes": "",
             "final_answer": "",
         }
-        result = await app.ainvoke(initial_state)
+
+    @staticmethod
+    def _to_result(query: str, result: CompanyWorkflowState) -> dict[str, str | list[str]]:
         return {
             "query": query,
             "contexts": result.get("contexts", []),
@@ -97,3 +155,56 @@ class CompanyWorkflow:
             "compliance_notes": result.get("compliance_notes", ""),
             "final_answer": result.get("final_answer", ""),
         }
+
+    async def run(self, query: str) -> dict[str, Any]:
+        app = self._get_graph()
+        with track_context_tokens() as tokens:
+            result = await app.ainvoke(self._initial_state(query))
+        return {
+            **self._to_result(query, result),
+            "context_tokens": tokens.tokens,
+            "context_tokens_saved": tokens.tokens_saved,
+        }
+
+    async def run_batch(
+        self, queries: list[str], max_concurrency: int | None = None
+    ) -> dict[str, Any]:
+        """Retrieve contexts for all queries at once, then fan the LLM nodes out concurrently."""
+        app = self._get_graph(with_retrieval=False)
+        concurrency = max_concurrency or settings.workflow_batch_concurrency
+        started = time.perf_counter()
+
+        with track_stage("workflow.retrieve_batch"):
+            retrieved = await asyncio.to_thread(self._rag.retrieve_batch, queries, 5)
+        retrieval_seconds = time.perf_counter() - started
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(query: str, contexts: list[str]) -> dict[str, Any]:
+            async with semaphore:
+                with track_context_tokens() as tokens:
+                    result = await app.ainvoke(self._initial_state(query, contexts))
+            return {
+                **self._to_result(query, result),
+                "context_tokens": tokens.tokens,
+                "context_tokens_saved": tokens.tokens_saved,
+            }
+
+        results = await asyncio.gather(
+            *(
+                run_one(query, [f"[{r.source}] {r.text}" for r in rows])
+                for query, rows in zip(queries, retrieved)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        return {
+            "results": results,
+            "stats": {
+                "queries": len(queries),
+                "unique_queries": len(set(queries)),
+                "max_concurrency": concurrency,
+                "retrieval_seconds": round(retrieval_seconds, 4),
+                "elapsed_seconds": round(elapsed, 4),
+                "queries_per_second": round(len(queries) / elapsed, 3) if elapsed > 0 else 0.0,
+            },
+        }
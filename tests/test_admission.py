@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import pytest
+
+from multi_agentic_platform.admission import AdmissionPool, AdmissionRejected, PoolLimit
+
+
+def _pool(max_concurrency: int = 1, max_queue: int = 1, queue_timeout: float = 5.0):
+    return AdmissionPool("test", PoolLimit(max_concurrency, max_queue, queue_timeout))
+
+
+async def _until_waiting(pool: AdmissionPool, count: int) -> None:
+    while pool.waiting < count:
+        await asyncio.sleep(0)
+
+
+def test_admits_up_to_the_limit_then_rejects_when_the_queue_is_full():
+    async def scenario():
+        pool = _pool(max_concurrency=2, max_queue=1)
+        await pool.acquire()
+        await pool.acquire()
+        queued = asyncio.create_task(pool.acquire())
+        await _until_waiting(pool, 1)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await pool.acquire()
+        assert (rejected.value.status, rejected.value.reason) == (429, "queue_full")
+        assert rejected.value.retry_after >= 1
+
+        pool.release()
+        await queued
+        assert (pool.in_flight, pool.waiting) == (2, 0)
+
+    asyncio.run(scenario())
+
+
+def test_interactive_request_sheds_the_newest_queued_batch_request():
+    async def scenario():
+        pool = _pool(max_concurrency=1, max_queue=2)
+        await pool.acquire()
+        older = asyncio.create_task(pool.acquire("batch"))
+        newer = asyncio.create_task(pool.acquire("batch"))
+        await _until_waiting(pool, 2)
+
+        interactive = asyncio.create_task(pool.acquire("interactive"))
+        with pytest.raises(AdmissionRejected) as shed:
+            await newer
+        assert (shed.value.status, shed.value.reason) == (429, "shed")
+        assert pool.waiting == 2
+
+        # Interactive goes first even though the older batch request queued before it.
+        pool.release()
+        await interactive
+        assert not older.done()
+        pool.release()
+        await older
+        assert (pool.in_flight, pool.waiting) == (1, 0)
+
+    asyncio.run(scenario())
+
+
+def test_batch_request_is_rejected_rather_than_shedding_an_interactive_one():
+    async def scenario():
+        pool = _pool(max_concurrency=1, max_queue=1)
+        await pool.acquire()
+        queued = asyncio.create_task(pool.acquire("interactive"))
+        await _until_waiting(pool, 1)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await pool.acquire("batch")
+        assert rejected.value.reason == "queue_full"
+        assert not queued.done()
+        queued.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_and_deadline_reject_with_503():
+    async def scenario():
+        pool = _pool(max_concurrency=1, max_queue=4, queue_timeout=0.02)
+        await pool.acquire()
+
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await pool.acquire()
+        assert (timed_out.value.status, timed_out.value.reason) == (503, "timeout")
+
+        with pytest.raises(AdmissionRejected) as expired:
+            await pool.acquire(deadline=time.monotonic() - 1)
+        assert (expired.value.status, expired.value.reason) == (503, "deadline")
+
+        pool.limit.queue_timeout = 5.0
+        with pytest.raises(AdmissionRejected) as deadline:
+            await pool.acquire(deadline=time.monotonic() + 0.02)
+        assert (deadline.value.status, deadline.value.reason) == (503, "deadline")
+
+        assert (pool.in_flight, pool.waiting) == (1, 0)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_gives_up_its_place_without_leaking_a_slot():
+    async def scenario():
+        pool = _pool(max_concurrency=1, max_queue=2)
+        await pool.acquire()
+        cancelled = asyncio.create_task(pool.acquire())
+        survivor = asyncio.create_task(pool.acquire())
+        await _until_waiting(pool, 2)
+
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert pool.waiting == 1
+
+        pool.release()
+        await survivor
+        assert (pool.in_flight, pool.waiting) == (1, 0)
+        pool.release()
+        assert pool.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_slot_granted_to_a_waiter_cancelled_at_the_same_time_is_passed_on():
+    async def scenario():
+        pool = _pool(max_concurrency=1, max_queue=2)
+        await pool.acquire()
+        first = asyncio.create_task(pool.acquire())
+        second = asyncio.create_task(pool.acquire())
+        await _until_waiting(pool, 2)
+
+        # The slot goes to `first`, which is cancelled before it gets to run.
+        pool.release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await second
+        assert (pool.in_flight, pool.waiting) == (1, 0)
+
+    asyncio.run(scenario())
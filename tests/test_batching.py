@@ -0,0 +1,165 @@
+import asyncio
+import threading
+
+import pytest
+
+from multi_agentic_platform.metrics import _request_timings, track_stage
+from multi_agentic_platform.rag.batching import MicroBatcher
+
+
+class _Recorder:
+    def __init__(self, fail: Exception | None = None, drop_one: bool = False) -> None:
+        self.batches: list[list[int]] = []
+        self.threads: set[str] = set()
+        self.fail = fail
+        self.drop_one = drop_one
+
+    def __call__(self, items: list[int]) -> list[int]:
+        self.batches.append(list(items))
+        self.threads.add(threading.current_thread().name)
+        if self.fail is not None:
+            raise self.fail
+        results = [item * 10 for item in items]
+        return results[:-1] if self.drop_one else results
+
+
+def test_full_batch_runs_without_waiting_for_the_timer():
+    run = _Recorder()
+    batcher = MicroBatcher("full", run, max_batch_size=4, max_wait_ms=10_000)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(item) for item in range(4))), timeout=5
+        )
+
+    try:
+        assert asyncio.run(scenario()) == [0, 10, 20, 30]
+    finally:
+        batcher.close()
+    assert run.batches == [[0, 1, 2, 3]]
+    assert run.threads == {"batch-full_0"}
+
+
+def test_partial_batch_runs_once_the_oldest_call_waited_max_wait():
+    run = _Recorder()
+    batcher = MicroBatcher("partial", run, max_batch_size=32, max_wait_ms=20)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.submit(item) for item in range(3)))
+
+    try:
+        assert asyncio.run(scenario()) == [0, 10, 20]
+    finally:
+        batcher.close()
+    assert run.batches == [[0, 1, 2]]
+
+
+def test_overflow_is_split_into_max_batch_size_batches():
+    run = _Recorder()
+    batcher = MicroBatcher("split", run, max_batch_size=2, max_wait_ms=10_000)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(item) for item in range(4))), timeout=5
+        )
+
+    try:
+        assert asyncio.run(scenario()) == [0, 10, 20, 30]
+    finally:
+        batcher.close()
+    assert run.batches == [[0, 1], [2, 3]]
+
+
+def test_cancelled_calls_are_not_computed():
+    run = _Recorder()
+    batcher = MicroBatcher("cancel", run, max_batch_size=32, max_wait_ms=50)
+
+    async def scenario():
+        tasks = [asyncio.create_task(batcher.submit(item)) for item in range(3)]
+        await asyncio.sleep(0)
+        tasks[1].cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert isinstance(results[1], asyncio.CancelledError)
+        return [results[0], results[2]]
+
+    try:
+        assert asyncio.run(scenario()) == [0, 20]
+    finally:
+        batcher.close()
+    assert run.batches == [[0, 2]]
+
+
+def test_run_errors_and_wrong_result_counts_reach_every_caller():
+    async def scenario(batcher: MicroBatcher):
+        return await asyncio.gather(
+            *(batcher.submit(item) for item in range(2)), return_exceptions=True
+        )
+
+    failing = MicroBatcher("failing", _Recorder(fail=ValueError("boom")), max_wait_ms=5)
+    short = MicroBatcher("short", _Recorder(drop_one=True), max_wait_ms=5)
+    try:
+        errors = asyncio.run(scenario(failing))
+        assert all(isinstance(error, ValueError) for error in errors)
+        errors = asyncio.run(scenario(short))
+        assert all(isinstance(error, RuntimeError) for error in errors)
+        assert "expected 2 results, got 1" in str(errors[0])
+    finally:
+        failing.close()
+        short.close()
+
+
+def test_batcher_restarts_its_worker_on_a_new_event_loop():
+    run = _Recorder()
+    batcher = MicroBatcher("loops", run, max_batch_size=1)
+    try:
+        assert asyncio.run(batcher.submit(1)) == 10
+        assert asyncio.run(batcher.submit(2)) == 20
+    finally:
+        batcher.close()
+    assert run.batches == [[1], [2]]
+
+
+def test_a_lone_call_does_not_wait_for_company():
+    run = _Recorder()
+    batcher = MicroBatcher("lone", run, max_batch_size=32, max_wait_ms=10_000)
+
+    async def scenario():
+        first = await asyncio.wait_for(batcher.submit(1), timeout=5)
+        second = await asyncio.wait_for(batcher.submit(2), timeout=5)
+        return [first, second]
+
+    try:
+        assert asyncio.run(scenario()) == [10, 20]
+    finally:
+        batcher.close()
+    assert run.batches == [[1], [2]]
+
+
+def test_stages_timed_in_a_batch_reach_every_caller():
+    def run(items: list[int]) -> list[int]:
+        with track_stage("model.forward"):
+            return [item * 10 for item in items]
+
+    batcher = MicroBatcher("traced", run, max_batch_size=3, max_wait_ms=10_000)
+
+    async def request(item: int) -> list[str]:
+        timings: list[tuple[str, float]] = []
+        _request_timings.set(timings)
+        await batcher.submit(item)
+        return [stage for stage, _ in timings]
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(request(item) for item in range(3))), timeout=5
+        )
+
+    try:
+        breakdowns = asyncio.run(scenario())
+    finally:
+        batcher.close()
+    assert breakdowns == [["model.forward", "batch.traced"]] * 3
+
+
+def test_max_batch_size_must_be_positive():
+    with pytest.raises(ValueError):
+        MicroBatcher("invalid", _Recorder(), max_batch_size=0)
@@ -0,0 +1,81 @@
+import threading
+
+import numpy as np
+
+from multi_agentic_platform.rag.collection_manager import COLLECTION_LOADS, CollectionManager
+from multi_agentic_platform.rag.vector_store import FaissStore
+
+DIMENSION = 8
+
+
+def _manager(budget: int | None = 1) -> CollectionManager:
+    return CollectionManager(lambda dimension, *_: FaissStore(dimension), budget)
+
+
+def _ingest(manager: CollectionManager, name: str, count: int) -> np.ndarray:
+    vectors = np.random.default_rng(count).standard_normal((count, DIMENSION)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    with manager.use(name, create=True) as collection:
+        texts = [f"{name} chunk {i}" for i in range(count)]
+        collection.add(vectors, texts, f"{name}.md", "md", 1.0, ("team",))
+    return vectors
+
+
+def _resident(manager: CollectionManager) -> dict[str, bool]:
+    return {row["name"]: row["resident"] for row in manager.describe()}
+
+
+def test_least_recently_used_collections_spill_and_reload_intact():
+    manager = _manager()
+    vectors = _ingest(manager, "alpha", 6)
+    _ingest(manager, "beta", 4)
+
+    assert _resident(manager) == {"alpha": False, "beta": True}
+    assert [row["chunks"] for row in manager.describe()] == [6, 4]
+
+    with manager.use("alpha") as alpha:
+        assert [chunk.text for chunk in alpha.chunks] == [f"alpha chunk {i}" for i in range(6)]
+        assert alpha.store.search(vectors[2], top_k=1)[0].chunk_id == 2
+    assert _resident(manager) == {"alpha": True, "beta": False}
+    with manager.use("missing") as missing:
+        assert missing is None
+    manager.close()
+
+
+def test_concurrent_users_share_one_load_without_blocking_other_collections():
+    manager = _manager(budget=None)
+    _ingest(manager, "alpha", 6)
+    _ingest(manager, "beta", 4)
+    with manager._lock:
+        manager._spill(manager.get("alpha"))
+
+    loading, release = threading.Event(), threading.Event()
+    load = manager._load
+
+    def slow_load(name):
+        loading.set()
+        release.wait(5)
+        return load(name)
+
+    manager._load = slow_load
+    loads = COLLECTION_LOADS.value()
+    sizes: list[int] = []
+
+    def query() -> None:
+        with manager.use("alpha") as alpha:
+            sizes.append(alpha.size)
+
+    threads = [threading.Thread(target=query) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    assert loading.wait(5)
+    # Another collection is served while "alpha" is still loading.
+    with manager.use("beta") as beta:
+        assert beta.size == 4
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert sizes == [6, 6, 6]
+    assert COLLECTION_LOADS.value() - loads == 1
+    manager.close()
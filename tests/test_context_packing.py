@@ -0,0 +1,104 @@
+from multi_agentic_platform.context_packing import (
+    ContextItem,
+    estimate_tokens,
+    fit_text,
+    pack_context,
+    track_context_tokens,
+    truncate_to_tokens,
+)
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+def _sentence(word: str, count: int) -> str:
+    return " ".join(f"{word}{i}" for i in range(count))
+
+
+def test_everything_fits_and_keeps_the_original_order():
+    items = [
+        ContextItem(_sentence("a", 5), score=0.1, header="[a.md]"),
+        ContextItem(_sentence("b", 5), score=0.9, header="[b.md]"),
+    ]
+
+    result = pack_context(items, budget=100, count_tokens=_words)
+
+    assert [item.index for item in result.items] == [0, 1]
+    assert result.items[0].text == "[a.md] " + _sentence("a", 5)
+    assert result.tokens_after == result.tokens_before == 12
+    assert result.dropped == result.truncated == result.duplicates_removed == 0
+
+
+def test_budget_keeps_the_best_scores_truncates_one_and_drops_the_rest():
+    items = [
+        ContextItem(_sentence("low", 10), score=0.1),
+        ContextItem(_sentence("top", 10), score=0.9),
+        ContextItem(_sentence("mid", 10), score=0.5),
+        ContextItem(_sentence("min", 10), score=0.0),
+    ]
+
+    result = pack_context(items, budget=16, count_tokens=_words, min_truncated_tokens=4)
+
+    assert [(item.index, item.truncated) for item in result.items] == [(1, False), (2, True)]
+    assert result.items[1].text == _sentence("mid", 6)
+    assert result.tokens_after == 16
+    assert result.truncated == 1
+    assert result.dropped == 2
+    assert result.tokens_saved == 40 - 16
+
+
+def test_too_little_budget_left_drops_instead_of_truncating():
+    items = [ContextItem(_sentence("a", 10), score=1.0), ContextItem(_sentence("b", 10))]
+
+    result = pack_context(items, budget=12, count_tokens=_words, min_truncated_tokens=4)
+
+    assert [item.index for item in result.items] == [0]
+    assert result.dropped == 1 and result.truncated == 0
+
+
+def test_duplicates_and_contained_items_are_removed():
+    base = _sentence("w", 20)
+    items = [
+        ContextItem(base, score=0.9),
+        ContextItem(base, score=0.8),
+        ContextItem(_sentence("w", 8), score=0.7),
+        ContextItem(_sentence("other", 5), score=0.1),
+    ]
+
+    result = pack_context(items, budget=None, count_tokens=_words)
+
+    assert [item.index for item in result.items] == [0, 3]
+    assert result.duplicates_removed == 2
+
+
+def test_chunk_overlap_is_trimmed_from_neighbours():
+    words = _sentence("t", 200).split()
+    # Neighbouring chunks share 20 words, like the chunker's overlap.
+    first, second = " ".join(words[:120]), " ".join(words[100:])
+    items = [ContextItem(first, score=0.9), ContextItem(second, score=0.8)]
+
+    result = pack_context(items, budget=None, min_overlap_chars=40)
+
+    assert [item.index for item in result.items] == [0, 1]
+    assert " ".join(item.text for item in result.items).split() == words
+    assert result.tokens_after < result.tokens_before
+
+
+def test_truncation_cuts_at_a_word_boundary():
+    text = "alpha beta gamma delta epsilon"
+    assert truncate_to_tokens(text, 3, _words) == "alpha beta gamma"
+    assert truncate_to_tokens(text, 10, _words) == text
+    assert truncate_to_tokens(text, 0, _words) == ""
+    assert estimate_tokens("abcdefgh") == 2
+
+
+def test_savings_are_reported_per_request_and_call():
+    with track_context_tokens() as report:
+        pack_context([ContextItem(_sentence("a", 10))] * 2, budget=None, call="rag")
+        fit_text(_sentence("b", 40), budget=5, count_tokens=_words, call="review")
+
+    assert report.saved_by_call["review"] == 35
+    assert report.saved_by_call["rag"] > 0
+    assert report.tokens_saved == sum(report.saved_by_call.values())
+    assert report.tokens > 0
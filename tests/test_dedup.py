@@ -0,0 +1,82 @@
+from multi_agentic_platform.rag.dedup import NearDuplicateIndex, collapse_duplicates
+from multi_agentic_platform.rag.metadata import (
+    ChunkAlias,
+    ChunkRecord,
+    MetadataFilter,
+    MetadataIndex,
+)
+
+WORDS = (
+    "onboarding requires a signed contract a laptop request security training and a buddy "
+    "assigned by the team lead before the first day new hires also receive access to the wiki "
+    "the ticket tracker the shared calendar and the deployment dashboard after their manager "
+    "approves the request in the identity portal"
+).split()
+
+
+def _text(offset: int, replace: dict[int, str] | None = None) -> str:
+    words = [
+        WORDS[(offset + index) % len(WORDS)] + str(index // len(WORDS)) for index in range(120)
+    ]
+    for position, word in (replace or {}).items():
+        words[position] = word
+    return " ".join(words)
+
+
+def test_exact_and_near_duplicates_collapse_onto_the_first_chunk():
+    index = NearDuplicateIndex(threshold=0.9)
+    original, other = _text(0), _text(7)
+    near = _text(0, replace={60: "changed"})
+
+    unique, collapsed = collapse_duplicates(index, [original, other, original, near], next_id=10)
+
+    assert unique == [original, other]
+    assert collapsed == [10, 10]
+    assert len(index) == 2
+
+
+def test_later_batches_collapse_onto_chunks_from_earlier_batches():
+    index = NearDuplicateIndex(threshold=0.9)
+    first, _ = collapse_duplicates(index, [_text(0), _text(7)], next_id=0)
+    assert len(first) == 2
+
+    fresh = _text(13)
+    unique, collapsed = collapse_duplicates(index, [_text(7), fresh], next_id=2)
+
+    assert unique == [fresh]
+    assert collapsed == [1]
+    assert collapse_duplicates(index, [fresh], next_id=3) == ([], [2])
+
+
+def test_alias_metadata_makes_the_canonical_chunk_match_filters():
+    records = [
+        ChunkRecord(0, "a.md", "alpha", "md", 100.0, ("hr",)),
+        ChunkRecord(1, "a.md", "beta", "md", 100.0, ("hr",)),
+        ChunkRecord(
+            2,
+            "b.txt",
+            "gamma",
+            "txt",
+            200.0,
+            aliases=(ChunkAlias("c.pdf", "pdf", ("legal",)),),
+        ),
+    ]
+    index = MetadataIndex.from_records(records)
+
+    assert index.select(MetadataFilter(sources=["c.pdf"])).tolist() == [2]
+    assert index.select(MetadataFilter(file_types=["pdf", "md"])).tolist() == [0, 1, 2]
+    assert index.select(MetadataFilter(tags=["legal"])).tolist() == [2]
+    # Alias metadata only widens matches; the chunk keeps its own ingest time.
+    assert index.select(MetadataFilter(sources=["c.pdf"], ingested_before=150.0)).tolist() == []
+
+
+def test_out_of_order_alias_postings_are_sorted_and_deduplicated():
+    index = MetadataIndex()
+    index.add(0, 2, "a.md", "md", 1.0, ())
+    index.add(2, 2, "b.md", "md", 2.0, ("policy",))
+    index.add_alias(0, ChunkAlias("b.md", "md", ("policy",)))
+    index.add_alias(0, ChunkAlias("b.md", "md", ("policy",)))
+
+    assert index.select(MetadataFilter(sources=["b.md"])).tolist() == [0, 2, 3]
+    assert index.select(MetadataFilter(sources=["a.md"], tags=["policy"])).tolist() == [0]
+    assert index.select(MetadataFilter(sources=["a.md", "b.md"])).tolist() == [0, 1, 2, 3]
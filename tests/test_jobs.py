@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from multi_agentic_platform.jobs import JobQueue, JobStore
+
+TTL = 3600.0
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    yield store
+    store.close()
+
+
+def test_claim_takes_the_oldest_queued_job_of_a_known_kind(store):
+    first = store.submit("run", {"prompt": "one"})
+    store.submit("workflow", {"query": "two"})
+    third = store.submit("run", {"prompt": "three"})
+
+    claimed = store.claim("worker-a", ("run",))
+    assert claimed["id"] == first["id"]
+    assert (claimed["status"], claimed["attempts"], claimed["worker"]) == ("running", 1, "worker-a")
+    assert claimed["payload"] == {"prompt": "one"}
+
+    assert store.claim("worker-b", ("run",))["id"] == third["id"]
+    assert store.claim("worker-b", ("run",)) is None
+    assert store.counts() == {
+        "queued": 1, "running": 2, "succeeded": 0, "failed": 0, "cancelled": 0
+    }
+
+
+def test_finish_is_ignored_unless_the_worker_still_holds_the_job(store):
+    job = store.submit("run", {})
+    store.claim("worker-a", ("run",))
+
+    store.finish(job["id"], "worker-b", "succeeded", TTL, result={"answer": "stale"})
+    assert store.get(job["id"])["status"] == "running"
+
+    store.finish(job["id"], "worker-a", "succeeded", TTL, result={"answer": 42})
+    finished = store.get(job["id"])
+    assert (finished["status"], finished["result"]) == ("succeeded", {"answer": 42})
+    assert finished["expires_at"] > finished["finished_at"]
+
+
+def test_requeue_stale_retries_expired_leases_until_attempts_run_out(store):
+    job = store.submit("run", {})
+    store.claim("worker-a", ("run",))
+
+    # A fresh heartbeat keeps the lease.
+    assert store.requeue_stale(60.0, 2, TTL) == (0, [])
+    assert store.requeue_stale(-1.0, 2, TTL) == (1, [])
+    requeued = store.get(job["id"])
+    assert (requeued["status"], requeued["worker"]) == ("queued", None)
+
+    assert store.claim("worker-b", ("run",))["attempts"] == 2
+    assert store.requeue_stale(-1.0, 2, TTL) == (0, ["run"])
+    failed = store.get(job["id"])
+    assert (failed["status"], failed["error"]) == ("failed", "Interrupted too many times.")
+
+
+def test_cancel_transitions(store):
+    queued = store.submit("run", {})
+    assert store.cancel(queued["id"], TTL)["status"] == "cancelled"
+    assert store.claim("worker-a", ("run",)) is None
+
+    running = store.submit("run", {})
+    store.claim("worker-a", ("run",))
+    flagged = store.cancel(running["id"], TTL)
+    assert (flagged["status"], flagged["cancel_requested"]) == ("running", True)
+    assert store.heartbeat([running["id"]]) == {running["id"]}
+
+    # The worker died before acting on the flag: recovery cancels instead of requeueing.
+    store.requeue_stale(-1.0, 3, TTL)
+    assert store.get(running["id"])["status"] == "cancelled"
+
+
+def test_requeue_hands_running_jobs_back_and_expired_jobs_are_purged(store):
+    job = store.submit("run", {})
+    store.claim("worker-a", ("run",))
+    store.requeue([job["id"]])
+    assert store.get(job["id"])["status"] == "queued"
+
+    store.claim("worker-a", ("run",))
+    store.finish(job["id"], "worker-a", "succeeded", -1.0, result={})
+    assert store.get(job["id"]) is None
+    assert store.purge_expired() == 1
+
+
+def test_queue_runs_jobs_and_cancels_running_ones(store):
+    async def echo(payload):
+        return {"echo": payload["value"]}
+
+    async def block(payload):
+        await asyncio.sleep(3600)
+        return {}
+
+    async def wait_for(queue, job_id, status):
+        while (job := await queue.get(job_id))["status"] != status:
+            await asyncio.sleep(0.01)
+        return job
+
+    async def scenario():
+        queue = JobQueue(
+            store, {"echo": echo, "block": block}, workers=2, poll_interval_seconds=0.05
+        )
+        queue.start()
+        try:
+            done = await queue.submit("echo", {"value": 7})
+            blocked = await queue.submit("block", {})
+            finished = await asyncio.wait_for(wait_for(queue, done["id"], "succeeded"), 5)
+            assert finished["result"] == {"echo": 7}
+
+            await asyncio.wait_for(wait_for(queue, blocked["id"], "running"), 5)
+            await queue.cancel(blocked["id"])
+            cancelled = await asyncio.wait_for(wait_for(queue, blocked["id"], "cancelled"), 5)
+            assert cancelled["error"] == "Cancelled while running."
+
+            with pytest.raises(ValueError):
+                await queue.submit("unknown", {})
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,101 @@
+import asyncio
+import re
+
+from multi_agentic_platform.providers.base import LLMProvider
+from multi_agentic_platform.rag.reranker import Candidate, LLMRerankerAgent, parse_ranking
+
+
+def test_parse_ranking_accepts_json_brackets_and_bare_numbers():
+    assert parse_ranking("[2, 0, 1]", 3) == [2, 0, 1]
+    assert parse_ranking('Sure! {"ranking": [1, 2, 0]}', 3) == [1, 2, 0]
+    assert parse_ranking("[2] > [0] > [1]", 3) == [2, 0, 1]
+    assert parse_ranking("most relevant: 1, then 0", 3) == [1, 0, 2]
+
+
+def test_parse_ranking_completes_partial_and_malformed_output():
+    assert parse_ranking("[3, 3, 9, -1, 1]", 4) == [3, 1, 0, 2]
+    assert parse_ranking("I cannot rank these.", 3) == [0, 1, 2]
+    assert parse_ranking("[1, 0", 3) == [1, 0, 2]
+    assert parse_ranking("", 0) == []
+
+
+class _OracleProvider(LLMProvider):
+    """Ranks shown candidates by the hidden relevance written into their text."""
+
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, system: str, prompt: str) -> str:
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        shown = re.findall(r"\[(\d+)\]\n\S+ relevance=(\d+)", prompt)
+        ranking = sorted(shown, key=lambda item: -int(item[1]))
+        return "[" + ", ".join(index for index, _ in ranking) + "]"
+
+
+class _BrokenProvider(LLMProvider):
+    async def generate(self, system: str, prompt: str) -> str:
+        return "As an AI model I would rather not."
+
+
+def _candidates(relevance: list[int]) -> list[Candidate]:
+    return [
+        Candidate(chunk_id=i, text=f"chunk{i} relevance={value}", retrieval_score=-i)
+        for i, value in enumerate(relevance)
+    ]
+
+
+def _agent(provider: LLMProvider, **options) -> LLMRerankerAgent:
+    options = {"window_size": 4, "window_stride": 2, "max_concurrency": 8, **options}
+    return LLMRerankerAgent(provider, **options)
+
+
+def test_tournament_finds_the_overall_top_k():
+    relevance = [3, 17, 5, 11, 2, 19, 7, 13, 1, 23, 29, 0, 31, 4, 6, 8]
+    provider = _OracleProvider()
+
+    ranked = asyncio.run(_agent(provider).rerank("q", _candidates(relevance), top_k=2))
+
+    assert [candidate.chunk_id for candidate in ranked] == [12, 10]
+    # Windows of one round are ranked concurrently.
+    assert provider.max_in_flight > 1
+
+
+def test_single_window_when_pool_fits_or_windowing_is_off():
+    provider = _OracleProvider()
+    relevance = [1, 5, 3, 9, 7, 2]
+
+    ranked = asyncio.run(
+        _agent(provider, window_size=0).rerank("q", _candidates(relevance), top_k=3)
+    )
+
+    assert [candidate.chunk_id for candidate in ranked] == [3, 4, 1]
+    assert len(provider.prompts) == 1
+
+
+def test_malformed_output_falls_back_to_retrieval_order():
+    candidates = _candidates([1] * 12)
+
+    ranked = asyncio.run(_agent(_BrokenProvider()).rerank("q", candidates, top_k=3))
+
+    assert [candidate.chunk_id for candidate in ranked] == [0, 1, 2]
+
+
+def test_window_rankings_are_cached():
+    provider = _OracleProvider()
+    agent = _agent(provider)
+    candidates = _candidates([4, 8, 15, 16, 23, 42, 7, 9])
+
+    first = asyncio.run(agent.rerank("q", candidates, top_k=2))
+    calls = len(provider.prompts)
+    second = asyncio.run(agent.rerank("q", candidates, top_k=2))
+
+    assert [c.chunk_id for c in first] == [c.chunk_id for c in second] == [5, 4]
+    assert len(provider.prompts) == calls
+    asyncio.run(agent.rerank("another query", candidates, top_k=2))
+    assert len(provider.prompts) > calls
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from multi_agentic_platform.mcp import MCPServerConfig, MCPService, MCPToolCall
+
+
+class _FakeSession:
+    async def call_tool(self, name, arguments):
+        await asyncio.sleep(arguments.get("sleep", 0))
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=f"{name}:ok")])
+
+
+class _FakePool:
+    def __init__(self, tools: dict[str, list[str]]) -> None:
+        self.tools = tools
+        self.calls: list[str] = []
+
+    async def list_tools(self, server_name):
+        return [{"name": name, "description": ""} for name in self.tools[server_name]]
+
+    async def run(self, server_name, operation, retry_on_restart=True):
+        self.calls.append(server_name)
+        return await operation(_FakeSession())
+
+    def status(self):
+        return []
+
+    async def close(self):
+        pass
+
+
+def _service(**kwargs) -> tuple[MCPService, _FakePool]:
+    servers = [MCPServerConfig("docs", "stub", []), MCPServerConfig("search", "stub", [])]
+    pool = _FakePool({"docs": ["read"], "search": ["query"]})
+    return MCPService(servers, pool=pool, **kwargs), pool
+
+
+def test_unknown_tools_are_rejected_without_a_call_or_stats():
+    service, pool = _service()
+
+    results = asyncio.run(
+        service.call_tools(
+            [
+                MCPToolCall("docs", "read"),
+                MCPToolCall("docs", "no-such-tool"),
+                MCPToolCall("nowhere", "read"),
+            ]
+        )
+    )
+
+    assert [result.ok for result in results] == [True, False, False]
+    assert "Unknown tool" in results[1].error
+    assert "Unknown MCP server" in results[2].error
+    assert pool.calls == ["docs"]
+    assert [(row["server"], row["tool"]) for row in service.tool_stats()] == [("docs", "read")]
+
+
+def test_fan_out_costs_the_slowest_call_not_the_sum():
+    service, _ = _service()
+    calls = [
+        MCPToolCall("docs", "read", {"sleep": 0.2}),
+        MCPToolCall("search", "query", {"sleep": 0.2}),
+        MCPToolCall("search", "query", {"sleep": 0.2}),
+    ]
+
+    started = time.perf_counter()
+    results = asyncio.run(service.call_tools(calls))
+
+    assert all(result.ok for result in results)
+    assert [result.content[0]["text"] for result in results] == [
+        "read:ok",
+        "query:ok",
+        "query:ok",
+    ]
+    assert time.perf_counter() - started < 0.5
+
+
+def test_timeouts_are_reported_per_call():
+    service, _ = _service()
+
+    result = asyncio.run(service.call_tool("docs", "read", {"sleep": 1}, timeout=0.05))
+
+    assert not result.ok
+    assert "timed out" in result.error
+    assert service.tool_stats()[0]["timeouts"] == 1
@@ -0,0 +1,92 @@
+import pytest
+
+from multi_agentic_platform.rag.metadata import (
+    ChunkRecord,
+    MetadataFilter,
+    MetadataIndex,
+    file_type_of,
+)
+
+
+def _index() -> MetadataIndex:
+    index = MetadataIndex()
+    index.add(0, 3, "handbook.pdf", "pdf", 100.0, ("hr", "policy"))
+    index.add(3, 2, "notes.md", "md", 200.0, ("eng",))
+    index.add(5, 4, "policy.md", "md", 300.0, ("hr", "policy", "eng"))
+    return index
+
+
+def _select(index: MetadataIndex, **conditions) -> list[int] | None:
+    ids = index.select(MetadataFilter(**conditions))
+    return None if ids is None else ids.tolist()
+
+
+def test_empty_filter_selects_everything():
+    index = _index()
+    assert index.select(None) is None
+    assert _select(index) is None
+    assert _select(index, tags=[]) is None
+
+
+def test_values_within_a_field_are_alternatives():
+    index = _index()
+    assert _select(index, sources=["notes.md", "handbook.pdf"]) == [0, 1, 2, 3, 4]
+    assert _select(index, file_types=["md"]) == [3, 4, 5, 6, 7, 8]
+    assert _select(index, sources=["missing.txt"]) == []
+
+
+def test_tags_must_all_be_present_and_fields_combine_with_and():
+    index = _index()
+    assert _select(index, tags=["hr"]) == [0, 1, 2, 5, 6, 7, 8]
+    assert _select(index, tags=["hr", "eng"]) == [5, 6, 7, 8]
+    assert _select(index, tags=["hr"], file_types=["pdf"]) == [0, 1, 2]
+    assert _select(index, tags=["hr", "unknown"]) == []
+
+
+def test_ingest_time_range_is_half_open():
+    index = _index()
+    assert _select(index, ingested_after=200.0) == [3, 4, 5, 6, 7, 8]
+    assert _select(index, ingested_before=200.0) == [0, 1, 2]
+    assert _select(index, tags=["eng"], ingested_after=150.0, ingested_before=300.0) == [3, 4]
+
+
+def test_chunk_ids_must_be_added_in_order():
+    with pytest.raises(ValueError):
+        _index().add(3, 1, "late.md", "md", 0.0, ())
+
+
+def test_from_records_groups_runs_of_the_same_document():
+    records = [
+        ChunkRecord(0, "a.md", "x", "md", 1.0, ("t",)),
+        ChunkRecord(1, "a.md", "y", "md", 1.0, ("t",)),
+        ChunkRecord(2, "b.txt", "z", "txt", 2.0, ()),
+    ]
+    index = MetadataIndex.from_records(records)
+    assert index.size == 3
+    assert _select(index, tags=["t"]) == [0, 1]
+    assert _select(index, file_types=["txt"]) == [2]
+
+
+def test_posting_lists_round_trip_without_copying():
+    index = _index()
+    postings = {name: index.posting_lists(name) for name in ("source", "file_type", "tag")}
+    values, ids, offsets = postings["tag"]
+    assert values == ["hr", "policy", "eng"]
+    assert ids[offsets[2] : offsets[3]].tolist() == [3, 4, 5, 6, 7, 8]
+
+    restored = MetadataIndex.from_posting_lists(index._ingested_at.values, postings)
+    for conditions in (
+        {"tags": ["hr", "eng"]},
+        {"sources": ["notes.md"], "ingested_after": 150.0},
+        {"file_types": ["pdf", "md"], "ingested_before": 300.0},
+    ):
+        assert _select(restored, **conditions) == _select(index, **conditions)
+    # Appending to a restored index copies the wrapped arrays instead of writing into them.
+    restored.add(9, 1, "new.md", "md", 400.0, ("eng",))
+    assert _select(restored, tags=["eng"])[-1] == 9
+    assert ids[offsets[2] : offsets[3]].tolist() == [3, 4, 5, 6, 7, 8]
+
+
+def test_file_type_comes_from_the_extension():
+    assert file_type_of("docs/Guide.PDF") == "pdf"
+    assert file_type_of("README") == "text"
@@ -0,0 +1,92 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from multi_agentic_platform.metrics import (
+    STAGE_SECONDS,
+    MetricsMiddleware,
+    MetricsRegistry,
+    track_stage,
+)
+
+
+def _lines(registry: MetricsRegistry) -> list[str]:
+    return registry.render().splitlines()
+
+
+def test_counter_and_gauge_exposition():
+    registry = MetricsRegistry(render_interval=0)
+    requests = registry.counter("t_requests_total", "Requests.", ("route",))
+    in_flight = registry.gauge("t_in_flight", "In flight.")
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    requests.inc(route='/b"\n')
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    lines = _lines(registry)
+    assert lines[:2] == ["# HELP t_requests_total Requests.", "# TYPE t_requests_total counter"]
+    assert 't_requests_total{route="/a"} 3' in lines
+    assert 't_requests_total{route="/b\\"\\n"} 1' in lines
+    assert "# TYPE t_in_flight gauge" in lines
+    assert "t_in_flight 1" in lines
+
+
+def test_histogram_buckets_are_cumulative_with_sum_and_count():
+    registry = MetricsRegistry(render_interval=0)
+    latency = registry.histogram("t_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value, stage="embed")
+
+    lines = _lines(registry)
+    assert "# TYPE t_seconds histogram" in lines
+    assert 't_seconds_bucket{stage="embed",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="embed",le="1"} 3' in lines
+    assert 't_seconds_bucket{stage="embed",le="+Inf"} 4' in lines
+    assert 't_seconds_sum{stage="embed"} 6.05' in lines
+    assert 't_seconds_count{stage="embed"} 4' in lines
+
+
+def test_registering_a_name_twice_returns_the_same_metric():
+    registry = MetricsRegistry(render_interval=0)
+    first = registry.counter("t_total", "Total.")
+    assert registry.counter("t_total", "Total.") is first
+
+
+def test_render_is_cached_for_the_render_interval():
+    registry = MetricsRegistry(render_interval=60)
+    counter = registry.counter("t_cached_total", "Cached.")
+    counter.inc()
+    first = registry.render()
+    counter.inc()
+    assert registry.render() is first
+    assert "t_cached_total 1" in first
+
+
+def _app(timing_headers: bool = False) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, timing_headers=timing_headers)
+
+    @app.get("/work")
+    def work() -> dict[str, bool]:
+        with track_stage("test.work"):
+            pass
+        return {"ok": True}
+
+    return app
+
+
+def test_server_timing_header_only_when_requested():
+    client = TestClient(_app())
+    assert "server-timing" not in client.get("/work").headers
+
+    header = client.get("/work", headers={"X-Timing-Breakdown": "1"}).headers["server-timing"]
+    stages = [part.split(";")[0] for part in header.split(", ")]
+    assert stages == ["test.work", "total"]
+
+
+def test_server_timing_header_when_enabled_and_stage_histogram_observed():
+    before = STAGE_SECONDS.render()
+    client = TestClient(_app(timing_headers=True))
+    assert "test.work;dur=" in client.get("/work").headers["server-timing"]
+    assert STAGE_SECONDS.render() != before
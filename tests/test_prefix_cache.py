@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+from multi_agentic_platform.providers.prefix_cache import (
+    PREFIX_CACHE_LOOKUPS,
+    PrefixKVCache,
+    kv_cache_nbytes,
+)
+
+
+class _Tensor:
+    """Just enough of a torch tensor for byte accounting."""
+
+    def __init__(self, numel: int, element_size: int = 2) -> None:
+        self._numel = numel
+        self._element_size = element_size
+
+    def numel(self) -> int:
+        return self._numel
+
+    def element_size(self) -> int:
+        return self._element_size
+
+
+def _kv(layers: int, numel: int) -> tuple:
+    """Legacy tuple-of-(key, value)-per-layer cache layout."""
+    return tuple((_Tensor(numel), _Tensor(numel)) for _ in range(layers))
+
+
+def test_byte_accounting_covers_every_cache_layout():
+    assert kv_cache_nbytes(None) == 0
+    assert kv_cache_nbytes(_kv(layers=2, numel=10)) == 2 * 2 * 10 * 2
+    layered = SimpleNamespace(
+        layers=[SimpleNamespace(keys=_Tensor(10), values=_Tensor(10, element_size=4))]
+    )
+    assert kv_cache_nbytes(layered) == 20 + 40
+    legacy = SimpleNamespace(key_cache=[_Tensor(5)], value_cache=[_Tensor(5)])
+    assert kv_cache_nbytes(legacy) == 20
+
+
+def test_hits_refresh_recency_and_the_byte_budget_evicts_the_oldest():
+    cache = PrefixKVCache(max_bytes=300)
+    hits = PREFIX_CACHE_LOOKUPS.value(result="hit")
+    misses = PREFIX_CACHE_LOOKUPS.value(result="miss")
+
+    assert cache.get("planner") is None
+    cache.put("planner", [1, 2], _kv(layers=1, numel=50))  # 200 bytes
+    cache.put("critic", [3], _kv(layers=1, numel=10))  # 40 bytes
+    assert cache.memory_bytes == 240
+    token_ids, _ = cache.get("planner")
+    assert token_ids == [1, 2]
+
+    # "critic" is now least recently used.
+    cache.put("writer", [4], _kv(layers=1, numel=20))  # 80 bytes
+
+    assert cache.get("critic") is None
+    assert cache.get("planner") is not None and cache.get("writer") is not None
+    assert len(cache) == 2 and cache.memory_bytes == 280
+    assert PREFIX_CACHE_LOOKUPS.value(result="hit") - hits == 3
+    assert PREFIX_CACHE_LOOKUPS.value(result="miss") - misses == 2
+
+
+def test_replacing_an_entry_and_oversized_entries_keep_the_total_right():
+    cache = PrefixKVCache(max_bytes=100)
+    cache.put("a", [1], _kv(layers=1, numel=10))
+    cache.put("a", [1], _kv(layers=1, numel=20))
+    assert len(cache) == 1 and cache.memory_bytes == 80
+
+    cache.put("huge", [2], _kv(layers=1, numel=1000))
+
+    assert cache.get("huge") is None
+    assert cache.memory_bytes == 80
+    cache.clear()
+    assert len(cache) == 0 and cache.memory_bytes == 0
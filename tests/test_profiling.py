@@ -0,0 +1,76 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from multi_agentic_platform import main
+from multi_agentic_platform.metrics import track_stage
+from multi_agentic_platform.profiling import Profiler, ProfilingConfig, ProfilingMiddleware
+from multi_agentic_platform.rag.batching import MicroBatcher
+
+
+def _double(items: list[int]) -> list[int]:
+    with track_stage("model"):
+        return [item * 2 for item in items]
+
+
+def _client(profiler: Profiler) -> TestClient:
+    app = FastAPI()
+    batcher = MicroBatcher("profiled", _double)
+
+    @app.get("/work")
+    async def work() -> dict[str, int]:
+        with track_stage("work"):
+            await asyncio.sleep(0.01)
+            return {"value": await batcher.submit(21)}
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler, admin_token="secret")
+    return TestClient(app)
+
+
+def test_x_profile_needs_the_admin_token():
+    profiler = Profiler(ProfilingConfig())
+    client = _client(profiler)
+
+    for headers in ({"X-Profile": "1"}, {"X-Profile": "1", "X-Admin-Token": "wrong"}):
+        response = client.get("/work", headers=headers)
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+    assert profiler.profiles() == []
+
+    response = client.get("/work", headers={"X-Profile": "1", "X-Admin-Token": "secret"})
+
+    profile = profiler.get(int(response.headers["x-profile-id"]))
+    assert profile is not None and profile["trigger"] == "header"
+    (stage,) = profile["spans"]["children"]
+    assert stage["name"] == "work"
+    # Stages run on the batch worker are replayed into the request that waited for them.
+    (batch,) = stage["children"]
+    assert batch["name"] == "batch.profiled"
+    assert [child["name"] for child in batch["children"]] == ["model"]
+
+
+def test_threshold_keeps_only_slow_requests():
+    profiler = Profiler(ProfilingConfig(enabled=True, threshold_ms=10_000))
+    client = _client(profiler)
+
+    client.get("/work")
+    assert profiler.profiles() == []
+
+    profiler.configure(threshold_ms=0)
+    client.get("/work")
+    assert [profile["trigger"] for profile in profiler.profiles()] == ["threshold"]
+
+
+def test_admin_routes_are_hidden_without_a_token_and_gated_with_one(monkeypatch):
+    client = TestClient(main.app)
+
+    monkeypatch.setattr(main.settings, "admin_token", None)
+    assert client.get("/admin/profiling").status_code == 404
+
+    monkeypatch.setattr(main.settings, "admin_token", "secret")
+    assert client.get("/admin/profiling").status_code == 403
+    assert client.get("/admin/profiling", headers={"X-Admin-Token": "nope"}).status_code == 403
+    response = client.get("/admin/profiling", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert "stored_profiles" in response.json()
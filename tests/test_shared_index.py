@@ -0,0 +1,116 @@
+import numpy as np
+
+from multi_agentic_platform.rag.metadata import ChunkAlias, ChunkRecord, MetadataFilter
+from multi_agentic_platform.rag.shared_index import IndexPublisher, SharedIndexReader
+
+
+def _vectors(count: int, dimension: int = 8) -> np.ndarray:
+    rng = np.random.default_rng(count)
+    vectors = rng.standard_normal((count, dimension)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _chunks(count: int, prefix: str = "doc") -> list[ChunkRecord]:
+    return [
+        ChunkRecord(
+            chunk_id=i,
+            source=f"{prefix}-{i // 2}.md",
+            text=f"chunk {i} of {prefix} ünïcode",
+            file_type="md",
+            ingested_at=float(i // 2),
+            tags=("even",) if i // 2 % 2 == 0 else (),
+        )
+        for i in range(count)
+    ]
+
+
+def test_reader_serves_what_the_writer_published(tmp_path):
+    vectors = _vectors(10)
+    publisher = IndexPublisher(tmp_path)
+    assert publisher.publish(vectors, _chunks(10)) == 1
+
+    generation = SharedIndexReader(tmp_path, poll_seconds=0).current()
+
+    assert generation.generation == 1
+    assert generation.size == 10
+    assert generation.chunk(3) == _chunks(10)[3]
+    hits = generation.store.search(vectors[7], top_k=3)
+    assert hits[0].chunk_id == 7
+    assert abs(hits[0].score - 1.0) < 1e-5
+
+
+def test_reader_follows_new_generations_and_old_ones_are_pruned(tmp_path):
+    publisher = IndexPublisher(tmp_path, keep=2)
+    reader = SharedIndexReader(tmp_path, poll_seconds=0)
+    publisher.publish(_vectors(4), _chunks(4))
+    first = reader.current()
+
+    for count in (6, 8):
+        publisher.publish(_vectors(count), _chunks(count, prefix="new"))
+
+    latest = reader.current()
+    assert latest.generation == 3 and latest.size == 8
+    assert sorted(path.name for path in tmp_path.glob("gen-*")) == ["gen-00000002", "gen-00000003"]
+    # A query still holding the pruned generation keeps reading its mapping.
+    assert first.chunk(0).text == "chunk 0 of doc ünïcode"
+
+
+def test_metadata_filters_are_served_from_the_published_postings(tmp_path):
+    IndexPublisher(tmp_path).publish(_vectors(10), _chunks(10))
+    metadata = SharedIndexReader(tmp_path, poll_seconds=0).current().metadata
+
+    def select(**conditions):
+        return metadata.select(MetadataFilter(**conditions)).tolist()
+
+    assert select(sources=["doc-1.md", "doc-3.md"]) == [2, 3, 6, 7]
+    assert select(tags=["even"]) == [0, 1, 4, 5, 8, 9]
+    assert select(tags=["even"], ingested_after=2.0) == [4, 5, 8, 9]
+    assert select(file_types=["pdf"]) == []
+    assert metadata.select(MetadataFilter()) is None
+
+
+def test_aliases_are_served_from_the_published_generation(tmp_path):
+    chunks = _chunks(6)
+    chunks[1].aliases = (ChunkAlias("copy.txt", "txt", ("even", "dup")),)
+    chunks[4].aliases = (ChunkAlias("other.md", "md"), ChunkAlias("copy.txt", "txt"))
+    IndexPublisher(tmp_path).publish(_vectors(6), chunks)
+    generation = SharedIndexReader(tmp_path, poll_seconds=0).current()
+
+    assert [generation.chunk(i) for i in range(6)] == chunks
+    assert generation.metadata.select(MetadataFilter(sources=["copy.txt"])).tolist() == [1, 4]
+    assert generation.metadata.select(MetadataFilter(tags=["dup"])).tolist() == [1]
+
+
+def test_publisher_cleans_up_after_a_crashed_publish(tmp_path):
+    IndexPublisher(tmp_path).publish(_vectors(4), _chunks(4))
+    # A writer that died mid-publish leaves a staging directory, or a renamed generation that
+    # CURRENT never pointed at.
+    (tmp_path / "gen-00000002.tmp-abc").mkdir()
+    (tmp_path / "gen-00000002").mkdir()
+    (tmp_path / "CURRENT.tmp-123").write_text("gen-00000002", encoding="utf-8")
+
+    publisher = IndexPublisher(tmp_path)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["CURRENT", "gen-00000001"]
+    assert publisher.publish(_vectors(5), _chunks(5)) == 2
+    assert SharedIndexReader(tmp_path, poll_seconds=0).current().size == 5
+
+
+def test_reader_keeps_the_last_good_generation_when_the_new_one_is_unreadable(tmp_path):
+    publisher = IndexPublisher(tmp_path)
+    reader = SharedIndexReader(tmp_path, poll_seconds=0)
+    publisher.publish(_vectors(4), _chunks(4))
+    assert reader.current().generation == 1
+
+    publisher.publish(_vectors(6), _chunks(6))
+    (tmp_path / "gen-00000002" / "manifest.json").write_text("{not json", encoding="utf-8")
+
+    assert reader.current().generation == 1
+
+
+def test_reader_without_a_published_generation_serves_nothing(tmp_path):
+    reader = SharedIndexReader(tmp_path, poll_seconds=0)
+    assert reader.current() is None
+
+    (tmp_path / "CURRENT").write_text("gen-00000001", encoding="utf-8")
+    assert reader.current() is None
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+from multi_agentic_platform.startup import Lazy, WarmupTracker
+
+
+def _fail() -> None:
+    raise RuntimeError("model download failed")
+
+
+def test_not_ready_before_anything_is_registered():
+    assert not WarmupTracker().ready
+    assert not WarmupTracker(required={"provider"}).ready
+
+
+def test_required_component_that_is_never_registered_blocks_readiness():
+    tracker = WarmupTracker(required={"provider", "embedding_model"})
+
+    asyncio.run(tracker.run([("provider", lambda: None)]))
+
+    assert not tracker.ready
+    snapshot = tracker.snapshot()
+    assert snapshot["provider"]["state"] == "ready"
+    assert snapshot["embedding_model"]["state"] == "unregistered"
+    assert snapshot["embedding_model"]["required"] is True
+
+
+def test_start_registers_components_before_the_task_runs():
+    async def scenario():
+        tracker = WarmupTracker()
+        task = tracker.start([("provider", lambda: None), ("rag_index", lambda: None)])
+        pending = tracker.snapshot()
+        ready_before = tracker.ready
+        await task
+        return pending, ready_before, tracker.ready
+
+    pending, ready_before, ready_after = asyncio.run(scenario())
+    assert {name: status["state"] for name, status in pending.items()} == {
+        "provider": "pending",
+        "rag_index": "pending",
+    }
+    assert not ready_before
+    assert ready_after
+
+
+def test_optional_failures_do_not_block_readiness():
+    tracker = WarmupTracker(required={"provider"})
+
+    asyncio.run(tracker.run([("provider", lambda: None), ("reranker_model", _fail)]))
+
+    assert tracker.ready
+    reranker = tracker.snapshot()["reranker_model"]
+    assert reranker["state"] == "failed"
+    assert reranker["error"] == "model download failed"
+    assert reranker["required"] is False
+
+
+def test_failed_required_step_is_retried():
+    attempts = []
+
+    def flaky() -> None:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("not yet")
+
+    tracker = WarmupTracker(retry_seconds=0.001)
+    asyncio.run(tracker.run([("provider", flaky)]))
+
+    assert len(attempts) == 3
+    assert tracker.ready
+
+
+def test_lazy_builds_once_across_threads():
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def factory() -> object:
+        calls.append(1)
+        return object()
+
+    lazy = Lazy(factory)
+    results = []
+
+    def worker() -> None:
+        barrier.wait()
+        results.append(lazy.get())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(value) for value in results}) == 1
+    assert lazy.loaded
@@ -0,0 +1,109 @@
+import numpy as np
+
+from multi_agentic_platform.rag.vector_store import FaissStore, ShardedFaissStore
+
+DIMENSION = 32
+
+
+def _unit(rows: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((rows, DIMENSION)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _ids(hits) -> list[int]:
+    return [hit.chunk_id for hit in hits]
+
+
+def test_sharded_search_matches_a_single_index():
+    vectors = _unit(1000, seed=1)
+    single = FaissStore(DIMENSION)
+    sharded = ShardedFaissStore(DIMENSION, num_shards=4)
+    # Several adds so rows interleave across shards with global ids.
+    for batch in np.array_split(vectors, 7):
+        single.add(batch)
+        sharded.add(batch)
+
+    assert sharded.size == single.size == 1000
+    assert sum(sharded.shard_sizes()) == 1000
+    np.testing.assert_allclose(sharded.vectors(), vectors, rtol=1e-6)
+    for query in _unit(20, seed=2):
+        expected = single.search(query, top_k=10)
+        actual = sharded.search(query, top_k=10)
+        assert _ids(actual) == _ids(expected)
+        np.testing.assert_allclose(
+            [hit.score for hit in actual], [hit.score for hit in expected], rtol=1e-5
+        )
+    sharded.close()
+
+
+def test_added_shards_absorb_growth_and_keep_results_exact():
+    vectors = _unit(600, seed=3)
+    single = FaissStore(DIMENSION)
+    sharded = ShardedFaissStore(DIMENSION, num_shards=2)
+    single.add(vectors[:400])
+    sharded.add(vectors[:400])
+
+    assert sharded.add_shard() == 3
+    single.add(vectors[400:])
+    sharded.add(vectors[400:])
+
+    assert sharded.shard_sizes() == [200, 200, 200]
+    for query in _unit(10, seed=4):
+        assert _ids(sharded.search(query, top_k=5)) == _ids(single.search(query, top_k=5))
+    sharded.close()
+
+
+def _recall(store, exact: FaissStore, queries: np.ndarray, top_k: int = 10) -> float:
+    found = 0
+    for query in queries:
+        truth = set(_ids(exact.search(query, top_k=top_k)))
+        found += len(truth & set(_ids(store.search(query, top_k=top_k))))
+    return found / (len(queries) * top_k)
+
+
+def test_quantized_storage_with_exact_rescore_keeps_recall():
+    vectors, queries = _unit(3000, seed=5), _unit(50, seed=6)
+    exact = FaissStore(DIMENSION)
+    exact.add(vectors)
+
+    for storage, bytes_per_dimension in (("fp16", 2), ("int8", 1)):
+        plain = FaissStore(DIMENSION, storage=storage)
+        rescored = FaissStore(DIMENSION, storage=storage, exact_rescore=True, rescore_factor=4)
+        sharded = ShardedFaissStore(
+            DIMENSION, num_shards=3, storage=storage, exact_rescore=True, rescore_factor=4
+        )
+        for store in (plain, rescored, sharded):
+            store.add(vectors)
+
+        assert plain.index_bytes == 3000 * DIMENSION * bytes_per_dimension
+        assert _recall(rescored, exact, queries) >= 0.98
+        assert _recall(sharded, exact, queries) >= 0.98
+        assert _recall(rescored, exact, queries) >= _recall(plain, exact, queries)
+        # Re-scored results carry full-precision scores.
+        hit = rescored.search(queries[0], top_k=1)[0]
+        assert abs(hit.score - float(vectors[hit.chunk_id] @ queries[0])) < 1e-5
+        np.testing.assert_array_equal(rescored.vectors(), vectors)
+        for store in (plain, rescored, sharded):
+            store.close()
+
+
+def test_filtered_search_only_returns_allowed_ids_in_exact_order():
+    vectors, queries = _unit(500, seed=7), _unit(10, seed=8)
+    allowed = np.arange(3, 500, 7)
+    stores = [
+        FaissStore(DIMENSION),
+        ShardedFaissStore(DIMENSION, num_shards=3),
+        FaissStore(DIMENSION, storage="int8", exact_rescore=True),
+    ]
+    for store in stores:
+        store.add(vectors)
+
+    for query in queries:
+        scores = vectors[allowed] @ query
+        expected = allowed[np.argsort(-scores)[:5]].tolist()
+        for store in stores:
+            assert _ids(store.search(query, top_k=5, allowed_ids=allowed)) == expected
+        assert len(stores[0].search(query, top_k=5, allowed_ids=allowed[:2])) == 2
+        assert stores[1].search(query, top_k=5, allowed_ids=np.empty(0, dtype=np.int64)) == []
+    for store in stores:
+        store.close()